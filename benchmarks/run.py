@@ -0,0 +1,252 @@
+"""
+Performance benchmarks for parsing, evaluation, intersections and rendering.
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/run.py
+    python benchmarks/run.py -k intersections --repeat 3
+    python benchmarks/run.py --save
+
+Each case is timed as the best of --repeat runs and compared with the
+stored baselines (benchmarks/baselines.json). Cases slower than their
+baseline by more than --threshold (a fraction, default 0.25) are reported
+as regressions and make the run exit with status 1. Baselines depend on
+the machine; re-record them with --save where the comparison runs.
+Cases in the gui group need PySide2, -k can select them away.
+"""
+from functools import partial
+import argparse
+import json
+import os
+import subprocess
+import sys
+import timeit
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from function_parser import FunctionParser
+from intersections import find_intersections
+from solver import solve
+
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+
+# Representative inputs: polynomial, rational, logarithmic and root terms
+EXPRESSIONS = [
+    "5*x^2 + 2*x",
+    "(x+1)^3/(x^2 + 1)",
+    "log10(x^2 + 1) - x/4",
+    "sqrt(x^2 + 4) - 2",
+]
+RESTRICTED_EXPRESSION = "sqrt(x - 1) + log10(x + 2)"
+
+SCALAR_POINT_COUNTS = [100, 10_000]
+POINT_COUNTS = [100, 10_000, 1_000_000]
+
+# name -> setup returning the callable to time
+CASES = {}
+
+
+def _parser_evaluate(n):
+    x_values = np.linspace(-10, 10, n // len(EXPRESSIONS)).tolist()
+
+    def run():
+        for func_str in EXPRESSIONS:
+            for x in x_values:
+                FunctionParser.evaluate(func_str, x)
+    return run
+
+
+def _check_domain_restrictions(n):
+    x_values = np.linspace(-10, 10, n).tolist()
+
+    def run():
+        for x in x_values:
+            FunctionParser.check_domain_restrictions(RESTRICTED_EXPRESSION, x)
+    return run
+
+
+def _compile_evaluate(n):
+    x = np.linspace(-10, 10, n)
+
+    def run():
+        for func_str in EXPRESSIONS:
+            FunctionParser.compile(func_str)(x)
+    return run
+
+
+def _domain_mask(n):
+    x = np.linspace(-10, 10, n)
+    return partial(FunctionParser.domain_mask, RESTRICTED_EXPRESSION, x)
+
+
+def _find_intersections(n):
+    # Intersection heavy: a crossing every 20 samples
+    x = np.linspace(0, 1, n)
+    y1 = np.sin(x * np.pi * n / 20)
+    return partial(find_intersections, x, y1, np.zeros(n))
+
+
+def _find_interval_intersections(n):
+    # Alternating bands of coinciding samples and sign changes
+    x = np.linspace(0, 1, n)
+    y1 = np.where((np.arange(n) // 10) % 2 == 0, 0.0, np.sin(x * np.pi * n / 5))
+    return partial(find_intersections, x, y1, np.zeros(n))
+
+
+def _solve(n, adaptive):
+    f1 = FunctionParser.compile("x^3/20 - sqrt(x^2 + 1)")
+    f2 = FunctionParser.compile("log10(x^2 + 1) - 1")
+    return partial(solve, f1, f2, -10, 10, n, 6, adaptive=adaptive)
+
+
+def _qt_app():
+    from PySide2.QtWidgets import QApplication
+    return QApplication.instance() or QApplication(sys.argv)
+
+
+def _table_update(n):
+    _qt_app()
+    from widgets.intersection_table import IntersectionTable
+    table = IntersectionTable()
+    points = [(x, x * x) for x in np.linspace(-10, 10, n)]
+    intervals = [((x, 0.0), (x + 0.01, 0.0)) for x in np.linspace(-10, 10, n // 10)]
+    precision = iter(range(1_000_000_000))
+
+    def run():
+        # Alternate precision so every update re-formats
+        table.update_intersections(points, intervals, next(precision) % 2 + 2)
+        table.cell_text(0, 1)
+    return run
+
+
+def _solve_and_plot(n):
+    _qt_app()
+    from PySide2.QtCore import QEventLoop
+    from widgets.main_window import MainWindow
+    window = MainWindow()
+    window.func1_input.setText("x^3/20 - sqrt(x^2 + 1)")
+    window.func2_input.setText("log10(x^2 + 1) - 1")
+    window.plot_settings.num_points.setValue(n)
+    loop = QEventLoop()
+    window.solve_finished.connect(loop.quit)
+
+    def run():
+        # A cold solve and a full redraw, as after editing a function
+        window.sample_cache.clear()
+        window.solve_and_plot()
+        loop.exec_()
+        window.canvas.draw()
+    return run
+
+
+def _startup():
+    # Whole process: interpreter start to the window's first paint
+    main = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../src/main.py')
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get('QT_QPA_PLATFORM', 'offscreen'))
+    return partial(subprocess.run, [sys.executable, main, '--startup-time'], env=env,
+                   check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+CASES['gui.startup'] = _startup
+
+for prefix, setup, counts in [
+        ('parser.evaluate', _parser_evaluate, SCALAR_POINT_COUNTS),
+        ('parser.check_domain_restrictions', _check_domain_restrictions, SCALAR_POINT_COUNTS),
+        ('parser.compile_evaluate', _compile_evaluate, POINT_COUNTS),
+        ('parser.domain_mask', _domain_mask, POINT_COUNTS),
+        ('intersections.crossings', _find_intersections, POINT_COUNTS),
+        ('intersections.bands', _find_interval_intersections, POINT_COUNTS),
+        ('solver.uniform', partial(_solve, adaptive=False), POINT_COUNTS),
+        ('solver.adaptive', partial(_solve, adaptive=True), POINT_COUNTS),
+        ('gui.table_update', _table_update, [100, 10_000]),
+        # Point counts the plot settings allow
+        ('gui.solve_and_plot', _solve_and_plot, [100, 1_000, 10_000])]:
+    for count in counts:
+        CASES[f'{prefix}[{count}]'] = partial(setup, count)
+
+
+def time_case(setup, repeat=5):
+    """Best time of one call in seconds, over repeat runs of at least 0.2 s."""
+    timer = timeit.Timer(setup())
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def compare(results, baselines, threshold=0.25):
+    """
+    Compare timings with baselines.
+    Returns list of (name, baseline, seconds, ratio, status) rows, status
+    being 'ok', 'faster', 'REGRESSION' or 'new' (no baseline).
+    """
+    rows = []
+    for name, seconds in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            rows.append((name, None, seconds, None, 'new'))
+            continue
+        ratio = seconds / baseline
+        if ratio > 1 + threshold:
+            status = 'REGRESSION'
+        elif ratio < 1 / (1 + threshold):
+            status = 'faster'
+        else:
+            status = 'ok'
+        rows.append((name, baseline, seconds, ratio, status))
+    return rows
+
+
+def format_report(rows):
+    """Plain-text table of compare rows."""
+    def fmt(seconds):
+        return '-' if seconds is None else f"{seconds * 1e3:.3f} ms"
+
+    width = max([len(name) for name, *_ in rows] + [4])
+    lines = [f"{'case':<{width}}  {'baseline':>14}  {'current':>14}  {'ratio':>6}  status"]
+    for name, baseline, seconds, ratio, status in rows:
+        ratio = '-' if ratio is None else f"{ratio:.2f}"
+        lines.append(f"{name:<{width}}  {fmt(baseline):>14}  {fmt(seconds):>14}  {ratio:>6}  {status}")
+    regressions = sum(row[4] == 'REGRESSION' for row in rows)
+    lines.append(f"{len(rows)} cases, {regressions} regressions")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Run performance benchmarks.")
+    arg_parser.add_argument('-k', '--select', default='',
+                            help="only run cases whose name contains this text")
+    arg_parser.add_argument('-r', '--repeat', type=int, default=5, help="timed runs per case")
+    arg_parser.add_argument('-t', '--threshold', type=float, default=0.25,
+                            help="allowed slowdown over baseline as a fraction")
+    arg_parser.add_argument('-b', '--baselines', default=BASELINES, help="baselines JSON file")
+    arg_parser.add_argument('--save', action='store_true',
+                            help="store the timings as new baselines instead of comparing")
+    arg_parser.add_argument('--json', help="also write the timings to this JSON file")
+    args = arg_parser.parse_args(argv)
+
+    results = {}
+    for name, setup in CASES.items():
+        if args.select in name:
+            results[name] = time_case(setup, args.repeat)
+            print(f"{name}: {results[name] * 1e3:.3f} ms", file=sys.stderr)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    baselines = {}
+    if os.path.exists(args.baselines):
+        with open(args.baselines, encoding='utf-8') as f:
+            baselines = json.load(f)
+
+    if args.save:
+        baselines.update(results)
+        with open(args.baselines, 'w', encoding='utf-8') as f:
+            json.dump(dict(sorted(baselines.items())), f, indent=2)
+            f.write('\n')
+        return 0
+
+    rows = compare(results, baselines, args.threshold)
+    print(format_report(rows))
+    return 1 if any(row[4] == 'REGRESSION' for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
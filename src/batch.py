@@ -0,0 +1,208 @@
+"""
+Headless batch solver.
+
+Reads function pairs from JSONL or CSV, solves them across a process pool
+and writes one JSON result per line, in input order:
+
+    python src/batch.py pairs.jsonl -o results.jsonl --workers 8
+
+Each record needs f1 and f2; domain_start, domain_end, num_points,
+precision, sampling ("adaptive" or "uniform") and valid_domain_only are
+optional and default to the GUI settings. time_limit (seconds) and
+max_evaluations bound the work spent on one record, which then fails with
+an error instead of stalling its worker. Other fields (e.g. an id) are
+passed through to the result. Records with more than STREAMING_POINTS
+points are solved on a uniform grid evaluated in chunks, in constant
+memory. Does not import PySide2.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import csv
+import json
+import os
+import sys
+from function_parser import FunctionParser
+from solver import SolveBudget, polynomial_intersections, solve
+from streaming import stream_intersections
+
+
+DEFAULTS = {
+    'domain_start': -10.0,
+    'domain_end': 10.0,
+    'num_points': 1000,
+    'precision': 2,
+    'sampling': 'adaptive',
+    'valid_domain_only': True,
+    'time_limit': 60.0,
+    'max_evaluations': 1_000_000_000,
+}
+
+# Point counts above this are streamed in chunks of STREAMING_CHUNK samples
+STREAMING_POINTS = 1_000_000
+STREAMING_CHUNK = 1_000_000
+
+
+def read_records(stream, fmt):
+    """
+    Yield input records from a JSONL or CSV stream. A line that is not
+    valid JSON is yielded as a ValueError, which solve_record reports as
+    that line's error.
+    """
+    if fmt == 'csv':
+        for row in csv.DictReader(stream):
+            yield {key: value for key, value in row.items() if value not in (None, '')}
+        return
+
+    for number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if line:
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield ValueError(f"Invalid JSON on line {number}: {e}")
+
+
+def _settings(record):
+    """Merge record settings over defaults, converting CSV strings."""
+    settings = dict(DEFAULTS)
+    settings.update({key: record[key] for key in DEFAULTS if key in record})
+    valid_domain_only = settings['valid_domain_only']
+    if isinstance(valid_domain_only, str):
+        valid_domain_only = valid_domain_only.strip().lower() in ('1', 'true', 'yes')
+    num_points = int(settings['num_points'])
+    if num_points < 2:
+        raise ValueError("num_points must be at least 2")
+    return {
+        'domain_start': float(settings['domain_start']),
+        'domain_end': float(settings['domain_end']),
+        'num_points': num_points,
+        'precision': int(settings['precision']),
+        'adaptive': str(settings['sampling']).lower() == 'adaptive',
+        'valid_domain_only': valid_domain_only,
+        'time_limit': float(settings['time_limit']),
+        'max_evaluations': int(float(settings['max_evaluations'])),
+    }
+
+
+def parse_record(record):
+    """
+    Validated and compiled (f1, f2, settings) of an input record.
+    Raises ValueError with a message for the record's error field.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("Invalid record: expected an object")
+    try:
+        func1_str = str(record['f1']).strip()
+        func2_str = str(record['f2']).strip()
+        settings = _settings(record)
+    except (KeyError, ValueError, TypeError) as e:
+        raise ValueError(f"Invalid record: {e}")
+
+    parser = FunctionParser()
+    for name, func_str in (('Function 1', func1_str), ('Function 2', func2_str)):
+        is_valid, error = parser.validate_function(func_str)
+        if not is_valid:
+            raise ValueError(f"{name}: {error}")
+
+    try:
+        return parser.compile(func1_str), parser.compile(func2_str), settings
+    except ValueError as e:
+        raise ValueError(f"Error: {str(e)}")
+
+
+def format_intersections(points, intervals, precision):
+    """JSON-serializable points and intervals rounded to precision."""
+    return {
+        'points': [[round(x, precision), round(y, precision)] for x, y in points],
+        'intervals': [[[round(sx, precision), round(sy, precision)],
+                       [round(ex, precision), round(ey, precision)]]
+                      for (sx, sy), (ex, ey) in intervals],
+    }
+
+
+def solve_record(record):
+    """
+    Solve one input record, returning a JSON-serializable result. Never
+    raises: whatever goes wrong becomes the result's error field, so one
+    bad record cannot stop a batch.
+    """
+    if isinstance(record, ValueError):
+        # A line read_records could not parse
+        return {'error': str(record)}
+    output = {}
+    if isinstance(record, dict):
+        output = {key: value for key, value in record.items() if key not in DEFAULTS}
+    try:
+        f1, f2, settings = parse_record(record)
+    except ValueError as e:
+        output['error'] = str(e)
+        return output
+    except Exception as e:
+        output['error'] = f"Error: {str(e)}"
+        return output
+
+    try:
+        exact = polynomial_intersections(f1, f2, settings['domain_start'], settings['domain_end'])
+        if exact is not None:
+            # No sampling needed when there is no plot to draw
+            points, intervals = exact
+        elif settings['num_points'] > STREAMING_POINTS:
+            budget = SolveBudget(settings['time_limit'], settings['max_evaluations'])
+            points, intervals = [], []
+            for kind, value in stream_intersections(
+                    budget.guard(f1), budget.guard(f2),
+                    settings['domain_start'], settings['domain_end'],
+                    settings['num_points'], chunk_size=STREAMING_CHUNK,
+                    precision=settings['precision'],
+                    valid_domain_only=settings['valid_domain_only']):
+                (points if kind == 'point' else intervals).append(value)
+        else:
+            result = solve(f1, f2, **settings)
+            points, intervals = result.points, result.intervals
+    except Exception as e:
+        output['error'] = f"Error: {str(e)}"
+        return output
+
+    output.update(format_intersections(points, intervals, settings['precision']))
+    return output
+
+
+def run(records, output, workers=None, chunksize=16):
+    """Solve records across a process pool, streaming JSONL in input order."""
+    if workers == 1:
+        for result in map(solve_record, records):
+            output.write(json.dumps(result) + '\n')
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(solve_record, records, chunksize=chunksize):
+            output.write(json.dumps(result) + '\n')
+            output.flush()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Solve function pairs without the GUI.")
+    arg_parser.add_argument('input', help="JSONL or CSV file of function pairs, '-' for stdin")
+    arg_parser.add_argument('-o', '--output', default='-',
+                            help="JSONL output file (default: stdout)")
+    arg_parser.add_argument('-f', '--format', choices=['jsonl', 'csv'],
+                            help="input format (default: from file extension)")
+    arg_parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(),
+                            help="worker processes (default: all cores)")
+    args = arg_parser.parse_args(argv)
+
+    fmt = args.format or ('csv' if args.input.lower().endswith('.csv') else 'jsonl')
+    source = sys.stdin if args.input == '-' else open(args.input, newline='', encoding='utf-8')
+    target = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        run(read_records(source, fmt), target, workers=args.workers)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
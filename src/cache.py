@@ -0,0 +1,124 @@
+from collections import OrderedDict
+import threading
+from function_parser import FunctionParser
+
+
+class SampleCache:
+    """
+    Bounded LRU cache of sampled arrays.
+
+    Entries are tuples of NumPy arrays stored under hashable keys; the least
+    recently used entries are evicted once their total size exceeds max_bytes.
+    Safe to share between the GUI thread and solve workers.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        """Total bytes held by cached arrays."""
+        return self._size
+
+    def get(self, key):
+        """Return cached arrays for key, or None."""
+        with self._lock:
+            arrays = self._entries.get(key)
+            if arrays is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return arrays
+
+    def find(self, predicate):
+        """Return the most recently used (key, arrays) matching predicate(key, arrays)."""
+        with self._lock:
+            for key in reversed(self._entries):
+                arrays = self._entries[key]
+                if predicate(key, arrays):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return key, arrays
+            return None
+
+    def put(self, key, arrays):
+        """Store arrays under key, evicting least recently used entries."""
+        arrays = tuple(arrays)
+        for array in arrays:
+            array.flags.writeable = False
+        nbytes = sum(array.nbytes for array in arrays)
+        if nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._size -= sum(array.nbytes for array in self._entries.pop(key))
+            self._entries[key] = arrays
+            self._size += nbytes
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= sum(array.nbytes for array in evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+class ExpressionCache:
+    """
+    Bounded LRU cache of validated and compiled functions keyed on their text.
+
+    validate and compile mirror FunctionParser, but parse each text once
+    however often it is checked, so re-validating unchanged inputs on every
+    keystroke or solve costs a dictionary lookup. Compilation errors are not
+    cached. For use from the GUI thread.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _entry(self, func_str, parameter):
+        key = (func_str.strip(), bool(parameter))
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            entry = self._entries[key] = {}
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return entry
+
+    def validate(self, func_str, parameter=False):
+        """Cached FunctionParser.validate_function, returns (is_valid, error)."""
+        entry = self._entry(func_str, parameter)
+        if 'valid' not in entry:
+            entry['valid'] = FunctionParser.validate_function(func_str.strip(), parameter)
+        return entry['valid']
+
+    def compile(self, func_str, parameter=False):
+        """Cached FunctionParser.compile."""
+        entry = self._entry(func_str, parameter)
+        if 'expression' not in entry:
+            entry['expression'] = FunctionParser.compile(func_str.strip(), parameter)
+        return entry['expression']
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,821 @@
+import ast
+import functools
+import time
+import numpy as np
+from function_registry import FUNCTIONS
+
+
+# Name of the sweep parameter, accepted by parse(..., parameter=True)
+PARAMETER = 'a'
+
+# Deepest expression tree parse accepts; trees are compared as nested
+# tuples by the caches, which recurses once per level
+MAX_DEPTH = 500
+
+_BINARY_OPS = {
+    ast.Add: 'add',
+    ast.Sub: 'sub',
+    ast.Mult: 'mul',
+    ast.Div: 'div',
+    ast.Pow: 'pow',
+}
+
+
+def normalize(func_str):
+    """Normalize function string to Python expression syntax."""
+    return func_str.strip().lower().replace('^', '**')
+
+
+def parse(func_str, parameter=False):
+    """
+    Parse function string into an expression tree.
+
+    Nodes are tuples: ('const', value), ('x',), ('neg', a),
+    (op, a, b) for op in add/sub/mul/div/pow and ('call', name, a), plus
+    ('param',) for the sweep parameter when parameter is True.
+    Raises ValueError for anything outside the supported vocabulary or
+    nested deeper than MAX_DEPTH.
+    """
+    try:
+        tree = _convert(ast.parse(normalize(func_str), mode='eval').body, parameter)
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression: {e.msg}")
+    except (RecursionError, MemoryError):
+        raise ValueError("Expression is nested too deeply")
+    # Every node takes at least one character of the source
+    if len(func_str) > MAX_DEPTH and \
+            _fold(_postorder((tree,)), lambda _, depths: 1 + max(depths, default=0)) > MAX_DEPTH:
+        raise ValueError("Expression is nested too deeply")
+    return tree
+
+
+def _convert(node, parameter=False):
+    """Convert a Python AST node into an expression tree node."""
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ValueError(f"Unsupported constant: {node.value!r}")
+        try:
+            return ('const', float(node.value))
+        except OverflowError:
+            # Integer literals beyond float range overflow like float arithmetic
+            return ('const', np.inf)
+
+    if isinstance(node, ast.Name):
+        if parameter and node.id == PARAMETER:
+            return ('param',)
+        if node.id != 'x':
+            raise ValueError(f"Unknown name: {node.id}")
+        return ('x',)
+
+    if isinstance(node, ast.UnaryOp):
+        operand = _convert(node.operand, parameter)
+        if isinstance(node.op, ast.USub):
+            return ('neg', operand)
+        if isinstance(node.op, ast.UAdd):
+            return operand
+        raise ValueError("Unsupported unary operator")
+
+    if isinstance(node, ast.BinOp):
+        # Chains like x+x+...+x nest to the left, walk them with a loop
+        spine = []
+        while isinstance(node, ast.BinOp):
+            op = _BINARY_OPS.get(type(node.op))
+            if op is None:
+                raise ValueError("Unsupported operator")
+            spine.append((op, node.right))
+            node = node.left
+        result = _convert(node, parameter)
+        for op, right in reversed(spine):
+            result = (op, result, _convert(right, parameter))
+        return result
+
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+            raise ValueError("Unsupported function call")
+        if len(node.args) != 1 or node.keywords:
+            raise ValueError(f"{node.func.id}() takes exactly one argument")
+        return ('call', node.func.id, _convert(node.args[0], parameter))
+
+    raise ValueError(f"Unsupported syntax: {type(node).__name__}")
+
+
+_UFUNCS = {
+    'add': np.add,
+    'sub': np.subtract,
+    'mul': np.multiply,
+    'div': np.divide,
+    'pow': np.power,
+}
+
+# Integer exponents rewritten into multiplications by optimize
+STRENGTH_REDUCED_POWERS = (0, 1, 2, 3, 4)
+
+
+def _operands(node):
+    """Operand subtrees of an expression tree node."""
+    kind = node[0]
+    if kind == 'call':
+        return node[2:]
+    if kind in ('const', 'x', 'param'):
+        return ()
+    return node[1:]
+
+
+def _postorder(roots):
+    """
+    Distinct subtrees of expression trees, operands before the nodes using
+    them and left before right, as (subtree, operand positions) pairs where
+    the positions index the returned list. Walks with an explicit stack,
+    so long chains like x+x+...+x do not exhaust the interpreter stack.
+    """
+    order, position = [], {}
+    # Nodes are pushed without operands, then again with their operands
+    # below the operands themselves
+    stack = [(root, None) for root in reversed(roots)]
+    while stack:
+        node, operands = stack.pop()
+        if id(node) in position:
+            continue
+        if operands is None:
+            operands = _operands(node)
+            stack.append((node, operands))
+            stack.extend((operand, None) for operand in reversed(operands))
+        else:
+            position[id(node)] = len(order)
+            order.append((node, [position[id(operand)] for operand in operands]))
+    return order
+
+
+def _fold(order, combine):
+    """
+    Reduce the _postorder of an expression tree bottom-up with
+    combine(subtree, operand results), returns the result of the root.
+    """
+    results = []
+    for subtree, operands in order:
+        results.append(combine(subtree, list(map(results.__getitem__, operands))))
+    return results[-1]
+
+
+def optimize(node):
+    """
+    Optimize an expression tree for evaluation.
+
+    Subtrees of constants are folded into one constant, computed with the
+    same floating-point operations evaluation would use, and powers with
+    an exponent in STRENGTH_REDUCED_POWERS become products of the base
+    (x^4 -> (x*x)*(x*x)), which Program shares as common subterms.
+    """
+    return _fold(_postorder((node,)), _optimize_node)
+
+
+def _optimize_node(node, operands):
+    """Optimize one node whose operands are already optimized."""
+    kind = node[0]
+    if kind in ('const', 'x', 'param'):
+        return node
+
+    operands = tuple(operands)
+    if kind == 'call':
+        node = ('call', node[1]) + operands
+    else:
+        node = (kind,) + operands
+
+    if all(child[0] == 'const' for child in operands):
+        values = [np.float64(child[1]) for child in operands]
+        with np.errstate(all='ignore'):
+            if kind == 'neg':
+                value = np.negative(values[0])
+            elif kind == 'call':
+                value = FUNCTIONS[node[1]].kernel(values[0])
+            else:
+                value = _UFUNCS[kind](*values)
+        return ('const', float(value))
+
+    if kind == 'pow' and operands[1][0] == 'const' and \
+            operands[1][1] in STRENGTH_REDUCED_POWERS:
+        base, exponent = operands[0], int(operands[1][1])
+        square = ('mul', base, base)
+        # u ** 0 is 1 even for NaN and infinite u
+        return [('const', 1.0), base, square, ('mul', square, base),
+                ('mul', square, square)][exponent]
+
+    return node
+
+
+class Program:
+    """
+    Straight-line evaluation plan for one or more expression trees.
+
+    The trees are optimized and hash-consed: structurally equal subterms,
+    within one tree or across trees, become a single instruction, so each
+    distinct subterm is computed once per sample array. Intermediate
+    arrays are released after their last use.
+    """
+
+    def __init__(self, trees):
+        self.trees = tuple(trees)
+        self.instructions = []
+        # Kept alive while emitting, _postorder is keyed on node ids
+        optimized = [optimize(tree) for tree in self.trees]
+        order = _postorder(optimized)
+        # One visit per tree and per operand of a distinct node; operands
+        # shared by optimize are visited again but emitted once
+        self.subterms = len(optimized) + sum(len(operands) for _, operands in order)
+        slots, node_slots, position = {}, [], {}
+        for node, operands in order:
+            position[id(node)] = len(node_slots)
+            node_slots.append(self._emit(node, list(map(node_slots.__getitem__, operands)), slots))
+        self.outputs = [node_slots[position[id(tree)]] for tree in optimized]
+
+        # Slots whose value is no longer needed after each instruction
+        last_use = {}
+        for index, (kind, operands) in enumerate(self.instructions):
+            for operand in self._slot_operands(kind, operands):
+                last_use[operand] = index
+        for output in self.outputs:
+            last_use[output] = len(self.instructions)
+        self._released = [[] for _ in self.instructions]
+        for slot, index in last_use.items():
+            if index < len(self.instructions):
+                self._released[index].append(slot)
+
+    def _emit(self, node, operand_slots, slots):
+        """
+        Append an instruction computing node from the slots of its operands,
+        returns its slot. Instructions are keyed by operation and operand
+        slots, so lookups stay O(1) however large the subterm.
+        """
+        kind = node[0]
+        if kind == 'const':
+            # hex() keeps -0.0 and 0.0 apart
+            operands = node[1:]
+            key = ('const', float(node[1]).hex())
+        elif kind in ('x', 'param'):
+            operands = key = ()
+        elif kind == 'call':
+            operands = (node[1], operand_slots[0])
+        else:
+            operands = tuple(operand_slots)
+        if kind not in ('const', 'x', 'param'):
+            key = operands
+        key = (kind, key)
+
+        if key not in slots:
+            self.instructions.append((kind, operands))
+            slots[key] = len(self.instructions) - 1
+        return slots[key]
+
+    @staticmethod
+    def _slot_operands(kind, operands):
+        if kind in ('const', 'x', 'param'):
+            return ()
+        if kind == 'call':
+            return operands[1:]
+        return operands
+
+    def __call__(self, x, parameter=np.nan):
+        """
+        Evaluate all trees on x, returns one result per tree. Results of
+        constant trees are scalars; parameter nodes evaluate to parameter,
+        which broadcasts against x.
+        """
+        values = [None] * len(self.instructions)
+        for index, (kind, operands) in enumerate(self.instructions):
+            if kind == 'x':
+                value = x
+            elif kind == 'const':
+                value = np.float64(operands[0])
+            elif kind == 'param':
+                value = parameter
+            elif kind == 'neg':
+                value = np.negative(values[operands[0]])
+            elif kind == 'call':
+                value = FUNCTIONS[operands[0]].kernel(values[operands[1]])
+            else:
+                value = _UFUNCS[kind](values[operands[0]], values[operands[1]])
+            values[index] = value
+            for slot in self._released[index]:
+                values[slot] = None
+        return [values[output] for output in self.outputs]
+
+    def explain(self, names=None):
+        """Readable listing of the instructions and the slot of each tree."""
+        names = names or [f"f{number}" for number in range(1, len(self.trees) + 1)]
+        lines = []
+        for index, (kind, operands) in enumerate(self.instructions):
+            if kind in ('x', 'param'):
+                text = PARAMETER if kind == 'param' else 'x'
+            elif kind == 'const':
+                text = f"{operands[0]:g}"
+            elif kind == 'call':
+                text = f"{operands[0]}(%{operands[1]})"
+            else:
+                text = f"{kind} " + " ".join(f"%{operand}" for operand in operands)
+            lines.append(f"%{index} = {text}")
+        lines.extend(f"{name} = %{output}" for name, output in zip(names, self.outputs))
+        lines.append(f"{len(self.instructions)} instructions for {self.subterms} subterms")
+        return "\n".join(lines)
+
+
+@functools.lru_cache(maxsize=256)
+def _shared_program(trees):
+    """Program for a tuple of trees, cached across calls."""
+    return Program(trees)
+
+
+def explain(expressions):
+    """Optimized evaluation plan shared by compiled expressions, as text."""
+    program = Program(expression.tree for expression in expressions)
+    sources = [f"f{number}(x) = {expression.source}"
+               for number, expression in enumerate(expressions, start=1)]
+    return "\n".join(sources + [program.explain()])
+
+
+def _build_jet(order):
+    """
+    Build a forward-mode differentiation closure for the _postorder of an
+    expression tree, returning (value, first derivative, second derivative)
+    arrays. Each subtree becomes one step, evaluated operands first.
+    """
+    steps = [(_jet_step(subtree), operands) for subtree, operands in order]
+
+    def jet(x):
+        jets = []
+        for step, operands in steps:
+            jets.append(step(x, *map(jets.__getitem__, operands)))
+        return jets[-1]
+    return jet
+
+
+def _jet_step(node):
+    """Jet of one node from x and the jets of its operands."""
+    kind = node[0]
+
+    if kind in ('const', 'param'):
+        # An unbound parameter has no value
+        value = node[1] if kind == 'const' else np.nan
+        return lambda x: (np.full(x.shape, value), np.zeros(x.shape), np.zeros(x.shape))
+
+    if kind == 'x':
+        return lambda x: (x, np.ones(x.shape), np.zeros(x.shape))
+
+    if kind == 'neg':
+        return lambda x, operand: tuple(np.negative(part) for part in operand)
+
+    if kind == 'call':
+        function = FUNCTIONS[node[1]]
+
+        def call(x, arg):
+            u, du, d2u = arg
+            slope = function.first(u)
+            return function.kernel(u), slope * du, function.second(u) * du * du + slope * d2u
+        return call
+
+    if kind in ('add', 'sub'):
+        ufunc = np.add if kind == 'add' else np.subtract
+        return lambda x, left, right: tuple(ufunc(a, b) for a, b in zip(left, right))
+
+    if kind == 'mul':
+        def mul(x, left, right):
+            (u, du, d2u), (v, dv, d2v) = left, right
+            return u * v, du * v + u * dv, d2u * v + 2 * du * dv + u * d2v
+        return mul
+
+    if kind == 'div':
+        def div(x, left, right):
+            (u, du, d2u), (v, dv, d2v) = left, right
+            w = u / v
+            dw = (du - w * dv) / v
+            return w, dw, (d2u - 2 * dw * dv - w * d2v) / v
+        return div
+
+    if node[2][0] == 'const':
+        # Constant exponent: power rule, valid for negative bases too
+        exponent = node[2][1]
+
+        def power(x, left, right):
+            u, du, d2u = left
+            # Vanishing terms stay zero rather than 0 * inf at u = 0
+            slope = exponent * np.power(u, exponent - 1) if exponent != 0 else 0.0
+            curvature = exponent * (exponent - 1) * np.power(u, exponent - 2) \
+                if exponent not in (0, 1) else 0.0
+            return np.power(u, exponent), slope * du, curvature * du * du + slope * d2u
+        return power
+
+    def general_power(x, left, right):
+        # u ** v = exp(v * ln(u))
+        (u, du, d2u), (v, dv, d2v) = left, right
+        w = np.power(u, v)
+        log_u = np.log(u)
+        dl = dv * log_u + v * du / u
+        d2l = d2v * log_u + 2 * dv * du / u + v * (d2u / u - du * du / (u * u))
+        return w, w * dl, w * (d2l + dl * dl)
+    return general_power
+
+
+def _collect_restrictions(order):
+    """
+    (restriction type, predicate, argument evaluator) of the restricted calls
+    in the _postorder of an expression tree, innermost first.
+    """
+    found = []
+    for subtree, _ in order:
+        if subtree[0] == 'call' and FUNCTIONS[subtree[1]].restriction is not None:
+            function = FUNCTIONS[subtree[1]]
+            argument = _shared_program((subtree[2],))
+            found.append((function.restriction, function.invalid,
+                          lambda x, argument=argument: argument(x)[0]))
+    return found
+
+
+def _bind(node, value):
+    """Replace parameter nodes of an expression tree by a constant."""
+    def bind(subtree, operands):
+        if subtree[0] == 'param':
+            return ('const', value)
+        return subtree[:len(subtree) - len(operands)] + tuple(operands)
+    return _fold(_postorder((node,)), bind)
+
+
+# Highest polynomial degree expanded by polynomial_coefficients
+MAX_POLYNOMIAL_DEGREE = 64
+
+
+def polynomial_coefficients(order):
+    """
+    Expand the _postorder of an expression tree into polynomial
+    coefficients in x.
+    Returns ascending-power coefficient array, or None if the tree is not a
+    polynomial (or would exceed MAX_POLYNOMIAL_DEGREE, or has coefficients
+    beyond float range).
+    """
+    with np.errstate(all='ignore'):
+        coefficients = _fold(order, _expand_polynomial)
+    if coefficients is None or not np.all(np.isfinite(coefficients)):
+        return None
+    return coefficients
+
+
+def _expand_polynomial(node, operands):
+    """
+    Ascending coefficients of node from those of its operands, possibly
+    non-finite, or None.
+    """
+    kind = node[0]
+
+    if kind == 'const':
+        return np.array([node[1]])
+
+    if kind == 'x':
+        return np.array([0.0, 1.0])
+
+    if kind == 'param':
+        return None
+
+    if kind == 'neg':
+        return None if operands[0] is None else -operands[0]
+
+    if kind == 'call':
+        # Functions of constants are constants, e.g. sqrt(16)
+        arg = operands[0]
+        if arg is None or len(arg) != 1:
+            return None
+        with np.errstate(all='ignore'):
+            value = FUNCTIONS[node[1]].kernel(arg[0])
+        return np.array([value]) if np.isfinite(value) else None
+
+    left, right = operands
+    if left is None or right is None:
+        return None
+
+    if kind in ('add', 'sub'):
+        result = np.zeros(max(len(left), len(right)))
+        result[:len(left)] += left
+        result[:len(right)] += right if kind == 'add' else -right
+        return result
+
+    if kind == 'mul':
+        if len(left) + len(right) - 2 > MAX_POLYNOMIAL_DEGREE:
+            return None
+        return np.convolve(left, right)
+
+    if kind == 'div':
+        # Only division by a non-zero constant keeps a polynomial
+        if len(right) != 1 or right[0] == 0:
+            return None
+        return left / right[0]
+
+    # Power: constant base and exponent, or a small non-negative integer exponent
+    if len(right) != 1:
+        return None
+    exponent = right[0]
+    if len(left) == 1:
+        with np.errstate(all='ignore'):
+            value = np.power(left[0], exponent)
+        return np.array([value]) if np.isfinite(value) else None
+    # Integer literals beyond float range parse as infinite exponents
+    if not np.isfinite(exponent) or exponent != int(exponent) or exponent < 0 or \
+            (len(left) - 1) * exponent > MAX_POLYNOMIAL_DEGREE:
+        return None
+    result = np.array([1.0])
+    for _ in range(int(exponent)):
+        result = np.convolve(result, left)
+    return result
+
+
+def polynomial_difference(f1, f2):
+    """Ascending coefficients of f1 - f2 for two compiled polynomials, else None."""
+    if f1.coefficients is None or f2.coefficients is None:
+        return None
+    difference = np.zeros(max(len(f1.coefficients), len(f2.coefficients)))
+    difference[:len(f1.coefficients)] += f1.coefficients
+    difference[:len(f2.coefficients)] -= f2.coefficients
+    return difference
+
+
+# Bisection limit of valid_subdomains before it gives up on an expression
+MAX_DOMAIN_BOXES = 20000
+
+_UNBOUNDED = (-np.inf, np.inf)
+
+
+def _hull(values):
+    """Bounds of candidate endpoint values, ignoring 0 * inf products."""
+    values = [value for value in values if not np.isnan(value)]
+    if not values:
+        return _UNBOUNDED
+    return min(values), max(values)
+
+
+def _reciprocal(low, high):
+    """Bounds of 1 / v for v in [low, high]."""
+    if low <= 0 <= high:
+        return _UNBOUNDED
+    return 1 / high, 1 / low
+
+
+def _integer_power(low, high, n):
+    """Bounds of v ** n for v in [low, high] and a non-negative integral n."""
+    if n == 0:
+        return 1.0, 1.0
+    lo, hi = low ** n, high ** n
+    if n % 2:
+        return lo, hi
+    if low >= 0:
+        return lo, hi
+    if high <= 0:
+        return hi, lo
+    return 0.0, max(lo, hi)
+
+
+def _interval(node, operands, low, high, verdicts):
+    """
+    Bounds of an expression tree node over x in [low, high], given the
+    bounds of its operands.
+
+    Bounds of a restricted call cover only the arguments it is defined for.
+    verdicts collects one entry per restriction: True where it holds on the
+    whole box, False where it fails on the whole box, None if undecided.
+    """
+    kind = node[0]
+
+    if kind == 'const':
+        return np.float64(node[1]), np.float64(node[1])
+
+    if kind == 'x':
+        return np.float64(low), np.float64(high)
+
+    if kind == 'param':
+        return _UNBOUNDED
+
+    if kind == 'neg':
+        lo, hi = operands[0]
+        return -hi, -lo
+
+    if kind == 'call':
+        lo, hi = operands[0]
+        function = FUNCTIONS[node[1]]
+        if function.restriction is not None:
+            # Every restriction rejects a half-line of arguments below a threshold
+            verdicts.append(False if function.invalid(hi) else
+                            None if function.invalid(lo) else True)
+        lo, hi = function.bounds(lo, hi)
+        return _UNBOUNDED if np.isnan(lo) or np.isnan(hi) else (lo, hi)
+
+    (a, b), (c, d) = operands
+
+    if kind == 'add':
+        bounds = (a + c, b + d)
+    elif kind == 'sub':
+        bounds = (a - d, b - c)
+    elif kind == 'mul':
+        bounds = _hull((a * c, a * d, b * c, b * d))
+    elif kind == 'div':
+        rc, rd = _reciprocal(c, d)
+        bounds = _hull((a * rc, a * rd, b * rc, b * rd))
+    elif a > 0:
+        # Positive bases are monotonic in both base and exponent
+        bounds = _hull((a ** c, a ** d, b ** c, b ** d))
+    elif c != d or not np.isfinite(c):
+        bounds = _UNBOUNDED
+    elif c == np.round(c):
+        bounds = _integer_power(a, b, abs(c))
+        if c < 0:
+            bounds = _reciprocal(*bounds)
+    else:
+        # Fractional powers are only defined for non-negative bases
+        lo, hi = np.maximum(a, 0.0) ** c, np.maximum(b, 0.0) ** c
+        bounds = (lo, hi) if c > 0 else (hi, lo)
+
+    if np.isnan(bounds[0]) or np.isnan(bounds[1]):
+        return _UNBOUNDED
+    return bounds
+
+
+class CompiledExpression:
+    """Vectorized evaluator for a parsed function string."""
+
+    def __init__(self, func_str, parameter=False, tree=None):
+        self.source = func_str
+        # The tree is hashable and independent of spacing and case, so it
+        # doubles as the normalized cache key of the expression
+        self.tree = tree if tree is not None else parse(func_str, parameter)
+        try:
+            # Subtrees operands first, shared by the walks below
+            self._order = _postorder((self.tree,))
+            self.has_parameter = any(node[0] == 'param' for node, _ in self._order)
+            self._program = _shared_program((self.tree,))
+            self._jet = _build_jet(self._order)
+            self._restrictions = _collect_restrictions(self._order)
+            # Ascending coefficients when the expression is a polynomial, else None
+            self.coefficients = polynomial_coefficients(self._order)
+        except RecursionError:
+            raise ValueError("Expression is nested too deeply")
+
+    def __call__(self, x_values):
+        """Evaluate over an array of x values, NaN where undefined."""
+        x = np.asarray(x_values, dtype=np.float64)
+        with np.errstate(all='ignore'):
+            y = self._program(x)[0]
+        # Constant trees evaluate to scalars
+        if np.shape(y) != x.shape:
+            y = np.broadcast_to(y, x.shape)
+        y = np.array(y, dtype=np.float64)
+        y[~np.isfinite(y)] = np.nan
+        return y
+
+    def sweep(self, x_values, parameters):
+        """
+        Evaluate over a (parameters x x values) grid in one broadcast pass.
+        Returns a (len(parameters), len(x)) array, NaN where undefined.
+        """
+        x = np.asarray(x_values, dtype=np.float64)
+        a = np.asarray(parameters, dtype=np.float64)
+        with np.errstate(all='ignore'):
+            y = self._program(x[np.newaxis, :], a[:, np.newaxis])[0]
+            y = np.array(np.broadcast_to(y, (len(a), len(x))), dtype=np.float64)
+        y[~np.isfinite(y)] = np.nan
+        return y
+
+    def bind(self, value):
+        """Compiled expression with the parameter fixed to value."""
+        if not self.has_parameter:
+            return self
+        return CompiledExpression(self.source, tree=_bind(self.tree, float(value)))
+
+    def derivatives(self, x_values):
+        """
+        Evaluate with forward-mode automatic differentiation.
+        Returns (y, dy/dx, d2y/dx2) arrays, NaN where undefined.
+        """
+        x = np.asarray(x_values, dtype=np.float64)
+        with np.errstate(all='ignore'):
+            parts = [np.array(np.broadcast_to(part, x.shape), dtype=np.float64)
+                     for part in self._jet(x)]
+        for part in parts:
+            part[~np.isfinite(part)] = np.nan
+        return tuple(parts)
+
+    def domain_mask(self, x_values):
+        """
+        Check the domain restrictions of restricted functions (sqrt, log10,
+        ln) over an array of x values.
+        Returns (valid, restriction) arrays - restriction holds the failing
+        restriction type per point ('sqrt' or 'log') and None where valid.
+        """
+        x = np.asarray(x_values, dtype=np.float64)
+        valid = np.ones(x.shape, dtype=bool)
+        restriction = np.full(x.shape, None, dtype=object)
+        if not self._restrictions:
+            return valid, restriction
+        with np.errstate(all='ignore'):
+            for kind, predicate, argument in self._restrictions:
+                failed = valid & predicate(argument(x))
+                restriction[failed] = kind
+                valid &= ~failed
+        return valid, restriction
+
+    def valid_subdomains(self, domain_start, domain_end, max_boxes=MAX_DOMAIN_BOXES,
+                         time_limit=None):
+        """
+        Sub-intervals of the domain where all domain restrictions hold.
+
+        Boxes are classified with interval arithmetic and bisected while
+        undecided. Boxes still undecided at a millionth of the domain width
+        are settled point-wise: a validity change between their ends is
+        bisected with domain_mask down to float resolution. Returns a sorted
+        list of (start, end) pairs, or None if the analysis needs more than
+        max_boxes boxes or time_limit seconds.
+        """
+        low, high = min(domain_start, domain_end), max(domain_start, domain_end)
+        if not self._restrictions:
+            return [(low, high)]
+
+        min_width = (high - low) * 1e-6
+        deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        boxes = [(low, high)]
+        valid, undecided = [], []
+        with np.errstate(all='ignore'):
+            while boxes:
+                max_boxes -= 1
+                if max_boxes < 0 or (deadline is not None and time.perf_counter() > deadline):
+                    return None
+                a, b = boxes.pop()
+                verdicts, bounds = [], []
+                for node, operands in self._order:
+                    bounds.append(_interval(node, list(map(bounds.__getitem__, operands)),
+                                            a, b, verdicts))
+                if all(verdicts):
+                    valid.append((a, b))
+                elif False in verdicts:
+                    continue
+                elif b - a <= min_width:
+                    undecided.append((a, b))
+                else:
+                    middle = (a + b) / 2
+                    boxes.extend(((middle, b), (a, middle)))
+
+        if undecided:
+            valid.extend(self._settle_boxes(np.array(undecided), (high - low) * 1e-18))
+
+        merged = []
+        for a, b in sorted(valid):
+            if merged and a <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], b))
+            else:
+                merged.append((a, b))
+        return merged
+
+    def _settle_boxes(self, boxes, resolution):
+        """
+        Valid parts of small undecided boxes, assuming at most one boundary
+        each; boundaries are bisected to adjacent floats or resolution.
+        """
+        a, b = boxes[:, 0], boxes[:, 1]
+        valid_a, valid_b = self.domain_mask(a)[0], self.domain_mask(b)[0]
+
+        # Bisect the boundary between a valid and an invalid end, keeping
+        # lo on the side of a and hi on the side of b
+        lo, hi = a.copy(), b.copy()
+        changing = valid_a != valid_b
+        while True:
+            middle = (lo + hi) / 2
+            active = changing & (middle > lo) & (middle < hi) & (hi - lo > resolution)
+            if not active.any():
+                break
+            same = self.domain_mask(middle)[0] == valid_a
+            lo = np.where(active & same, middle, lo)
+            hi = np.where(active & ~same, middle, hi)
+
+        settled = []
+        for i in range(len(boxes)):
+            if not changing[i]:
+                if valid_a[i]:
+                    settled.append((a[i], b[i]))
+            elif valid_a[i]:
+                settled.append((a[i], lo[i]))
+            else:
+                settled.append((hi[i], b[i]))
+        return [(float(start), float(end)) for start, end in settled]
+
+
+def evaluate_all(expressions, x_values):
+    """
+    Evaluate compiled expressions on one shared grid, computing subterms
+    they have in common once.
+    Returns an (N, len(x)) array with one row per expression. Expressions
+    that define charge(count) are charged for the points first.
+    """
+    x = np.asarray(x_values, dtype=np.float64)
+    for expression in expressions:
+        charge = getattr(expression, 'charge', None)
+        if charge is not None:
+            charge(x.size)
+    program = _shared_program(tuple(expression.tree for expression in expressions))
+    ys = np.empty((len(expressions), len(x)))
+    with np.errstate(all='ignore'):
+        for row, y in zip(ys, program(x)):
+            row[:] = y
+    ys[~np.isfinite(ys)] = np.nan
+    return ys
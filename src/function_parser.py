@@ -1,20 +1,38 @@
+import functools
 import re
-from math import sqrt, log10
+import numpy as np
+from expression import PARAMETER, CompiledExpression, explain, polynomial_difference
+from function_registry import FUNCTIONS
+
+
+@functools.lru_cache(maxsize=256)
+def _compiled(func_str, parameter=False):
+    """CompiledExpression for a function string, cached across calls."""
+    return CompiledExpression(func_str, parameter)
 
 
 class FunctionParser:
     """Parse and evaluate mathematical functions."""
 
     @staticmethod
-    def validate_function(func_str):
+    def validate_function(func_str, parameter=False):
         """
-        Validate function string format.
+        Validate function string format, allowing the sweep parameter a
+        when parameter is True.
         Returns (bool, str) tuple - (is_valid, error_message)
         """
-        # Check for invalid characters
-        allowed = set('x0123456789+-*/^().log sqrt')
-        if not all(c in allowed for c in func_str.lower()):
-            return False, "Invalid characters detected. Allowed: numbers, x, +, -, *, /, ^, log10(), sqrt()"
+        # Check for invalid characters and unknown names: every identifier
+        # must be x, a registered function or, when enabled, the parameter
+        names = sorted(FUNCTIONS, key=len, reverse=True)
+        identifiers = set(FUNCTIONS) | {'x'} | ({PARAMETER} if parameter else set())
+        unknown = re.sub(r'[a-z_][a-z0-9_]*',
+                         lambda match: '' if match.group() in identifiers else '$',
+                         func_str.lower())
+        if not all(c in '0123456789+-*/^(). ' for c in unknown):
+            variables = "x, a" if parameter else "x"
+            calls = ", ".join(f"{name}()" for name in FUNCTIONS)
+            return False, (f"Invalid characters detected. "
+                           f"Allowed: numbers, {variables}, +, -, *, /, ^, {calls}")
 
         # Check for balanced parentheses
         if func_str.count('(') != func_str.count(')'):
@@ -24,9 +42,11 @@ class FunctionParser:
         try:
             # Replace valid function patterns with 'x' to simplify validation
             simplified = func_str.lower()
-            simplified = re.sub(r'log10\([^)]+\)', 'x', simplified)
-            simplified = re.sub(r'sqrt\([^)]+\)', 'x', simplified)
+            for name in names:
+                simplified = re.sub(re.escape(name) + r'\([^)]+\)', 'x', simplified)
             simplified = re.sub(r'\d+\.?\d*', 'x', simplified)
+            if parameter:
+                simplified = simplified.replace(PARAMETER, 'x')
 
             # Check remaining format
             valid_pattern = r'^[x+\-*/^\s()]+$'
@@ -41,54 +61,58 @@ class FunctionParser:
     @staticmethod
     def check_domain_restrictions(func_str, x_val):
         """
-        Check domain restrictions for sqrt and log10.
+        Check the domain restrictions of sqrt, log10 and ln.
         Returns (bool, str) tuple - (is_valid, restriction_type)
         """
-        expr = func_str.lower()
-
-        # Extract arguments of sqrt and log10 functions
-        sqrt_matches = re.finditer(r'sqrt\(([^)]+)\)', expr)
-        log_matches = re.finditer(r'log10\(([^)]+)\)', expr)
-
-        # Check sqrt arguments
-        for match in sqrt_matches:
-            arg = match.group(1)
-            try:
-                value = eval(arg.replace('x', str(x_val)), {"__builtins__": {}}, {'sqrt': sqrt, 'log10': log10})
-                if value < 0:
-                    return False, 'sqrt'
-            except:
-                continue
-
-        # Check log10 arguments
-        for match in log_matches:
-            arg = match.group(1)
-            try:
-                value = eval(arg.replace('x', str(x_val)), {"__builtins__": {}}, {'sqrt': sqrt, 'log10': log10})
-                if value <= 0:
-                    return False, 'log'
-            except:
-                continue
-
-        return True, None
+        try:
+            valid, restriction = FunctionParser.domain_mask(func_str, [x_val])
+        except ValueError:
+            return True, None
+        return bool(valid[0]), restriction[0]
 
     @staticmethod
-    def evaluate(func_str, x_val):
-        """Evaluate function at given x value."""
-        # Replace mathematical operations with Python syntax
-        expr = func_str.lower().replace('^', '**')
+    def domain_mask(func_str, x_values):
+        """
+        Check domain restrictions over a whole array of x values.
+        Returns (valid, restriction) arrays - boolean validity mask and the
+        failing restriction type per point ('sqrt', 'log' or None).
+        """
+        return _compiled(func_str).domain_mask(x_values)
 
-        # Handle special functions
-        expr = expr.replace('log10', 'log10').replace('sqrt', 'sqrt')
+    @staticmethod
+    def compile(func_str, parameter=False):
+        """
+        Parse function once into a vectorized evaluator.
+        Returns callable mapping an x array to a float64 array (NaN where undefined).
+        With parameter, the expression may use the sweep parameter a.
+        """
+        return CompiledExpression(func_str, parameter)
 
-        # Create safe local environment
-        safe_dict = {
-            'x': x_val,
-            'sqrt': sqrt,
-            'log10': log10
-        }
+    @staticmethod
+    def explain(*func_strs):
+        """
+        Optimized evaluation plan of one or more functions, as text: the
+        instructions left after constant folding and power reduction, with
+        subterms shared between the functions computed once.
+        """
+        return explain([_compiled(func_str) for func_str in func_strs])
+
+    @staticmethod
+    def polynomial_difference(func1_str, func2_str):
+        """
+        Coefficients of f1 - f2 in ascending powers of x when both functions
+        are polynomials, otherwise None.
+        """
+        return polynomial_difference(_compiled(func1_str), _compiled(func2_str))
 
+    @staticmethod
+    def evaluate(func_str, x_val):
+        """
+        Evaluate function at given x value in floating point.
+        Returns NaN where the function is undefined or overflows.
+        """
         try:
-            return eval(expr, {"__builtins__": {}}, safe_dict)
-        except Exception as e:
+            expression = _compiled(func_str)
+        except ValueError as e:
             raise ValueError(f"Error evaluating function: {str(e)}")
+        return float(expression(np.array([x_val], dtype=np.float64))[0])
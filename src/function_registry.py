@@ -0,0 +1,86 @@
+import numpy as np
+
+
+class MathFunction:
+    """
+    A function of one argument usable in expressions.
+
+    kernel is the vectorized NumPy implementation, first and second its
+    derivatives and bounds(low, high) the range of the function over
+    arguments in [low, high], used by interval arithmetic. A restricted
+    function names its restriction type (e.g. 'log') and an invalid
+    predicate flagging the arguments it is undefined for; the predicate
+    must reject a half-line of arguments below some threshold.
+    """
+
+    def __init__(self, name, kernel, first, second, bounds, restriction=None, invalid=None):
+        self.name = name
+        self.kernel = kernel
+        self.first = first
+        self.second = second
+        self.bounds = bounds
+        self.restriction = restriction
+        self.invalid = invalid
+
+
+def _increasing(kernel, domain_start=-np.inf):
+    """Bounds of a kernel increasing on [domain_start, inf), clipped to it."""
+    return lambda low, high: (kernel(np.maximum(low, domain_start)),
+                              kernel(np.maximum(high, domain_start)))
+
+
+def _sin_bounds(low, high):
+    """Bounds of sin over [low, high]."""
+    if not (np.isfinite(low) and np.isfinite(high)) or high - low >= 2 * np.pi:
+        return np.float64(-1.0), np.float64(1.0)
+    values = [np.sin(low), np.sin(high)]
+    # Extrema at pi/2 + k*pi inside the interval
+    peak = np.pi / 2 + np.ceil((low - np.pi / 2) / np.pi) * np.pi
+    while peak <= high:
+        values.append(np.sin(peak))
+        peak += np.pi
+    return np.float64(min(values)), np.float64(max(values))
+
+
+def _abs_bounds(low, high):
+    """Bounds of abs over [low, high]."""
+    if low >= 0:
+        return low, high
+    if high <= 0:
+        return -high, -low
+    return np.float64(0.0), max(-low, high)
+
+
+REGISTRY = [
+    MathFunction('sqrt', np.sqrt,
+                 lambda value: 0.5 / np.sqrt(value),
+                 lambda value: -0.25 / (value * np.sqrt(value)),
+                 _increasing(np.sqrt, 0.0),
+                 restriction='sqrt', invalid=lambda value: value < 0),
+    MathFunction('log10', np.log10,
+                 lambda value: 1 / (value * np.log(10)),
+                 lambda value: -1 / (value * value * np.log(10)),
+                 _increasing(np.log10, 0.0),
+                 restriction='log', invalid=lambda value: value <= 0),
+    MathFunction('ln', np.log,
+                 lambda value: 1 / value,
+                 lambda value: -1 / (value * value),
+                 _increasing(np.log, 0.0),
+                 restriction='log', invalid=lambda value: value <= 0),
+    MathFunction('exp', np.exp, np.exp, np.exp, _increasing(np.exp)),
+    MathFunction('sin', np.sin, np.cos, lambda value: -np.sin(value), _sin_bounds),
+    MathFunction('cos', np.cos,
+                 lambda value: -np.sin(value),
+                 lambda value: -np.cos(value),
+                 lambda low, high: _sin_bounds(low + np.pi / 2, high + np.pi / 2)),
+    MathFunction('abs', np.abs, np.sign, np.zeros_like, _abs_bounds),
+]
+
+# Supported functions by name
+FUNCTIONS = {function.name: function for function in REGISTRY}
+
+# What a violated restriction means, for messages
+RESTRICTION_MESSAGES = {
+    'sqrt': "square root of negative values",
+    'log': "logarithm of non-positive values",
+}
@@ -0,0 +1,115 @@
+import numpy as np
+
+
+def find_intersections(x_array, y1_array, y2_array, tolerance=1e-6):
+    """Find both point intersections and intersection intervals."""
+    x = np.asarray(x_array, dtype=np.float64)
+    y1 = np.asarray(y1_array, dtype=np.float64)
+    y2 = np.asarray(y2_array, dtype=np.float64)
+    if len(x) < 2:
+        return [], []
+
+    point_idx, point_x, point_y, starts, ends = _intersection_indices(x, y1, y2, tolerance)
+    points = list(zip(point_x.tolist(), point_y.tolist()))
+    intervals = [((sx, sy), (ex, ey)) for sx, sy, ex, ey in zip(
+        x[starts].tolist(), y1[starts].tolist(), x[ends].tolist(), y1[ends].tolist())]
+
+    return points, intervals
+
+
+def find_all_intersections(x_array, y_arrays, tolerance=1e-6):
+    """
+    Find intersections between every pair of functions sampled on one grid.
+
+    y_arrays is an (N, len(x)) array with one row per function. All pairs
+    are compared in one vectorized pass. Returns (points, point_pairs,
+    intervals, interval_pairs), where the pair lists give the (i, j) rows,
+    i < j, of each point and interval.
+    """
+    x = np.asarray(x_array, dtype=np.float64)
+    ys = np.asarray(y_arrays, dtype=np.float64).reshape(-1, len(x))
+    first, second = np.triu_indices(len(ys), 1)
+    points, point_rows, intervals, interval_rows = find_row_intersections(
+        x, ys[first], ys[second], tolerance)
+
+    pairs = list(zip(first.tolist(), second.tolist()))
+    return (points, [pairs[row] for row in point_rows],
+            intervals, [pairs[row] for row in interval_rows])
+
+
+def find_row_intersections(x_array, y1_rows, y2_rows, tolerance=1e-6):
+    """
+    Find intersections of matching rows of two (M, len(x)) sample arrays.
+
+    Equivalent to find_intersections on each pair of rows, in a single
+    vectorized pass. Returns (points, point_rows, intervals, interval_rows),
+    where the row lists give the row index of each point and interval.
+    """
+    x = np.asarray(x_array, dtype=np.float64)
+    y1_rows = np.asarray(y1_rows, dtype=np.float64).reshape(-1, len(x))
+    y2_rows = np.asarray(y2_rows, dtype=np.float64).reshape(-1, len(x))
+    rows = len(y1_rows)
+    if rows == 0 or len(x) < 2:
+        return [], [], [], []
+
+    # Lay the rows end to end, each followed by an invalid sample so no
+    # crossing or tolerance-band run spans two rows
+    separator = np.full((rows, 1), np.nan)
+    stride = len(x) + 1
+    flat_x = np.tile(np.append(x, np.nan), rows)
+    flat_y1 = np.hstack((y1_rows, separator)).ravel()
+    flat_y2 = np.hstack((y2_rows, separator)).ravel()
+
+    point_idx, point_x, point_y, starts, ends = _intersection_indices(
+        flat_x, flat_y1, flat_y2, tolerance)
+
+    # As in find_intersections, the last sample of a row is never a point on its own
+    keep = point_idx % stride != len(x) - 1
+    point_idx, point_x, point_y = point_idx[keep], point_x[keep], point_y[keep]
+
+    points = list(zip(point_x.tolist(), point_y.tolist()))
+    intervals = [((sx, sy), (ex, ey)) for sx, sy, ex, ey in zip(
+        flat_x[starts].tolist(), flat_y1[starts].tolist(),
+        flat_x[ends].tolist(), flat_y1[ends].tolist())]
+
+    return points, (point_idx // stride).tolist(), intervals, (starts // stride).tolist()
+
+
+def _intersection_indices(x, y1, y2, tolerance):
+    """
+    Locate intersections of two sampled functions.
+    Returns (point_idx, point_x, point_y, interval_starts, interval_ends):
+    the sample index, x and y of each point in sample order, and the first
+    and last sample index of each interval.
+    """
+    n = len(x)
+    with np.errstate(invalid='ignore'):
+        diff = y1 - y2
+        valid = ~np.isnan(y1) & ~np.isnan(y2)
+        in_band = valid & (np.abs(diff) <= tolerance)
+
+        # Run-length encode the tolerance band: [start, end) of each run
+        edges = np.diff(np.concatenate(([0], in_band.astype(np.int8), [0])))
+        run_starts = np.flatnonzero(edges == 1)
+        run_ends = np.flatnonzero(edges == -1)
+
+        # Runs of more than 2 points are intervals, shorter runs are single points
+        is_interval = run_ends - run_starts > 2
+        marks = np.zeros(n + 1, dtype=np.int64)
+        np.add.at(marks, run_starts[is_interval], 1)
+        np.add.at(marks, run_ends[is_interval], -1)
+        in_interval = np.cumsum(marks[:-1]) > 0
+        band_idx = np.flatnonzero(in_band[:-1] & ~in_interval[:-1])
+
+        # Zero crossings between consecutive samples outside the band
+        crossing = (~in_band[:-1] & valid[:-1] & valid[1:] &
+                    (diff[:-1] * diff[1:] < 0))
+        cross_idx = np.flatnonzero(crossing)
+
+    point_idx = np.concatenate((band_idx, cross_idx))
+    point_x = np.concatenate((x[band_idx], (x[cross_idx] + x[cross_idx + 1]) / 2))
+    point_y = np.concatenate((y1[band_idx], (y1[cross_idx] + y2[cross_idx]) / 2))
+    order = np.argsort(point_idx, kind='stable')
+
+    return (point_idx[order], point_x[order], point_y[order],
+            run_starts[is_interval], run_ends[is_interval] - 1)
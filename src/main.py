@@ -1,3 +1,6 @@
+import time
+_started = time.perf_counter()
+
 from PySide2.QtWidgets import QApplication
 from widgets.main_window import MainWindow
 from utils import load_stylesheet
@@ -5,7 +8,9 @@ import sys
 
 
 def main():
-    app = QApplication(sys.argv)
+    # --startup-time prints the seconds until the window is first painted, then exits
+    measure_startup = '--startup-time' in sys.argv
+    app = QApplication([arg for arg in sys.argv if arg != '--startup-time'])
 
     # Load and apply stylesheet
     stylesheet = load_stylesheet("../resources/style.qss")
@@ -13,6 +18,11 @@ def main():
         app.setStyleSheet(stylesheet)
 
     window = MainWindow()
+    if measure_startup:
+        def report():
+            print(f"{time.perf_counter() - _started:.3f}")
+            app.quit()
+        window.first_painted.connect(report)
     window.show()
     sys.exit(app.exec_())
 
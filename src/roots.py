@@ -0,0 +1,248 @@
+import numpy as np
+
+
+EPS = np.finfo(np.float64).eps
+
+
+def brentq(f, a, b, xtol=2e-12, rtol=4 * EPS, maxiter=100):
+    """
+    Find a root of scalar function f bracketed by [a, b] using Brent's method.
+    Raises ValueError if f(a) and f(b) have the same sign.
+    """
+    fa, fb = f(a), f(b)
+    if fa == 0:
+        return a
+    if fb == 0:
+        return b
+    if not (np.isfinite(fa) and np.isfinite(fb)) or np.sign(fa) == np.sign(fb):
+        raise ValueError("Root is not bracketed")
+
+    xpre, xcur = a, b
+    fpre, fcur = fa, fb
+    xblk = fblk = spre = scur = 0.0
+
+    for _ in range(maxiter):
+        if fpre != 0 and fcur != 0 and (fpre < 0) != (fcur < 0):
+            xblk, fblk = xpre, fpre
+            spre = scur = xcur - xpre
+        if abs(fblk) < abs(fcur):
+            xpre, xcur, xblk = xcur, xblk, xcur
+            fpre, fcur, fblk = fcur, fblk, fcur
+
+        delta = (xtol + rtol * abs(xcur)) / 2
+        sbis = (xblk - xcur) / 2
+        if fcur == 0 or abs(sbis) < delta:
+            return xcur
+
+        if abs(spre) > delta and abs(fcur) < abs(fpre):
+            if xpre == xblk:
+                # Secant step
+                stry = -fcur * (xcur - xpre) / (fcur - fpre)
+            else:
+                # Inverse quadratic interpolation
+                dpre = (fpre - fcur) / (xpre - xcur)
+                dblk = (fblk - fcur) / (xblk - xcur)
+                stry = -fcur * (fblk * dblk - fpre * dpre) / (dblk * dpre * (fblk - fpre))
+
+            if 2 * abs(stry) < min(abs(spre), 3 * abs(sbis) - delta):
+                spre, scur = scur, stry
+            else:
+                spre = scur = sbis
+        else:
+            spre = scur = sbis
+
+        xpre, fpre = xcur, fcur
+        if abs(scur) > delta:
+            xcur += scur
+        else:
+            xcur += delta if sbis > 0 else -delta
+        fcur = f(xcur)
+
+    return xcur
+
+
+def precision_to_xtol(precision):
+    """Absolute x tolerance needed to report roots at given decimal precision."""
+    return 0.5 * 10.0 ** -(precision + 1)
+
+
+def refine_intersections(f1, f2, x_array, points, precision):
+    """
+    Refine intersection points to roots of f1 - f2.
+
+    f1 and f2 are compiled (vectorized) functions and x_array the sample
+    grid the points were found on, ascending or descending. Crossings are
+    solved with Brent's method on their bracketing samples. Points lying
+    on a sample (tolerance band hits) are refined with refine_contact.
+    Points that converge within the precision of each other are reported
+    once.
+    """
+    x = np.asarray(x_array, dtype=np.float64)
+    if len(x) > 1 and x[0] > x[-1]:
+        # Grids of high-to-low domains are searched ascending
+        x = x[::-1]
+    xtol = precision_to_xtol(precision)
+
+    refined = []
+    for px, py in points:
+        k = np.searchsorted(x, px, side='right') - 1
+        if 0 <= k < len(x) and x[k] == px:
+            root = refine_contact(f1, f2, float(x[max(k - 1, 0)]), float(px),
+                                  float(x[min(k + 1, len(x) - 1)]), xtol)
+        elif 0 <= k < len(x) - 1:
+            root = refine_crossing(f1, f2, float(x[k]), float(x[k + 1]), xtol)
+        else:
+            root = None
+        root = root if root is not None else (px, py)
+        if not refined or abs(root[0] - refined[-1][0]) > xtol:
+            refined.append(root)
+
+    return refined
+
+
+def stationary_points(f1, f2, t, low, high, xtol, max_iter=50):
+    """
+    Polish estimates t of stationary points of f1 - f2 with Newton's method
+    on (f1 - f2)' = 0, using derivatives from the compiled expressions,
+    while staying within [low, high]. Returns the polished points and a
+    mask of those that converged to xtol.
+    """
+    t = np.array(t, dtype=np.float64)
+    active = np.ones(len(t), dtype=bool)
+    converged = np.zeros(len(t), dtype=bool)
+    for _ in range(max_iter):
+        ids = np.flatnonzero(active)
+        if len(ids) == 0:
+            break
+        _, slope1, curvature1 = f1.derivatives(t[ids])
+        _, slope2, curvature2 = f2.derivatives(t[ids])
+        with np.errstate(all='ignore'):
+            step = (slope1 - slope2) / (curvature1 - curvature2)
+            new_t = t[ids] - step
+        inside = np.isfinite(new_t) & (new_t >= low[ids]) & (new_t <= high[ids])
+        done = inside & (np.abs(step) <= xtol)
+        t[ids[inside]] = new_t[inside]
+        converged[ids[done]] = True
+        active[ids[~inside | done]] = False
+    return t, converged
+
+
+def tangent_points(f1, f2, x_array, y1_array, y2_array, precision,
+                   tolerance=1e-6, max_iter=50):
+    """
+    Find tangential contacts of f1 and f2 between samples.
+
+    Sampled local minima of |f1 - f2| that do not cross zero are polished
+    with stationary_points while staying between their neighbouring
+    samples; minima within tolerance are tolerance band points, refined by
+    refine_intersections. A stationary point where |f1 - f2| is within
+    tolerance is a double root, dips converging to the same one are
+    reported once. Returns a list of (x, y) in sample order.
+    """
+    x = np.asarray(x_array, dtype=np.float64)
+    if len(x) < 3:
+        return []
+    with np.errstate(invalid='ignore'):
+        diff = np.asarray(y1_array, dtype=np.float64) - np.asarray(y2_array, dtype=np.float64)
+        gap = np.abs(diff)
+        dip = ((gap[1:-1] <= gap[:-2]) & (gap[1:-1] <= gap[2:]) &
+               (diff[:-2] * diff[1:-1] > 0) & (diff[1:-1] * diff[2:] > 0) &
+               (gap[1:-1] > tolerance))
+    index = np.flatnonzero(dip) + 1
+    if len(index) == 0:
+        return []
+
+    xtol = precision_to_xtol(precision)
+    low = np.minimum(x[index - 1], x[index + 1])
+    high = np.maximum(x[index - 1], x[index + 1])
+    t, converged = stationary_points(f1, f2, x[index], low, high, xtol, max_iter)
+
+    t = t[converged]
+    y = f1(t)
+    with np.errstate(invalid='ignore'):
+        touching = np.abs(y - f2(t)) <= tolerance
+    t, y = t[touching], y[touching]
+    # Equal dips on both sides of a contact converge to the same point
+    distinct = np.abs(np.diff(t, prepend=-np.inf)) > xtol
+    return list(zip(t[distinct].tolist(), y[distinct].tolist()))
+
+
+def refine_contact(f1, f2, a, m, b, xtol):
+    """
+    Refine a sample m where f1 - f2 is within the tolerance band, between
+    its neighbouring samples a and b. A sign change towards a neighbour is
+    solved with Brent's method, otherwise the contact is the stationary
+    point of f1 - f2 between the neighbours.
+    Returns (x, y) or None if neither converges to a finite point.
+    """
+    t = np.array([a, m, b])
+    with np.errstate(invalid='ignore'):
+        ga, gm, gb = f1(t) - f2(t)
+    if gm == 0:
+        return (m, float(f1(t[1:2])[0]))
+    for end, g in ((a, ga), (b, gb)):
+        if g * gm < 0:
+            return refine_crossing(f1, f2, min(m, end), max(m, end), xtol)
+
+    t, converged = stationary_points(f1, f2, t[1:2], np.array([min(a, b)]),
+                                     np.array([max(a, b)]), xtol)
+    y = f1(t)
+    return (float(t[0]), float(y[0])) if converged[0] and np.isfinite(y[0]) else None
+
+
+def refine_crossing(f1, f2, a, b, xtol):
+    """
+    Solve f1 - f2 = 0 on the bracket [a, b] with Brent's method.
+    Returns (x, y) or None if [a, b] does not bracket a finite root.
+    """
+    def difference(t):
+        t = np.array([t])
+        return float(f1(t)[0] - f2(t)[0])
+
+    try:
+        root = brentq(difference, a, b, xtol=xtol)
+    except ValueError:
+        return None
+    root_y = float(f1(np.array([root]))[0])
+    return (root, root_y) if np.isfinite(root_y) else None
+
+
+def polynomial_roots(coefficients, domain_start, domain_end):
+    """
+    Real roots of a polynomial inside [domain_start, domain_end].
+
+    coefficients are in ascending powers. Roots are the eigenvalues of the
+    companion matrix, polished with Newton steps; repeated roots are
+    reported once. Returns a sorted array.
+    """
+    coefficients = np.trim_zeros(np.asarray(coefficients, dtype=np.float64), 'b')
+    if len(coefficients) < 2:
+        return np.empty(0)
+
+    # Companion matrix of the monic polynomial
+    degree = len(coefficients) - 1
+    companion = np.zeros((degree, degree))
+    companion[1:, :-1] = np.eye(degree - 1)
+    companion[:, -1] = -coefficients[:-1] / coefficients[-1]
+    eigenvalues = np.linalg.eigvals(companion)
+
+    # Repeated roots split into pairs with small imaginary parts
+    scale = np.maximum(1.0, np.abs(eigenvalues))
+    roots = np.sort(eigenvalues.real[np.abs(eigenvalues.imag) <= 1e-6 * scale])
+
+    descending = coefficients[::-1]
+    derivative = np.polyder(descending)
+    with np.errstate(all='ignore'):
+        for _ in range(3):
+            slope = np.polyval(derivative, roots)
+            step = np.where(slope != 0, np.polyval(descending, roots) / slope, 0)
+            roots = np.where(np.isfinite(step), roots - step, roots)
+
+    low, high = min(domain_start, domain_end), max(domain_start, domain_end)
+    margin = 1e-12 * max(1.0, abs(low), abs(high))
+    roots = np.sort(roots[(roots >= low - margin) & (roots <= high + margin)])
+    roots = np.clip(roots, low, high)
+    if len(roots) > 1:
+        distinct = np.diff(roots) > 1e-7 * np.maximum(1.0, np.abs(roots[1:]))
+        roots = roots[np.concatenate(([True], distinct))]
+    return roots
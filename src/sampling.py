@@ -0,0 +1,106 @@
+import numpy as np
+from expression import evaluate_all
+
+
+def _evaluate_pair(f1, f2, x):
+    """Both compiled functions on x, computing subterms they share once."""
+    y1, y2 = evaluate_all((f1, f2), x)
+    return y1, y2
+
+
+def uniform_sample(f1, f2, start, end, num_points):
+    """Sample both functions on a uniform grid."""
+    x = np.linspace(start, end, num_points)
+    return (x,) + _evaluate_pair(f1, f2, x)
+
+
+def boundary_sample(f1, f2, start, end, at_start, at_end, count=16):
+    """
+    Sample both functions on points approaching start and/or end
+    geometrically, 1/2, 1/4, ... 1/2**count of the width away.
+    """
+    offsets = (end - start) * 2.0 ** -np.arange(1, count + 1)
+    x = np.concatenate((start + offsets[::-1] if at_start else [],
+                        end - offsets if at_end else []))
+    return (x,) + _evaluate_pair(f1, f2, x)
+
+
+def adaptive_sample(f1, f2, start, end, max_points, initial_points=65,
+                    curvature_tol=1e-3, tangent_tol=1e-2, tolerance=1e-6):
+    """
+    Sample both functions adaptively, starting coarse and subdividing segments
+    where f1 - f2 changes sign, where validity (NaN) changes, near local
+    minima of |f1 - f2| (possible tangent contacts) and where either curve
+    deviates from a straight line by more than curvature_tol of the y scale.
+
+    Segments touching the intersection tolerance band are left alone so the
+    sampler never manufactures spurious intersection intervals.
+
+    Returns (x, y1, y2) with at most max_points samples. The grid is densest
+    around sign changes, so it doubles as the bracket set for
+    find_intersections.
+    """
+    x = np.linspace(start, end, min(initial_points, max_points))
+    y1, y2 = _evaluate_pair(f1, f2, x)
+    min_width = abs(end - start) * 1e-9
+    # Crossings only need a bracket, root refinement pins them down afterwards
+    crossing_width = abs(end - start) / max_points
+
+    while len(x) < max_points:
+        scores = _segment_scores(x, y1, y2, curvature_tol, tangent_tol, tolerance,
+                                 crossing_width)
+        scores[np.abs(np.diff(x)) <= min_width] = 0
+        flagged = np.flatnonzero(scores > 0)
+        if len(flagged) == 0:
+            break
+
+        budget = max_points - len(x)
+        if len(flagged) > budget:
+            flagged = np.sort(flagged[np.argsort(-scores[flagged], kind='stable')[:budget]])
+
+        mid = (x[flagged] + x[flagged + 1]) / 2
+        x = np.insert(x, flagged + 1, mid)
+        mid_y1, mid_y2 = _evaluate_pair(f1, f2, mid)
+        y1 = np.insert(y1, flagged + 1, mid_y1)
+        y2 = np.insert(y2, flagged + 1, mid_y2)
+
+    return x, y1, y2
+
+
+def _segment_scores(x, y1, y2, curvature_tol, tangent_tol, tolerance, crossing_width):
+    """Refinement priority per segment, 0 where no subdivision is needed."""
+    with np.errstate(invalid='ignore'):
+        diff = y1 - y2
+        valid = ~np.isnan(diff)
+        gap = np.abs(diff)
+        in_band = gap <= tolerance
+        scores = np.zeros(len(x) - 1)
+
+        # Structural events outrank curvature
+        scores[valid[:-1] != valid[1:]] = np.inf
+        scores[(diff[:-1] * diff[1:] < 0) & (np.abs(np.diff(x)) > crossing_width)] = np.inf
+        if len(x) < 3:
+            scores[in_band[:-1] | in_band[1:]] = 0
+            return scores
+
+        scale = max(np.nanmax(np.abs(np.concatenate((y1, y2))), initial=0), 1.0)
+
+        # Local minima of |f1 - f2| that come close to zero without crossing
+        dip = np.zeros(len(x), dtype=bool)
+        dip[1:-1] = ((gap[1:-1] <= gap[:-2]) & (gap[1:-1] <= gap[2:]) &
+                     (diff[:-2] * diff[1:-1] > 0) & (diff[1:-1] * diff[2:] > 0) &
+                     (gap[1:-1] > tolerance) & (gap[1:-1] < tangent_tol * scale))
+        dip_score = np.where(dip, 1.0, 0.0)
+
+        # Deviation of interior samples from the chord through their neighbours
+        t = (x[1:-1] - x[:-2]) / (x[2:] - x[:-2])
+        error = np.zeros(len(x))
+        for y in (y1, y2):
+            chord = y[:-2] + t * (y[2:] - y[:-2])
+            error[1:-1] = np.fmax(error[1:-1], np.abs(y[1:-1] - chord) / scale)
+        error[error <= curvature_tol] = 0
+
+        point_score = np.fmax(dip_score, error)
+        scores = np.fmax(scores, np.fmax(point_score[:-1], point_score[1:]))
+    scores[in_band[:-1] | in_band[1:]] = 0
+    return scores
@@ -0,0 +1,263 @@
+"""
+Local HTTP/JSON solve service.
+
+    python src/service.py --port 8765 --workers 4
+
+POST /solve takes one batch record as JSON (f1, f2 and the optional
+settings of batch.py) and answers with its points and intervals. With
+"png": true the response also holds the plot "Solve and Plot" draws, as a
+base64-encoded PNG rendered with matplotlib's Agg canvas. GET /health
+reports request statistics.
+
+Solves run in a process pool. Identical requests arriving while one is
+being solved wait for that solve instead of starting their own, and
+repeated requests are answered from a result cache. Does not import
+PySide2.
+"""
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from io import BytesIO
+import argparse
+import asyncio
+import base64
+import json
+import sys
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from batch import (DEFAULTS, STREAMING_POINTS, _settings, format_intersections, parse_record,
+                   solve_record)
+from solver import solve
+
+# Largest request body accepted, in bytes
+MAX_BODY = 1024 * 1024
+
+
+def render_plot(result, width=8, height=6, dpi=100):
+    """PNG bytes of a solve result, drawn as MainWindow.plot_result draws it."""
+    figure = Figure(figsize=(width, height), dpi=dpi)
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot(111)
+
+    ax.plot(result.x, result.y1, color='blue', label=f"f1(x) = {result.f1.source}")
+    ax.plot(result.x, result.y2, color='red', label=f"f2(x) = {result.f2.source}")
+    if result.points:
+        ax.scatter(*np.transpose(result.points), color='black', zorder=5,
+                   label='Intersection Points')
+    for number, (curve_x, curve_y) in enumerate(result.interval_curves):
+        ax.plot(curve_x, curve_y, color='green', linewidth=2,
+                label='Intersection Interval' if number == 0 else None)
+
+    format_str = f"{{:.{result.precision}f}}"
+    for x_int, y_int in result.points:
+        ax.annotate(f'({format_str.format(x_int)}, {format_str.format(y_int)})', (x_int, y_int),
+                    xytext=(5, 5), textcoords='offset points')
+
+    ax.grid(True)
+    ax.set_xlabel('x')
+    ax.set_ylabel('y')
+    ax.legend()
+
+    buffer = BytesIO()
+    figure.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+
+def solve_request(request):
+    """
+    Solve one service request in a worker process.
+    Returns the response body; 'png' asks for a rendered plot as well.
+    """
+    record = {key: value for key, value in request.items() if key != 'png'}
+    if not request.get('png'):
+        return solve_record(record)
+
+    output = {key: value for key, value in record.items() if key not in DEFAULTS}
+    try:
+        f1, f2, settings = parse_record(record)
+    except ValueError as e:
+        output['error'] = str(e)
+        return output
+    if settings['num_points'] > STREAMING_POINTS:
+        output['error'] = f"Error: plots are limited to {STREAMING_POINTS} points"
+        return output
+
+    try:
+        result = solve(f1, f2, **settings)
+        png = render_plot(result)
+    except Exception as e:
+        output['error'] = f"Error: {str(e)}"
+        return output
+
+    output.update(format_intersections(result.points, result.intervals, settings['precision']))
+    output['png'] = base64.b64encode(png).decode('ascii')
+    return output
+
+
+class InvalidRequest(ValueError):
+    """A request missing f1 or f2, or with settings of the wrong type."""
+
+
+def request_key(request):
+    """
+    Cache key of the solve a request asks for, ignoring passed-through
+    fields. Raises InvalidRequest when the request is malformed.
+    """
+    try:
+        key = dict(_settings(request), f1=str(request['f1']).strip(),
+                   f2=str(request['f2']).strip(), png=bool(request.get('png')))
+    except (KeyError, ValueError, TypeError) as e:
+        raise InvalidRequest(f"Invalid record: {e}")
+    return json.dumps(key, sort_keys=True)
+
+
+class SolveService:
+    """
+    Solves requests in an executor, coalescing identical in-flight requests
+    and caching the cache_size most recent successful results.
+    """
+
+    def __init__(self, executor=None, workers=None, cache_size=256):
+        self.executor = executor if executor is not None else ProcessPoolExecutor(workers)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._in_flight = {}
+        self.stats = {'requests': 0, 'solved': 0, 'cache_hits': 0, 'coalesced': 0}
+
+    async def solve(self, request):
+        """
+        Response body for a request, solving it at most once. Raises
+        InvalidRequest for malformed requests and passes on failures of the
+        executor, such as a broken process pool.
+        """
+        self.stats['requests'] += 1
+        key = request_key(request)
+        passed = {name: value for name, value in request.items()
+                  if name not in DEFAULTS and name not in ('f1', 'f2', 'png')}
+
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.stats['cache_hits'] += 1
+            return dict(passed, **self._cache[key])
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.stats['coalesced'] += 1
+        else:
+            # Only the solve itself goes to the worker, passed fields are re-attached
+            core = {name: value for name, value in request.items() if name not in passed}
+            future = asyncio.get_running_loop().run_in_executor(self.executor, solve_request, core)
+            self.stats['solved'] += 1
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+        # Shielded, so a client hanging up does not cancel others waiting on the solve
+        body = await asyncio.shield(future)
+        if 'error' not in body:
+            self._cache[key] = body
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return dict(passed, **body)
+
+    async def handle(self, reader, writer):
+        """Serve one HTTP request on a connection."""
+        try:
+            status, body = await self._respond(reader)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        payload = json.dumps(body).encode('utf-8')
+        writer.write(f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                     f"Content-Type: application/json\r\n"
+                     f"Content-Length: {len(payload)}\r\n"
+                     f"Connection: close\r\n\r\n".encode('ascii') + payload)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _respond(self, reader):
+        """(status, JSON body) for the request read from reader."""
+        request_line = (await reader.readline()).decode('latin-1').split()
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if len(request_line) != 3:
+            return HTTPStatus.BAD_REQUEST, {'error': "Malformed request line"}
+
+        method, path, _ = request_line
+        if path == '/health':
+            if method != 'GET':
+                return HTTPStatus.METHOD_NOT_ALLOWED, {'error': "Use GET"}
+            return HTTPStatus.OK, dict(self.stats, status='ok')
+        if path != '/solve':
+            return HTTPStatus.NOT_FOUND, {'error': f"Unknown path {path}"}
+        if method != 'POST':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': "Use POST"}
+
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            length = -1
+        if not 0 <= length <= MAX_BODY:
+            return HTTPStatus.BAD_REQUEST, {'error': "Invalid Content-Length"}
+        try:
+            request = json.loads(await reader.readexactly(length))
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, {'error': f"Invalid JSON: {e}"}
+        if not isinstance(request, dict):
+            return HTTPStatus.BAD_REQUEST, {'error': "Expected a JSON object"}
+
+        try:
+            body = await self.solve(request)
+        except InvalidRequest as e:
+            return HTTPStatus.BAD_REQUEST, {'error': str(e)}
+        except Exception as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': f"Solve failed: {e!r}"}
+        status = HTTPStatus.OK if 'error' not in body else HTTPStatus.UNPROCESSABLE_ENTITY
+        return status, body
+
+    async def start(self, host='127.0.0.1', port=8765):
+        """Start listening, returns the asyncio server."""
+        return await asyncio.start_server(self.handle, host, port)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def serve(host, port, workers=None, cache_size=256):
+    service = SolveService(workers=workers, cache_size=cache_size)
+    server = await service.start(host, port)
+    print(f"Serving on http://{host}:{server.sockets[0].getsockname()[1]}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Serve solves over local HTTP.")
+    arg_parser.add_argument('--host', default='127.0.0.1',
+                            help="address to bind (default: localhost)")
+    arg_parser.add_argument('-p', '--port', type=int, default=8765, help="port (default: 8765)")
+    arg_parser.add_argument('-w', '--workers', type=int,
+                            help="worker processes (default: all cores)")
+    arg_parser.add_argument('--cache-size', type=int, default=256,
+                            help="results kept for repeated requests (default: 256)")
+    args = arg_parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.cache_size))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
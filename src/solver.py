@@ -0,0 +1,534 @@
+import time
+import numpy as np
+from expression import evaluate_all, polynomial_difference
+from roots import polynomial_roots, precision_to_xtol, refine_intersections, tangent_points
+from sampling import adaptive_sample, boundary_sample, uniform_sample
+from intersections import find_all_intersections, find_intersections
+from tracing import NULL_TRACE
+
+
+class SolveCancelled(Exception):
+    """Raised when a running solve is cancelled."""
+
+
+class SolveBudgetExceeded(Exception):
+    """Raised when a solve runs over its time or function evaluation budget."""
+
+
+class SolveBudget:
+    """
+    Time and function evaluation limits of one solve.
+
+    Expressions wrapped with guard() charge every point they evaluate and
+    check the clock before evaluating, so a solve aborts with
+    SolveBudgetExceeded within one evaluation of running over. None means
+    unlimited.
+    """
+
+    def __init__(self, time_limit=None, max_evaluations=None):
+        self.time_limit = time_limit
+        self.max_evaluations = max_evaluations
+        self.evaluations = 0
+        self._deadline = None if time_limit is None else time.monotonic() + time_limit
+
+    def charge(self, count):
+        """Account for count point evaluations about to run."""
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            raise SolveBudgetExceeded(f"Solve exceeded its time limit of {self.time_limit:g} s")
+        self.evaluations += count
+        if self.max_evaluations is not None and self.evaluations > self.max_evaluations:
+            raise SolveBudgetExceeded(
+                f"Solve exceeded its budget of {self.max_evaluations} function evaluations")
+
+    def guard(self, expression):
+        """Wrap a compiled expression so its evaluations are charged."""
+        return _BudgetedExpression(expression, self)
+
+
+class _BudgetedExpression:
+    """Compiled expression proxy charging evaluations to a SolveBudget."""
+
+    def __init__(self, expression, budget):
+        self._expression = expression
+        self._budget = budget
+
+    def __getattr__(self, name):
+        return getattr(self._expression, name)
+
+    def __call__(self, x_values):
+        self._budget.charge(np.size(x_values))
+        return self._expression(x_values)
+
+    def charge(self, count):
+        """Charge count evaluations made on the expression's behalf."""
+        self._budget.charge(count)
+
+    def derivatives(self, x_values):
+        self._budget.charge(np.size(x_values))
+        return self._expression.derivatives(x_values)
+
+
+class SolveResult:
+    """
+    Sampled curves and intersections produced by a solve.
+
+    ys holds one row of samples per function on the grid x; point_pairs and
+    interval_pairs give the (i, j) indices of the functions meeting at each
+    point and interval.
+    """
+
+    def __init__(self, functions, precision, x, ys, points, intervals, interval_curves,
+                 point_pairs=None, interval_pairs=None):
+        self.functions = list(functions)
+        self.precision = precision
+        self.x = x
+        self.ys = ys
+        self.points = points
+        self.intervals = intervals
+        self.interval_curves = interval_curves
+        self.point_pairs = point_pairs if point_pairs is not None else [(0, 1)] * len(points)
+        self.interval_pairs = (interval_pairs if interval_pairs is not None
+                               else [(0, 1)] * len(intervals))
+
+    @property
+    def f1(self):
+        return self.functions[0]
+
+    @property
+    def f2(self):
+        return self.functions[1]
+
+    @property
+    def y1(self):
+        return self.ys[0]
+
+    @property
+    def y2(self):
+        return self.ys[1]
+
+
+def sample(f1, f2, domain_start, domain_end, num_points, adaptive=True, cache=None):
+    """
+    Sample two compiled functions, reusing cached samples when possible.
+
+    Besides exact hits on (expressions, domain, point count, sampler), a
+    cached grid over a wider domain is reused when it holds at least as many
+    samples inside the requested domain.
+    """
+    key = ('samples', f1.tree, f2.tree, adaptive, domain_start, domain_end, num_points)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is None and domain_start < domain_end:
+            cached = _sample_sub_range(f1, f2, key, cache)
+        if cached is not None:
+            return cached
+
+    if adaptive:
+        samples = adaptive_sample(f1, f2, domain_start, domain_end, num_points)
+    else:
+        samples = uniform_sample(f1, f2, domain_start, domain_end, num_points)
+    if cache is not None:
+        cache.put(key, samples)
+    return samples
+
+
+def sample_subdomains(f1, f2, subdomains, domain_start, domain_end, num_points,
+                      adaptive=True, cache=None, boundary_points=16):
+    """
+    Sample two compiled functions only inside their valid sub-domains.
+
+    Up to boundary_points extra samples cluster towards every sub-domain
+    edge that is a domain restriction rather than an end of the domain,
+    fewer when that would take more than a quarter of num_points. The rest
+    of the budget is split between sub-domains by width, at least 2 each;
+    with more sub-domains than that allows, the whole domain is sampled
+    instead. Returns sorted (x, y1, y2) of at most num_points samples.
+    """
+    low, high = min(domain_start, domain_end), max(domain_start, domain_end)
+    edges = [(start > low, end < high) for start, end in subdomains]
+    edge_count = sum(sum(flags) for flags in edges)
+    if edge_count:
+        boundary_points = min(boundary_points, num_points // (4 * edge_count))
+    budget = num_points - boundary_points * edge_count
+    if 2 * len(subdomains) > budget:
+        x, y1, y2 = sample(f1, f2, low, high, num_points, adaptive, cache)
+        return x, y1, y2
+    spare = budget - 2 * len(subdomains)
+    total = sum(end - start for start, end in subdomains)
+
+    pieces = []
+    for (start, end), (at_start, at_end) in zip(subdomains, edges):
+        if end <= start:
+            continue
+        count = 2 + int(spare * (end - start) / total)
+        pieces.append(sample(f1, f2, start, end, count, adaptive, cache))
+        if boundary_points and (at_start or at_end):
+            pieces.append(boundary_sample(f1, f2, start, end, at_start, at_end,
+                                          boundary_points))
+    if not pieces:
+        return np.empty(0), np.empty(0), np.empty(0)
+
+    x, index = np.unique(np.concatenate([piece[0] for piece in pieces]), return_index=True)
+    y1 = np.concatenate([piece[1] for piece in pieces])[index]
+    y2 = np.concatenate([piece[2] for piece in pieces])[index]
+    return x, y1, y2
+
+
+def _sample_sub_range(f1, f2, key, cache):
+    """Slice samples for a narrowed domain out of a cached wider grid."""
+    start, end, num_points = key[4:]
+
+    def covers(cached_key, arrays):
+        if cached_key[:4] != key[:4]:
+            return False
+        cached_start, cached_end, _ = cached_key[4:]
+        if not cached_start <= start < end <= cached_end:
+            return False
+        # A sampler that converged on the wide domain may still be too coarse
+        # for the narrow one, so only the density inside counts
+        inside = np.count_nonzero((arrays[0] > start) & (arrays[0] < end))
+        return inside + 2 >= num_points
+
+    found = cache.find(covers)
+    if found is None:
+        return None
+
+    x, y1, y2 = found[1]
+    inside = (x > start) & (x < end)
+    edges = np.array([start, end])
+    y1_edges, y2_edges = f1(edges), f2(edges)
+    samples = (np.concatenate(([start], x[inside], [end])),
+               np.concatenate((y1_edges[:1], y1[inside], y1_edges[1:])),
+               np.concatenate((y2_edges[:1], y2[inside], y2_edges[1:])))
+    cache.put(key, samples)
+    return samples
+
+
+def domain_mask(f, domain_start, domain_end, num_points, cache=None):
+    """Validity mask and restriction types of f on a uniform grid, cached."""
+    key = ('mask', f.tree, domain_start, domain_end, num_points)
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None:
+        return cached
+
+    mask = f.domain_mask(np.linspace(domain_start, domain_end, num_points))
+    if cache is not None:
+        cache.put(key, mask)
+    return mask
+
+
+def valid_subdomains(functions, domain_start, domain_end, cache=None, time_limit=None):
+    """
+    Sorted (start, end) sub-intervals where all compiled functions are
+    defined, or None when the interval analysis gives up or takes longer
+    than time_limit seconds. Both outcomes are cached.
+    """
+    key = ('subdomains', tuple(f.tree for f in functions), domain_start, domain_end)
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None:
+        # A NaN row marks an analysis that gave up
+        if np.isnan(cached[0]).any():
+            return None
+        return [tuple(bounds) for bounds in cached[0].tolist()]
+
+    deadline = time.perf_counter() + time_limit if time_limit is not None else None
+    subdomains = None
+    for f in functions:
+        remaining = max(deadline - time.perf_counter(), 0.0) if deadline is not None else None
+        own = f.valid_subdomains(domain_start, domain_end, time_limit=remaining)
+        if own is None:
+            subdomains = None
+            break
+        subdomains = own if subdomains is None else _overlaps(subdomains, own)
+
+    if cache is not None:
+        bounds = [(np.nan, np.nan)] if subdomains is None else subdomains
+        cache.put(key, (np.array(bounds, dtype=np.float64).reshape(-1, 2),))
+    return subdomains
+
+
+def _overlaps(first, second):
+    """Pairwise overlaps of two sorted lists of disjoint intervals."""
+    overlaps = []
+    i = j = 0
+    while i < len(first) and j < len(second):
+        start = max(first[i][0], second[j][0])
+        end = min(first[i][1], second[j][1])
+        if start <= end:
+            overlaps.append((start, end))
+        if first[i][1] < second[j][1]:
+            i += 1
+        else:
+            j += 1
+    return overlaps
+
+
+def domain_restriction(functions, domain_start, domain_end, num_points, cache=None,
+                       time_limit=None):
+    """
+    Restriction type ('sqrt' or 'log') violated first in the domain, or None.
+    Decided by valid_subdomains, falling back to checking the num_points
+    sample grid when the interval analysis gives up or exceeds time_limit
+    seconds.
+    """
+    subdomains = valid_subdomains(functions, domain_start, domain_end, cache, time_limit)
+    if subdomains is None:
+        masks = [domain_mask(f, domain_start, domain_end, num_points, cache) for f in functions]
+        valid = np.logical_and.reduce([mask[0] for mask in masks])
+        if valid.all():
+            return None
+        first = np.argmin(valid)
+        return next(restriction[first] for ok, restriction in masks if not ok[first])
+
+    low, high = min(domain_start, domain_end), max(domain_start, domain_end)
+    if subdomains == [(low, high)]:
+        return None
+
+    # Probe the middle of the first gap in the direction of sampling
+    edges = [low] + [bound for bounds in subdomains for bound in bounds] + [high]
+    gaps = [(edges[k], edges[k + 1]) for k in range(0, len(edges), 2)
+            if edges[k] < edges[k + 1]]
+    gap = gaps[0] if domain_start <= domain_end else gaps[-1]
+    probe = np.array([(gap[0] + gap[1]) / 2])
+    for f in functions:
+        valid, restriction = f.domain_mask(probe)
+        if not valid[0]:
+            return restriction[0]
+    return None
+
+
+def polynomial_intersections(f1, f2, domain_start, domain_end):
+    """
+    Exact intersections when f1 - f2 is a polynomial, otherwise None.
+    Identical functions intersect on the whole domain.
+    """
+    difference = polynomial_difference(f1, f2)
+    if difference is None:
+        return None
+
+    scale = max(np.abs(f1.coefficients).max(), np.abs(f2.coefficients).max(), 1.0)
+    if np.all(np.abs(difference) <= 1e-12 * scale):
+        edges = np.array([domain_start, domain_end])
+        y = f1(edges)
+        return [], [((domain_start, float(y[0])), (domain_end, float(y[1])))]
+
+    roots = polynomial_roots(difference, domain_start, domain_end)
+    points = list(zip(roots.tolist(), f1(roots).tolist()))
+    return points, []
+
+
+def _merge_points(points, extra, xtol, descending=False):
+    """Add extra points not within xtol of known ones, keeping sample order."""
+    known = np.array([px for px, _ in points])
+    merged = list(points)
+    for point in extra:
+        if not np.any(np.abs(known - point[0]) <= xtol):
+            merged.append(point)
+    merged.sort(key=lambda point: point[0], reverse=descending)
+    return merged
+
+
+def solve_budget(time_limit, max_evaluations, trace=NULL_TRACE):
+    """
+    SolveBudget for the limits of a solve, also created without limits when
+    trace records evaluation counts; None when nothing needs it.
+    """
+    if time_limit is not None or max_evaluations is not None or trace.enabled:
+        return SolveBudget(time_limit, max_evaluations)
+    return None
+
+
+def stage_reporter(progress=None, is_cancelled=None):
+    """
+    stage_done(percent) callback of a solve: raises SolveCancelled once
+    is_cancelled returns True, else reports percent to progress.
+    """
+    def stage_done(percent):
+        if is_cancelled is not None and is_cancelled():
+            raise SolveCancelled()
+        if progress is not None:
+            progress(percent)
+    return stage_done
+
+
+def sample_intervals(intervals, functions, count=100):
+    """
+    (x, y) curves of count samples along intersection intervals, for
+    highlighting them; y comes from the function given for each interval.
+    """
+    curves = []
+    for ((start_x, _), (end_x, _)), f in zip(intervals, functions):
+        interval_x = np.linspace(start_x, end_x, count)
+        curves.append((interval_x, f(interval_x)))
+    return curves
+
+
+def solve(f1, f2, domain_start, domain_end, num_points, precision,
+          adaptive=True, valid_domain_only=True, progress=None, is_cancelled=None,
+          cache=None, time_limit=None, max_evaluations=None, trace=NULL_TRACE):
+    """
+    Sample two compiled functions, find and refine their intersections.
+
+    progress is called with a percentage after each stage and is_cancelled
+    is polled between stages; SolveCancelled is raised once it returns True.
+    Samples are looked up in and stored to cache (a SampleCache) if given.
+    SolveBudgetExceeded is raised once the solve runs longer than time_limit
+    seconds or evaluates more than max_evaluations points. Stage timings and
+    counts of evaluations, samples discarded outside the domain and
+    intersections found are recorded to trace (a tracing.Trace).
+    """
+    result_functions = f1, f2
+    budget = solve_budget(time_limit, max_evaluations, trace)
+    if budget is not None:
+        f1, f2 = budget.guard(f1), budget.guard(f2)
+    stage_done = stage_reporter(progress, is_cancelled)
+
+    # Sample both functions, num_points is the budget for adaptive sampling.
+    # Without invalid points to plot, sampling skips the invalid sub-domains
+    subdomains = None
+    if valid_domain_only:
+        with trace.span('domain analysis'):
+            subdomains = valid_subdomains((f1, f2), domain_start, domain_end, cache)
+    low, high = min(domain_start, domain_end), max(domain_start, domain_end)
+    with trace.span('sampling'):
+        if subdomains is not None and subdomains != [(low, high)]:
+            x, y1, y2 = sample_subdomains(f1, f2, subdomains, domain_start, domain_end,
+                                          num_points, adaptive, cache)
+        else:
+            x, y1, y2 = sample(f1, f2, domain_start, domain_end, num_points, adaptive, cache)
+    if valid_domain_only:
+        valid = ~np.isnan(y1) & ~np.isnan(y2)
+        trace.count('discarded by domain', len(x) - np.count_nonzero(valid))
+        x, y1, y2 = x[valid], y1[valid], y2[valid]
+    stage_done(40)
+
+    # Find intersections, exactly when f1 - f2 is a polynomial
+    exact = polynomial_intersections(f1, f2, domain_start, domain_end)
+    if exact is not None:
+        points, intervals = exact
+    else:
+        with trace.span('find_intersections'):
+            points, intervals = find_intersections(x, y1, y2)
+        stage_done(60)
+        with trace.span('refinement'):
+            points = refine_intersections(f1, f2, x, points, precision)
+            points = _merge_points(points, tangent_points(f1, f2, x, y1, y2, precision),
+                                   precision_to_xtol(precision),
+                                   descending=bool(len(x) > 1 and x[0] > x[-1]))
+    stage_done(90)
+
+    # Evaluate curves for highlighting intersection intervals
+    interval_curves = sample_intervals(intervals, [f1] * len(intervals))
+    stage_done(100)
+
+    _count_solve(trace, budget, points, intervals)
+    return SolveResult(result_functions, precision, x, np.vstack((y1, y2)), points, intervals,
+                       interval_curves)
+
+
+def _count_solve(trace, budget, points, intervals):
+    """Record evaluation and intersection counts of a finished solve."""
+    if budget is not None:
+        trace.count('evaluations', budget.evaluations)
+    trace.count('intersections', len(points) + len(intervals))
+
+
+def pair_intersections(f1, f2, x, y1, y2, points, intervals, domain_start, domain_end,
+                       precision):
+    """
+    Final intersections of one function pair from those found on its samples:
+    exact when f1 - f2 is a polynomial, otherwise crossings refined to
+    precision plus tangential contacts between samples.
+    """
+    exact = polynomial_intersections(f1, f2, domain_start, domain_end)
+    if exact is not None:
+        return exact
+    points = refine_intersections(f1, f2, x, points, precision)
+    points = _merge_points(points, tangent_points(f1, f2, x, y1, y2, precision),
+                           precision_to_xtol(precision),
+                           descending=bool(len(x) > 1 and x[0] > x[-1]))
+    return points, intervals
+
+
+def solve_all(functions, domain_start, domain_end, num_points, precision,
+              valid_domain_only=True, progress=None, is_cancelled=None, cache=None,
+              time_limit=None, max_evaluations=None, trace=NULL_TRACE):
+    """
+    Find the intersections of every pair of compiled functions.
+
+    All functions are sampled on one shared uniform grid, plus the edges of
+    their valid sub-domains, into an (N, len(x)) array and every pair is
+    compared in a single vectorized pass, instead of solving the
+    N * (N - 1) / 2 pairs one by one. Crossings are refined per pair and
+    pairs with a polynomial difference are solved exactly. Arguments are
+    as for solve; with valid_domain_only, grid points where no function is
+    defined are dropped.
+    """
+    result_functions = list(functions)
+    budget = solve_budget(time_limit, max_evaluations, trace)
+    if budget is not None:
+        functions = [budget.guard(f) for f in functions]
+    stage_done = stage_reporter(progress, is_cancelled)
+
+    # One batched evaluation of all functions on the shared grid
+    key = ('shared samples', tuple(f.tree for f in functions),
+           domain_start, domain_end, num_points)
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None:
+        x, ys = cached
+    else:
+        # Domain restriction boundaries join the grid, so contacts right at
+        # the edge of a function's domain are sampled exactly
+        with trace.span('domain analysis'):
+            edges = [bound for f in functions
+                     for bounds in valid_subdomains((f,), domain_start, domain_end, cache) or []
+                     for bound in bounds]
+        with trace.span('sampling'):
+            x = np.union1d(np.linspace(domain_start, domain_end, num_points), edges)
+            if domain_start > domain_end:
+                x = x[::-1]
+            ys = evaluate_all(functions, x)
+        if cache is not None:
+            cache.put(key, (x, ys))
+    if valid_domain_only:
+        defined = ~np.isnan(ys).all(axis=0)
+        trace.count('discarded by domain', len(x) - np.count_nonzero(defined))
+        x, ys = x[defined], ys[:, defined]
+    stage_done(40)
+
+    with trace.span('find_intersections'):
+        sampled = find_all_intersections(x, ys)
+    stage_done(60)
+
+    # Refine each pair's points, or replace them by its exact intersections
+    found = {}
+    for point, pair in zip(sampled[0], sampled[1]):
+        found.setdefault(pair, ([], []))[0].append(point)
+    for interval, pair in zip(sampled[2], sampled[3]):
+        found.setdefault(pair, ([], []))[1].append(interval)
+
+    points, point_pairs, intervals, interval_pairs = [], [], [], []
+    with trace.span('refinement'):
+        for i, j in zip(*np.triu_indices(len(functions), 1)):
+            pair = (int(i), int(j))
+            pair_points, pair_intervals = pair_intersections(
+                functions[i], functions[j], x, ys[i], ys[j], *found.get(pair, ([], [])),
+                domain_start, domain_end, precision)
+            points.extend(pair_points)
+            point_pairs.extend([pair] * len(pair_points))
+            intervals.extend(pair_intervals)
+            interval_pairs.extend([pair] * len(pair_intervals))
+    stage_done(90)
+
+    # Report points along x, then by pair
+    order = sorted(range(len(points)), key=lambda k: (points[k][0], point_pairs[k]),
+                   reverse=bool(len(x) > 1 and x[0] > x[-1]))
+    points = [points[k] for k in order]
+    point_pairs = [point_pairs[k] for k in order]
+
+    interval_curves = sample_intervals(intervals, [functions[i] for i, _ in interval_pairs])
+    stage_done(100)
+
+    _count_solve(trace, budget, points, intervals)
+    return SolveResult(result_functions, precision, x, ys, points, intervals, interval_curves,
+                       point_pairs, interval_pairs)
@@ -0,0 +1,147 @@
+import numpy as np
+from expression import evaluate_all
+from roots import precision_to_xtol, refine_contact, refine_crossing
+
+
+class IntersectionStream:
+    """
+    Incremental find_intersections over consecutive chunks of samples.
+
+    Feeding the samples of one long array chunk by chunk yields the same
+    points and intervals, in the same order, as find_intersections on the
+    whole array. Only the last sample and a summary of the tolerance-band
+    run touching it are carried between chunks, so memory stays flat.
+    """
+
+    def __init__(self, tolerance=1e-6, valid_domain_only=False):
+        self.tolerance = tolerance
+        self.valid_domain_only = valid_domain_only
+        self._last = None
+        self._run = None
+
+    def feed(self, x, y1, y2):
+        """
+        Process the next chunk of samples.
+        Returns list of events: ('point', (x, y), bracket) or
+        ('interval', ((sx, sy), (ex, ey)), None), where bracket is the
+        (x_left, x_right) pair around a sign change and None otherwise.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y1 = np.asarray(y1, dtype=np.float64)
+        y2 = np.asarray(y2, dtype=np.float64)
+        if self.valid_domain_only:
+            valid = ~np.isnan(y1) & ~np.isnan(y2)
+            x, y1, y2 = x[valid], y1[valid], y2[valid]
+        if len(x) == 0:
+            return []
+
+        # Prepend the carried sample so pairs across the chunk boundary are seen
+        carried = self._last is not None
+        if carried:
+            x = np.concatenate(([self._last[0]], x))
+            y1 = np.concatenate(([self._last[1]], y1))
+            y2 = np.concatenate(([self._last[2]], y2))
+        self._last = (x[-1], y1[-1], y2[-1])
+        n = len(x)
+
+        with np.errstate(invalid='ignore'):
+            diff = y1 - y2
+            valid = ~np.isnan(y1) & ~np.isnan(y2)
+            in_band = valid & (np.abs(diff) <= self.tolerance)
+            edges = np.diff(np.concatenate(([0], in_band.astype(np.int8), [0])))
+            run_starts = np.flatnonzero(edges == 1)
+            run_ends = np.flatnonzero(edges == -1)
+            crossing = (~in_band[:-1] & valid[:-1] & valid[1:] &
+                        (diff[:-1] * diff[1:] < 0))
+
+        events = []
+        for i in np.flatnonzero(crossing):
+            point = ((x[i] + x[i + 1]) / 2, (y1[i] + y2[i]) / 2)
+            events.append((i, 'point', point, (x[i], x[i + 1])))
+
+        for start, end in zip(run_starts, run_ends):
+            if carried and start == 0 and self._run is not None:
+                # Continuation of the run left open by the previous chunk
+                run = self._run
+                run['length'] += end - 1
+                run['members'].extend((x[k], y1[k]) for k in range(1, min(end, 3)))
+                start = -1
+            else:
+                run = {'length': end - start,
+                       'members': [(x[k], y1[k]) for k in range(start, min(end, start + 2))]}
+            run['end'] = (x[end - 1], y1[end - 1])
+            del run['members'][2:]
+
+            if end == n:
+                self._run = run
+            else:
+                events.extend((start, kind, value, None) for kind, value in self._close(run))
+        if not in_band[-1]:
+            self._run = None
+
+        events.sort(key=lambda event: event[0])
+        return [event[1:] for event in events]
+
+    def finish(self):
+        """Flush the run touching the final sample, returns remaining events."""
+        run, self._run = self._run, None
+        if run is None:
+            return []
+        if run['length'] > 2:
+            return [(kind, value, None) for kind, value in self._close(run)]
+        # The very last sample is never reported as a point on its own
+        return [('point', member, None) for member in run['members'][:run['length'] - 1]]
+
+    @staticmethod
+    def _close(run):
+        """Events for a finished tolerance-band run."""
+        if run['length'] > 2:
+            return [('interval', (run['members'][0], run['end']))]
+        return [('point', member) for member in run['members']]
+
+
+def stream_intersections(f1, f2, domain_start, domain_end, num_points,
+                         chunk_size=1_000_000, precision=None,
+                         valid_domain_only=True, tolerance=1e-6):
+    """
+    Find intersections of two compiled functions on a uniform grid of
+    num_points samples, evaluated chunk_size samples at a time.
+
+    Yields ('point', (x, y)) and ('interval', ((sx, sy), (ex, ey))) as they
+    are found; memory use does not depend on num_points. When precision is
+    given, points are refined as by refine_intersections and a point within
+    the precision of the previously emitted one is dropped, also across
+    chunk boundaries.
+    """
+    stream = IntersectionStream(tolerance, valid_domain_only)
+    xtol = precision_to_xtol(precision) if precision is not None else None
+    step = (domain_end - domain_start) / (num_points - 1) if num_points > 1 else 0.0
+    low, high = min(domain_start, domain_end), max(domain_start, domain_end)
+    last_x = None
+
+    def emit(events):
+        nonlocal last_x
+        for kind, value, bracket in events:
+            if kind == 'point' and xtol is not None:
+                if bracket is not None:
+                    root = refine_crossing(f1, f2, bracket[0], bracket[1], xtol)
+                else:
+                    # Tolerance band samples, between their grid neighbours
+                    root = refine_contact(f1, f2, max(value[0] - abs(step), low), value[0],
+                                          min(value[0] + abs(step), high), xtol)
+                value = root or value
+                if last_x is not None and abs(value[0] - last_x) <= xtol:
+                    continue
+                last_x = value[0]
+            yield kind, value
+
+    for chunk_start in range(0, num_points, chunk_size):
+        chunk_end = min(chunk_start + chunk_size, num_points)
+        # Same grid as np.linspace(domain_start, domain_end, num_points)
+        x = np.arange(chunk_start, chunk_end, dtype=np.float64) * step + domain_start
+        if chunk_end == num_points and num_points > 1:
+            x[-1] = domain_end
+        y1, y2 = evaluate_all((f1, f2), x)
+        yield from emit(stream.feed(x, y1, y2))
+
+    yield from emit(stream.finish())
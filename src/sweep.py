@@ -0,0 +1,146 @@
+import numpy as np
+from intersections import find_row_intersections
+from solver import (SolveCancelled, SolveResult, pair_intersections, sample_intervals,
+                    solve_budget, stage_reporter)
+from tracing import NULL_TRACE
+
+
+class SweepResult:
+    """
+    Intersections of two functions of x and the parameter a, over a range
+    of parameter values.
+
+    y1 and y2 are (len(parameters), len(x)) sample grids; points and
+    intervals hold one list per parameter value. branches holds one
+    (len(parameters), 2) array of (x, y) per intersection followed across
+    parameter values, NaN where the branch does not exist.
+    """
+
+    def __init__(self, f1, f2, precision, parameters, x, y1, y2, points, intervals, branches):
+        self.f1 = f1
+        self.f2 = f2
+        self.precision = precision
+        self.parameters = parameters
+        self.x = x
+        self.y1 = y1
+        self.y2 = y2
+        self.points = points
+        self.intervals = intervals
+        self.branches = branches
+
+    def step(self, index):
+        """SolveResult for a single parameter value."""
+        f1 = self.f1.bind(self.parameters[index])
+        f2 = self.f2.bind(self.parameters[index])
+        intervals = self.intervals[index]
+        interval_curves = sample_intervals(intervals, [f1] * len(intervals))
+        return SolveResult([f1, f2], self.precision, self.x,
+                           np.vstack((self.y1[index], self.y2[index])),
+                           self.points[index], intervals, interval_curves)
+
+
+def sweep(f1, f2, parameters, domain_start, domain_end, num_points, precision,
+          max_jump=None, progress=None, is_cancelled=None, time_limit=None,
+          max_evaluations=None, trace=NULL_TRACE):
+    """
+    Find intersections of two compiled functions of x and a for every value
+    in parameters.
+
+    Both functions are evaluated over the whole (parameters x x) grid in one
+    broadcast pass and all parameter rows are scanned for intersections at
+    once; crossings are then refined per parameter value. Points are linked
+    into branches by track_branches, allowing jumps of max_jump in x
+    between consecutive parameter values (default: 5% of the domain).
+    Progress, cancellation, budget and trace arguments are as for
+    solver.solve.
+    """
+    parameters = np.asarray(parameters, dtype=np.float64)
+    budget = solve_budget(time_limit, max_evaluations, trace)
+    stage_done = stage_reporter(progress, is_cancelled)
+
+    x = np.linspace(domain_start, domain_end, num_points)
+    if budget is not None:
+        budget.charge(2 * len(parameters) * len(x))
+    with trace.span('sampling'):
+        y1 = f1.sweep(x, parameters)
+        y2 = f2.sweep(x, parameters)
+    stage_done(40)
+
+    with trace.span('find_intersections'):
+        found_points, point_rows, found_intervals, interval_rows = find_row_intersections(x, y1, y2)
+    sampled = [([], []) for _ in parameters]
+    for point, row in zip(found_points, point_rows):
+        sampled[row][0].append(point)
+    for interval, row in zip(found_intervals, interval_rows):
+        sampled[row][1].append(interval)
+    stage_done(60)
+
+    points, intervals = [], []
+    with trace.span('refinement'):
+        for row, value in enumerate(parameters):
+            bound1, bound2 = f1.bind(value), f2.bind(value)
+            if budget is not None:
+                bound1, bound2 = budget.guard(bound1), budget.guard(bound2)
+            row_points, row_intervals = pair_intersections(
+                bound1, bound2, x, y1[row], y2[row], *sampled[row],
+                domain_start, domain_end, precision)
+            points.append(row_points)
+            intervals.append(row_intervals)
+            if is_cancelled is not None and is_cancelled():
+                raise SolveCancelled()
+    stage_done(90)
+
+    if max_jump is None:
+        max_jump = 0.05 * abs(domain_end - domain_start)
+    with trace.span('branch tracking'):
+        branches = track_branches(points, max_jump)
+    stage_done(100)
+
+    if budget is not None:
+        trace.count('evaluations', budget.evaluations)
+    trace.count('intersections', sum(map(len, points)) + sum(map(len, intervals)))
+
+    return SweepResult(f1, f2, precision, parameters, x, y1, y2, points, intervals, branches)
+
+
+def track_branches(points, max_jump):
+    """
+    Link intersection points of consecutive parameter values into branches.
+
+    points holds one list of (x, y) per parameter value. Each open branch
+    continues with the nearest unclaimed point of the next parameter value,
+    measured from the position extrapolated from its last two points, if it
+    is within max_jump in x; leftover points start new branches. Returns a
+    list of (len(points), 2) arrays, NaN where a branch has no point.
+    """
+    branches = []
+    open_branches = []
+    for step, step_points in enumerate(points):
+        candidates = []
+        for branch in open_branches:
+            track = branches[branch]
+            predicted = track[step - 1, 0]
+            if step >= 2 and not np.isnan(track[step - 2, 0]):
+                predicted += track[step - 1, 0] - track[step - 2, 0]
+            for index, (px, _) in enumerate(step_points):
+                distance = abs(px - predicted)
+                if distance <= max_jump:
+                    candidates.append((distance, branch, index))
+
+        continued, claimed = [], set()
+        for _, branch, index in sorted(candidates):
+            if branch in continued or index in claimed:
+                continue
+            branches[branch][step] = step_points[index]
+            continued.append(branch)
+            claimed.add(index)
+
+        open_branches = sorted(continued)
+        for index, point in enumerate(step_points):
+            if index not in claimed:
+                track = np.full((len(points), 2), np.nan)
+                track[step] = point
+                branches.append(track)
+                open_branches.append(len(branches) - 1)
+
+    return branches
@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+
+
+class Trace:
+    """
+    Named timing spans and counters recorded during one solve.
+
+    Spans may be recorded from the GUI and worker threads alike; each keeps
+    its start offset from the creation of the trace, its duration and the
+    thread it ran on, so nested spans stay distinguishable in the JSON.
+    """
+
+    enabled = True
+
+    def __init__(self, label=""):
+        self.label = label
+        self.spans = []
+        self.counters = {}
+        self.total = None
+        self._origin = time.perf_counter()
+
+    def span(self, name):
+        """Context manager timing the enclosed block as a span called name."""
+        return _Span(self, name)
+
+    def count(self, name, value=1):
+        """Add value to the counter called name."""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def finish(self):
+        """Record the time from creation to now as the total."""
+        self.total = time.perf_counter() - self._origin
+
+    def totals(self):
+        """Total seconds per span name, in order of first appearance."""
+        totals = {}
+        for span in self.spans:
+            totals[span['name']] = totals.get(span['name'], 0.0) + span['duration']
+        return totals
+
+    def summary(self):
+        """One-line summary of span times and counters for the status bar."""
+        parts = [f"{name} {seconds * 1e3:.1f} ms" for name, seconds in self.totals().items()]
+        if self.total is not None:
+            parts.append(f"total {self.total * 1e3:.1f} ms")
+        parts.extend(f"{value} {name}" for name, value in self.counters.items())
+        return " | ".join(parts)
+
+    def to_dict(self):
+        return {
+            'label': self.label,
+            'total': self.total,
+            'spans': list(self.spans),
+            'counters': dict(self.counters),
+        }
+
+    def save(self, path):
+        """Write the trace as JSON."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+class _Span:
+    __slots__ = ('trace', 'name', 'start')
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter()
+        self.trace.spans.append({
+            'name': self.name,
+            'start': self.start - self.trace._origin,
+            'duration': end - self.start,
+            'thread': threading.current_thread().name,
+        })
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class NullTrace:
+    """Disabled trace: spans and counters are no-ops."""
+
+    enabled = False
+    _span = _NullSpan()
+
+    def span(self, name):
+        return self._span
+
+    def count(self, name, value=1):
+        pass
+
+    def finish(self):
+        pass
+
+
+# Shared default for code paths that are not being traced
+NULL_TRACE = NullTrace()
@@ -1,39 +1,115 @@
-from PySide2.QtWidgets import QTableWidget, QTableWidgetItem
+from PySide2.QtWidgets import QTableView, QHeaderView
+from PySide2.QtCore import QAbstractTableModel, QModelIndex, Qt
+import numpy as np
 
 
-class IntersectionTable(QTableWidget):
+class IntersectionModel(QAbstractTableModel):
+    """Table model over raw intersection arrays, formatting cells on demand."""
+
+    HEADERS = ['Type', 'Start (x, y)', 'End (x, y)', 'Functions']
+
+    def __init__(self):
+        super().__init__()
+        self.points = np.empty((0, 2))
+        self.intervals = np.empty((0, 4))
+        # Function index pairs of the rows, points first
+        self.pairs = np.empty((0, 2), dtype=np.int64)
+        self.precision = 2
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.points) + len(self.intervals)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+
+        row, column = index.row(), index.column()
+        if column == 3:
+            first, second = self.pairs[row]
+            return f"f{first + 1}, f{second + 1}"
+        if row < len(self.points):
+            if column == 0:
+                return "Point"
+            if column == 1:
+                return self._format_pair(*self.points[row])
+            return "-"
+
+        start_x, start_y, end_x, end_y = self.intervals[row - len(self.points)]
+        if column == 0:
+            return "Interval"
+        if column == 1:
+            return self._format_pair(start_x, start_y)
+        return self._format_pair(end_x, end_y)
+
+    def set_intersections(self, points, intervals, precision,
+                          point_pairs=None, interval_pairs=None):
+        """
+        Replace the intersection arrays. Pairs default to (0, 1), i.e. all
+        rows are intersections of f1 and f2.
+        """
+        self.beginResetModel()
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self.intervals = np.asarray(intervals, dtype=np.float64).reshape(-1, 4)
+        pairs = [np.asarray(given, dtype=np.int64).reshape(-1, 2) if given is not None
+                 else np.tile([0, 1], (count, 1))
+                 for given, count in ((point_pairs, len(self.points)),
+                                      (interval_pairs, len(self.intervals)))]
+        self.pairs = np.concatenate(pairs)
+        self.precision = precision
+        self.endResetModel()
+
+    def set_precision(self, precision):
+        """Change the number of decimals shown, without rebuilding rows."""
+        self.precision = precision
+        if self.rowCount():
+            self.dataChanged.emit(self.index(0, 1), self.index(self.rowCount() - 1, 2),
+                                  [Qt.DisplayRole])
+
+    def _format_pair(self, x, y):
+        return f"({x:.{self.precision}f}, {y:.{self.precision}f})"
+
+
+class IntersectionTable(QTableView):
     """Table widget to display intersection points and intervals."""
 
     def __init__(self):
         super().__init__()
-        self.setColumnCount(3)
-        self.setHorizontalHeaderLabels(['Type', 'Start (x, y)', 'End (x, y)'])
+        self.intersection_model = IntersectionModel()
+        self.setModel(self.intersection_model)
         self.horizontalHeader().setStretchLastSection(True)
         self.verticalHeader().setVisible(False)
 
-    def update_intersections(self, points, intervals, precision):
+        # Fixed row heights keep scrolling through very large results cheap
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+
+    def rowCount(self):
+        return self.intersection_model.rowCount()
+
+    def columnCount(self):
+        return self.intersection_model.columnCount()
+
+    def cell_text(self, row, column):
+        """Displayed text of a cell."""
+        return self.intersection_model.index(row, column).data()
+
+    def update_intersections(self, points, intervals, precision,
+                             point_pairs=None, interval_pairs=None):
         """Update table with intersection points and intervals."""
-        total_rows = len(points) + len(intervals)
-        self.setRowCount(total_rows)
-        format_str = f"{{:.{precision}f}}"
-
-        row = 0
-        # Add points
-        for x, y in points:
-            self.setItem(row, 0, QTableWidgetItem("Point"))
-            self.setItem(row, 1, QTableWidgetItem(
-                f"({format_str.format(x)}, {format_str.format(y)})")
-                         )
-            self.setItem(row, 2, QTableWidgetItem("-"))
-            row += 1
-
-        # Add intervals
-        for start, end in intervals:
-            self.setItem(row, 0, QTableWidgetItem("Interval"))
-            self.setItem(row, 1, QTableWidgetItem(
-                f"({format_str.format(start[0])}, {format_str.format(start[1])})")
-                         )
-            self.setItem(row, 2, QTableWidgetItem(
-                f"({format_str.format(end[0])}, {format_str.format(end[1])})")
-                         )
-            row += 1
+        self.intersection_model.set_intersections(points, intervals, precision,
+                                                  point_pairs, interval_pairs)
+
+    def set_precision(self, precision):
+        """Re-format the shown intersections with a new decimal precision."""
+        self.intersection_model.set_precision(precision)
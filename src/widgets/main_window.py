@@ -1,20 +1,43 @@
 from PySide2.QtWidgets import (QSplitter, QMainWindow, QWidget, QVBoxLayout,
-                               QHBoxLayout, QLineEdit, QPushButton, QLabel, QApplication)
+                               QHBoxLayout, QLineEdit, QPushButton, QLabel, QApplication,
+                               QProgressBar, QSlider, QFileDialog)
+from PySide2.QtCore import Qt, QThreadPool, QTimer, Signal
 
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
-from matplotlib.figure import Figure
+from functools import partial
 import numpy as np
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 from widgets.intersection_table import IntersectionTable
 from widgets.plot_settings import PlotSettings
-from function_parser import FunctionParser
-from utils import show_domain_restriction_dialog, evaluate_function, find_intersections
+from widgets.solve_worker import SolveWorker
+from solver import solve, solve_all, domain_restriction
+from sweep import SweepResult, sweep
+from cache import ExpressionCache, SampleCache
+from tracing import NULL_TRACE, Trace
+from utils import show_domain_restriction_dialog
 
 
 class MainWindow(QMainWindow):
+    # Emitted once a solve has been plotted or has failed
+    solve_finished = Signal()
+
+    # Emitted once, after the window has been painted for the first time
+    first_painted = Signal()
+
+    # Function evaluations one solve may spend, on top of its time limit
+    max_evaluations = 50_000_000
+
+    # Seconds the domain scan before a solve may spend on the GUI thread
+    # before falling back to checking the sample grid
+    domain_scan_time_limit = 0.1
+
+    # Samples per function in the live preview shown while typing
+    preview_points = 200
+
+    # Line colors of f1, f2, ... cycling for many functions
+    FUNCTION_COLORS = ['blue', 'red', 'orange', 'purple', 'brown', 'magenta', 'olive', 'cyan']
+
     def __init__(self):
         super().__init__()
         self.setObjectName("mainWindow")
@@ -54,6 +77,16 @@ class MainWindow(QMainWindow):
         func2_layout.addWidget(self.func2_input)
         input_layout.addLayout(func2_layout)
 
+        # Further function inputs, added and removed on demand
+        self.function_inputs = [self.func1_input, self.func2_input]
+        self._extra_rows = []
+        self.extra_inputs_layout = QVBoxLayout()
+        input_layout.addLayout(self.extra_inputs_layout)
+        self.add_function_button = QPushButton("Add Function")
+        self.add_function_button.setObjectName("addFunctionButton")
+        self.add_function_button.clicked.connect(lambda: self.add_function_input())
+        input_layout.addWidget(self.add_function_button)
+
         # plot settings
         self.plot_settings = PlotSettings()
         input_layout.addWidget(self.plot_settings)
@@ -64,6 +97,20 @@ class MainWindow(QMainWindow):
         self.solve_button.clicked.connect(self.solve_and_plot)
         input_layout.addWidget(self.solve_button)
 
+        # Cancel button and progress of the running solve
+        progress_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setObjectName("solveProgress")
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setVisible(False)
+        progress_layout.addWidget(self.progress_bar)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setObjectName("cancelButton")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_solve)
+        progress_layout.addWidget(self.cancel_button)
+        input_layout.addLayout(progress_layout)
+
         # Error message label
         self.error_label = QLabel()
         self.error_label.setObjectName("errorLabel")
@@ -78,14 +125,29 @@ class MainWindow(QMainWindow):
         plot_widget = QWidget()
         plot_layout = QVBoxLayout(plot_widget)
 
-        # Create matplotlib figure
-        self.figure = Figure(figsize=(8, 6))
-        self.canvas = FigureCanvas(self.figure)
-
-        # Add navigation toolbar
-        self.toolbar = NavigationToolbar(self.canvas, self)
-        plot_layout.addWidget(self.toolbar)
-        plot_layout.addWidget(self.canvas)
+        # The matplotlib figure, canvas and toolbar are created by
+        # _create_plot after the window is first shown, or on first use
+        self._plot_layout = plot_layout
+        self._figure = None
+        self._painted = False
+
+        # Scrub or animate through the parameter values of a sweep
+        self.sweep_bar = QWidget()
+        sweep_layout = QHBoxLayout(self.sweep_bar)
+        sweep_layout.setContentsMargins(0, 0, 0, 0)
+        self.play_button = QPushButton("Play")
+        self.play_button.setObjectName("playButton")
+        self.play_button.clicked.connect(self.toggle_sweep_animation)
+        sweep_layout.addWidget(self.play_button)
+        self.sweep_slider = QSlider(Qt.Horizontal)
+        self.sweep_slider.setObjectName("sweepSlider")
+        self.sweep_slider.valueChanged.connect(self._on_sweep_slider_changed)
+        sweep_layout.addWidget(self.sweep_slider)
+        self.sweep_label = QLabel()
+        self.sweep_label.setObjectName("sweepLabel")
+        sweep_layout.addWidget(self.sweep_label)
+        self.sweep_bar.setVisible(False)
+        plot_layout.addWidget(self.sweep_bar)
 
         # Create intersection points table
         table_widget = QWidget()
@@ -102,134 +164,594 @@ class MainWindow(QMainWindow):
 
         layout.addWidget(splitter)
 
-        self.ax = self.figure.add_subplot(111)
+        self._job_id = 0
+        self._worker = None
+        self._autoscale = True
+        self._solve_args = None
+        self._job_args = None
+        self._result = None
+        self._job_trace = NULL_TRACE
+        self.last_trace = None
+        self._sweep_result = None
+        self._sweep_timer = QTimer(self)
+        self._sweep_timer.setInterval(100)
+        self._sweep_timer.timeout.connect(self._advance_sweep)
+
+        # Samples are reused across solves, changing precision only re-formats
+        self.sample_cache = SampleCache()
+        # Functions are parsed once per text, however often they are checked
+        self.expressions = ExpressionCache()
+        self.plot_settings.precision.valueChanged.connect(self._on_precision_changed)
+
+        # Re-sample the visible range after zooming or panning settles
+        self._updating_plot = False
+        self._viewport_timer = QTimer(self)
+        self._viewport_timer.setSingleShot(True)
+        self._viewport_timer.setInterval(150)
+        self._viewport_timer.timeout.connect(self.resample_viewport)
+
+        # Stage timings of the last traced solve
+        self.export_trace_button = QPushButton("Export Trace")
+        self.export_trace_button.setObjectName("exportTraceButton")
+        self.export_trace_button.setEnabled(False)
+        self.export_trace_button.clicked.connect(lambda: self.export_trace())
+        self.statusBar().addPermanentWidget(self.export_trace_button)
+
+        # Validate and preview the functions once typing pauses
+        self._preview_key = None
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(300)
+        self._preview_timer.timeout.connect(self.update_preview)
+        for line_edit in self.function_inputs:
+            line_edit.textChanged.connect(self._preview_timer.start)
+
+    @property
+    def figure(self):
+        self._create_plot()
+        return self._figure
+
+    @property
+    def canvas(self):
+        self._create_plot()
+        return self._canvas
+
+    @property
+    def toolbar(self):
+        self._create_plot()
+        return self._toolbar
+
+    @property
+    def ax(self):
+        self._create_plot()
+        return self._ax
+
+    def _create_plot(self):
+        """Import matplotlib and build the figure, canvas, toolbar and artists once."""
+        if self._figure is not None:
+            return
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
+        from matplotlib.figure import Figure
+
+        # Create matplotlib figure
+        self._figure = Figure(figsize=(8, 6))
+        self._canvas = FigureCanvas(self._figure)
+
+        # Add navigation toolbar above the canvas
+        self._toolbar = NavigationToolbar(self._canvas, self)
+        self._plot_layout.insertWidget(0, self._toolbar)
+        self._plot_layout.insertWidget(1, self._canvas)
+
+        self._ax = self._figure.add_subplot(111)
+        self._init_artists()
+        self._ax.callbacks.connect('xlim_changed', self._on_xlim_changed)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._painted:
+            # Children paint in the same pass, the timer fires once all are done
+            self._painted = True
+            QTimer.singleShot(0, self._on_first_paint)
+
+    def _on_first_paint(self):
+        self.first_painted.emit()
+        # Build the plot right after the first paint instead of before it
+        QTimer.singleShot(0, self._create_plot)
+
+    def add_function_input(self, text=""):
+        """Add an input row for one more function, returns its line edit."""
+        row = QWidget()
+        row_layout = QHBoxLayout(row)
+        row_layout.setContentsMargins(0, 0, 0, 0)
+        label = QLabel()
+        label.setObjectName("functionLabel")
+        row_layout.addWidget(label)
+        line_edit = QLineEdit(text)
+        line_edit.setObjectName("functionInput")
+        line_edit.setPlaceholderText("Enter another function")
+        row_layout.addWidget(line_edit)
+        remove_button = QPushButton("Remove")
+        remove_button.setObjectName("removeFunctionButton")
+        remove_button.clicked.connect(lambda: self.remove_function_input(line_edit))
+        row_layout.addWidget(remove_button)
+        line_edit.textChanged.connect(self._preview_timer.start)
+
+        self.extra_inputs_layout.addWidget(row)
+        self._extra_rows.append((row, label, line_edit))
+        self.function_inputs.append(line_edit)
+        self._number_function_inputs()
+        return line_edit
+
+    def remove_function_input(self, line_edit):
+        """Remove an input row added by add_function_input."""
+        for entry in self._extra_rows:
+            row, _, edit = entry
+            if edit is line_edit:
+                self._extra_rows.remove(entry)
+                self.function_inputs.remove(line_edit)
+                self.extra_inputs_layout.removeWidget(row)
+                row.deleteLater()
+                self._preview_timer.start()
+                break
+        self._number_function_inputs()
+
+    def _number_function_inputs(self):
+        for number, (_, label, _) in enumerate(self._extra_rows, start=3):
+            label.setText(f"Function {number}:")
+
+    def _input_key(self):
+        """What the plot shows: the function texts, sweep mode and domain."""
+        return (tuple(line_edit.text().strip() for line_edit in self.function_inputs),
+                self.plot_settings.sweep_enabled.isChecked(),
+                self.plot_settings.parameter_start.value(),
+                self.plot_settings.domain_start.value(),
+                self.plot_settings.domain_end.value())
+
+    def update_preview(self):
+        """
+        Validate the typed functions and plot them at preview_points
+        samples, without solving. Empty inputs are skipped; the shown
+        solve, if any, is discarded as it no longer matches the inputs.
+        """
+        self._preview_timer.stop()
+        key = self._input_key()
+        if key == self._preview_key:
+            return
+        func_strs, sweeping, parameter, domain_start, domain_end = key
+
+        functions = []
+        for number, func_str in enumerate(func_strs, start=1):
+            if not func_str:
+                functions.append(None)
+                continue
+            is_valid, error = self.expressions.validate(func_str, parameter=sweeping)
+            try:
+                if not is_valid:
+                    raise ValueError(error)
+                function = self.expressions.compile(func_str, parameter=sweeping)
+            except Exception as e:
+                self.error_label.setText(f"Function {number}: {str(e)}")
+                return
+            # A sweep is previewed at its first parameter value
+            functions.append(function.bind(parameter) if sweeping else function)
+        self.error_label.setText("")
+
+        self.cancel_solve()
+        self._solve_args = None
+        self._result = None
+        self._preview_key = key
+        self._clear_sweep()
+
+        # Preview samples are cached per function, so only edited ones are evaluated
+        x = np.linspace(domain_start, domain_end, self.preview_points)
+        ys = []
+        for function in functions:
+            if function is None:
+                ys.append(None)
+                continue
+            sample_key = ('preview', function.tree, domain_start, domain_end, self.preview_points)
+            cached = self.sample_cache.get(sample_key)
+            if cached is None:
+                cached = (function(x),)
+                self.sample_cache.put(sample_key, cached)
+            ys.append(cached[0])
+        self._show_preview(x, ys, func_strs)
+
+    def _show_preview(self, x, ys, func_strs):
+        """Plot preview curves, clearing the intersections of the last solve."""
+        while len(self.function_lines) < len(ys):
+            color = self.FUNCTION_COLORS[len(self.function_lines) % len(self.FUNCTION_COLORS)]
+            self.function_lines.append(self.ax.plot([], [], color=color)[0])
+        for number, line in enumerate(self.function_lines, start=1):
+            shown = number <= len(ys) and ys[number - 1] is not None
+            if shown:
+                self._set_line(line, x, ys[number - 1], f"f{number}(x) = {func_strs[number - 1]}")
+            else:
+                self._set_line(line, [], [])
+            line.set_visible(shown)
+
+        self.intersection_table.update_intersections([], [], self.plot_settings.precision.value())
+        self.points_scatter.set_offsets(np.empty((0, 2)))
+        self._update_annotations([], 0)
+        self._set_line(self.interval_line, [], [])
+
+        self._update_legend()
+        self._updating_plot = True
+        try:
+            self.ax.relim()
+            self.ax.autoscale_view()
+        finally:
+            self._updating_plot = False
+        self.canvas.draw_idle()
 
     def solve_and_plot(self):
-        """Solve the functions and create the plot."""
+        """Validate the functions and start solving them in the background."""
         self.error_label.setText("")
-        self.ax.clear()
+        # An explicit solve supersedes the pending preview
+        self._preview_timer.stop()
+        self._preview_key = self._input_key()
 
         # Get functions from input
-        func1_str = self.func1_input.text().strip()
-        func2_str = self.func2_input.text().strip()
+        func_strs = [line_edit.text().strip() for line_edit in self.function_inputs]
 
         # Get plot settings
         domain_start = self.plot_settings.domain_start.value()
         domain_end = self.plot_settings.domain_end.value()
         num_points = self.plot_settings.num_points.value()
         precision = self.plot_settings.precision.value()
+        sweeping = self.plot_settings.sweep_enabled.isChecked()
+
+        trace = self._new_trace()
 
-        # Check if both functions are provided
-        if not func1_str or not func2_str:
+        # Check if all functions are provided
+        if not func_strs[0] or not func_strs[1]:
             self.error_label.setText("Please enter both functions")
             return
-
-        # Validate inputs
-        parser = FunctionParser()
-        valid1, error1 = parser.validate_function(func1_str)
-        valid2, error2 = parser.validate_function(func2_str)
-
-        if not valid1:
-            self.error_label.setText(f"Function 1: {error1}")
+        if not all(func_strs):
+            self.error_label.setText("Please enter all functions or remove the empty ones")
             return
-        if not valid2:
-            self.error_label.setText(f"Function 2: {error2}")
+        if sweeping and len(func_strs) != 2:
+            self.error_label.setText("Parameter sweep needs exactly two functions")
             return
 
+        # Validate inputs, texts checked before are not parsed again
+        with trace.span('validation'):
+            for number, func_str in enumerate(func_strs, start=1):
+                is_valid, error = self.expressions.validate(func_str, parameter=sweeping)
+                if not is_valid:
+                    self.error_label.setText(f"Function {number}: {error}")
+                    return
+
         try:
-            # Create x values for plotting
-            x = np.linspace(domain_start, domain_end, num_points)
+            with trace.span('compilation'):
+                functions = [self.expressions.compile(func_str, parameter=sweeping)
+                             for func_str in func_strs]
 
-            # Check for domain restrictions
-            domain_restricted = False
+            # Check for domain restrictions, which depend on a when sweeping
             plot_valid_domain = True
-            for xi in x:
-                is_valid1, restriction1 = parser.check_domain_restrictions(func1_str, xi)
-                is_valid2, restriction2 = parser.check_domain_restrictions(func2_str, xi)
-
-                if (not is_valid1 and restriction1) or (not is_valid2 and restriction2):
-                    domain_restricted = True
-                    restriction_type = restriction1 if not is_valid1 else restriction2
+            if not sweeping:
+                with trace.span('domain scan'):
+                    restriction_type = domain_restriction(
+                        functions, domain_start, domain_end, num_points, self.sample_cache,
+                        time_limit=self.domain_scan_time_limit)
+                if restriction_type is not None:
                     plot_valid_domain = show_domain_restriction_dialog(restriction_type)
-                    break
-
-            # Calculate y values with domain handling
-            y1 = []
-            y2 = []
-            valid_x = []
-
-            for xi in x:
-                val1 = evaluate_function(parser, func1_str, xi)
-                val2 = evaluate_function(parser, func2_str, xi)
-
-                if plot_valid_domain if domain_restricted else True:
-                    if val1 is not None and val2 is not None:
-                        valid_x.append(xi)
-                        y1.append(val1)
-                        y2.append(val2)
-                else:
-                    y1.append(val1 if val1 is not None else np.nan)
-                    y2.append(val2 if val2 is not None else np.nan)
-
-            # Plot functions
-            if domain_restricted and plot_valid_domain:
-                plot_x = valid_x
-                plot_y1 = y1
-                plot_y2 = y2
-            else:
-                plot_x = x
-                plot_y1 = y1
-                plot_y2 = y2
-
-            # Find intersections
-            points, intervals = find_intersections(
-                np.array(plot_x),
-                np.array(plot_y1),
-                np.array(plot_y2)
-            )
-
-            # Round intersection points and intervals based on precision
-            points = [(round(x, precision), round(y, precision)) for x, y in points]
-            intervals = [((round(sx, precision), round(sy, precision)),
-                          (round(ex, precision), round(ey, precision)))
-                         for (sx, sy), (ex, ey) in intervals]
-
-            # Update intersection table
-            self.intersection_table.update_intersections(points, intervals, precision)
-
-            # Format for annotations
-            format_str = f"{{:.{precision}f}}"
-
-            # Plot regular parts of functions
-            self.ax.plot(plot_x, plot_y1, label=f"f1(x) = {func1_str}", color='blue')
-            self.ax.plot(plot_x, plot_y2, label=f"f2(x) = {func2_str}", color='red')
-
-            # Plot intersection points and intervals
-            if points:
-                x_points, y_points = zip(*points)
-                self.ax.scatter(x_points, y_points, color='black',
-                                zorder=5, label='Intersection Points')
-                for x_int, y_int in points:
-                    self.ax.annotate(f'({format_str.format(x_int)}, {format_str.format(y_int)})',
-                                     (x_int, y_int), xytext=(5, 5),
-                                     textcoords='offset points'
-                                     )
-
-            # Highlight intersection intervals
-            for (start_x, start_y), (end_x, end_y) in intervals:
-                # Create x values for the interval
-                interval_x = np.linspace(start_x, end_x, 100)
-                # Calculate y values using one of the functions
-                interval_y = [evaluate_function(parser, func1_str, xi) for xi in interval_x]
-                # Plot the interval in green
-                self.ax.plot(interval_x, interval_y, color='green', linewidth=2,
-                             label='Intersection Interval' if interval_x[0] == intervals[0][0][0] else "")
-
-            self.ax.grid(True)
-            self.ax.legend()
-            self.ax.set_xlabel('x')
-            self.ax.set_ylabel('y')
-            self.canvas.draw()
 
         except Exception as e:
             self.error_label.setText(f"Error: {str(e)}")
+            return
+
+        if sweeping:
+            # All parameter values are evaluated on one uniform grid
+            self._solve_args = dict(
+                f1=functions[0], f2=functions[1],
+                parameters=np.linspace(self.plot_settings.parameter_start.value(),
+                                       self.plot_settings.parameter_end.value(),
+                                       self.plot_settings.parameter_steps.value()))
+        elif len(functions) == 2:
+            self._solve_args = dict(
+                f1=functions[0], f2=functions[1],
+                adaptive=self.plot_settings.sampling.currentText() == "Adaptive",
+                valid_domain_only=plot_valid_domain)
+        else:
+            # Many functions share one uniform grid
+            self._solve_args = dict(functions=functions, valid_domain_only=plot_valid_domain)
+        self._solve_args.update(
+            domain_start=domain_start, domain_end=domain_end,
+            num_points=num_points, precision=precision,
+            time_limit=self.plot_settings.time_limit.value(),
+            max_evaluations=self.max_evaluations)
+        self._start_solve(self._solve_args, autoscale=True, trace=trace)
+
+    def _start_solve(self, args, autoscale, trace=None):
+        """Run the compute stage in the background, replacing any stale job."""
+        self.cancel_solve()
+        self._job_id += 1
+        self._job_args = args
+        self._autoscale = autoscale
+        self._job_trace = trace = trace if trace is not None else self._new_trace()
+        if 'parameters' in args:
+            compute = sweep
+        else:
+            compute = partial(solve_all if 'functions' in args else solve, cache=self.sample_cache)
+        worker = SolveWorker(self._job_id, lambda progress, is_cancelled: compute(
+            progress=progress, is_cancelled=is_cancelled, trace=trace, **args))
+        worker.signals.progress.connect(self._on_solve_progress)
+        worker.signals.finished.connect(self._on_solve_finished)
+        worker.signals.failed.connect(self._on_solve_failed)
+        self._worker = worker
+        self._set_busy(True)
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_xlim_changed(self, ax):
+        # Debounce zoom and pan, ignoring limit changes made by plot_result itself
+        if self._solve_args is not None and not self._updating_plot:
+            self._viewport_timer.start()
+
+    def resample_viewport(self):
+        """Re-sample the visible x-range at screen resolution."""
+        if self._solve_args is None:
+            return
+        args = self._solve_args
+        low, high = sorted(self.ax.get_xlim())
+        low = max(low, min(args['domain_start'], args['domain_end']))
+        high = min(high, max(args['domain_start'], args['domain_end']))
+        if low >= high:
+            return
+
+        viewport_args = dict(args, domain_start=low, domain_end=high,
+                             num_points=max(int(self.ax.bbox.width), 100))
+        self._start_solve(viewport_args, autoscale=False)
+
+    def cancel_solve(self):
+        """Cancel the running solve, if any."""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        self._set_busy(False)
+
+    def closeEvent(self, event):
+        self.cancel_solve()
+        super().closeEvent(event)
+
+    def _set_busy(self, busy):
+        self.cancel_button.setEnabled(busy)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(busy)
+
+    def _is_current_job(self, job_id):
+        return self._worker is not None and job_id == self._job_id
+
+    def _on_solve_progress(self, job_id, percent):
+        if self._is_current_job(job_id):
+            self.progress_bar.setValue(percent)
+
+    def _on_solve_failed(self, job_id, message):
+        if not self._is_current_job(job_id):
+            return
+        self._worker = None
+        self._set_busy(False)
+        self.error_label.setText(f"Error: {message}")
+        self._finish_trace(self._job_trace)
+        self.solve_finished.emit()
+
+    def _on_solve_finished(self, job_id, result):
+        if not self._is_current_job(job_id):
+            return
+        self._worker = None
+        self._set_busy(False)
+        trace = self._job_trace
+        try:
+            with trace.span('plot'):
+                if isinstance(result, SweepResult):
+                    self.show_sweep(result, autoscale=self._autoscale, trace=trace)
+                else:
+                    self._clear_sweep()
+                    self.plot_result(result, autoscale=self._autoscale, trace=trace)
+            if trace.enabled:
+                # Draw now rather than on idle, so the draw can be timed
+                with trace.span('draw'):
+                    self.canvas.draw()
+        except Exception as e:
+            self.error_label.setText(f"Error: {str(e)}")
+        self._finish_trace(trace)
+        self.solve_finished.emit()
+
+    def _new_trace(self):
+        """A trace for the next solve, or NULL_TRACE when timings are off."""
+        if not self.plot_settings.record_timings.isChecked():
+            return NULL_TRACE
+        return Trace("; ".join(line_edit.text().strip() for line_edit in self.function_inputs))
+
+    def _finish_trace(self, trace):
+        """Show the timings of a finished solve in the status bar."""
+        if not trace.enabled:
+            return
+        trace.finish()
+        self.last_trace = trace
+        self.statusBar().showMessage(trace.summary())
+        self.export_trace_button.setEnabled(True)
+
+    def export_trace(self, path=None):
+        """Save the last trace as JSON, asking for a file when path is None."""
+        if self.last_trace is None:
+            return
+        if path is None:
+            path, _ = QFileDialog.getSaveFileName(self, "Export Trace", "trace.json",
+                                                  "JSON files (*.json)")
+            if not path:
+                return
+        self.last_trace.save(path)
+
+    def plot_result(self, result, autoscale=True, trace=NULL_TRACE):
+        """Show a solve result in the table and plot."""
+        self._create_plot()
+        self._result = result
+
+        # Update function curves in place, hiding lines of functions no longer shown
+        while len(self.function_lines) < len(result.functions):
+            color = self.FUNCTION_COLORS[len(self.function_lines) % len(self.FUNCTION_COLORS)]
+            self.function_lines.append(self.ax.plot([], [], color=color)[0])
+        for number, line in enumerate(self.function_lines, start=1):
+            if number <= len(result.functions):
+                self._set_line(line, result.x, result.ys[number - 1],
+                               f"f{number}(x) = {result.functions[number - 1].source}")
+            else:
+                self._set_line(line, [], [])
+            line.set_visible(number <= len(result.functions))
+
+        with trace.span('table'):
+            self._show_intersections(result, result.precision)
+
+        # Highlight intersection intervals, curves separated by NaN gaps
+        interval_x = [np.append(cx, np.nan) for cx, _ in result.interval_curves]
+        interval_y = [np.append(cy, np.nan) for _, cy in result.interval_curves]
+        self._set_line(self.interval_line,
+                       np.concatenate(interval_x) if interval_x else [],
+                       np.concatenate(interval_y) if interval_y else [])
+
+        self._update_legend()
+        if autoscale:
+            self._updating_plot = True
+            try:
+                self.ax.relim()
+                self.ax.autoscale_view()
+            finally:
+                self._updating_plot = False
+        self.canvas.draw_idle()
+
+    def show_sweep(self, result, autoscale=True, trace=NULL_TRACE):
+        """Show a parameter sweep, starting at the slider's current value."""
+        self._create_plot()
+        self._sweep_result = result
+        last = len(result.parameters) - 1
+        self.sweep_slider.blockSignals(True)
+        if self.sweep_slider.maximum() != last:
+            self.sweep_slider.setRange(0, last)
+            self.sweep_slider.setValue(0)
+        self.sweep_slider.blockSignals(False)
+        self.sweep_bar.setVisible(True)
+
+        # Branch traces over all parameter values, separated by NaN gaps
+        traces = [np.vstack((branch, [np.nan, np.nan])) for branch in result.branches]
+        traces = np.concatenate(traces) if traces else np.empty((0, 2))
+        self._set_line(self.branch_line, traces[:, 0], traces[:, 1])
+        self.show_sweep_step(self.sweep_slider.value(), autoscale, trace)
+
+    def show_sweep_step(self, index, autoscale=False, trace=NULL_TRACE):
+        """Plot the sweep at its index-th parameter value."""
+        result = self._sweep_result
+        self.sweep_label.setText(f"a = {result.parameters[index]:g}")
+        step = result.step(index)
+        self.plot_result(step, autoscale, trace)
+        precision = self.plot_settings.precision.value()
+        if precision < step.precision:
+            # Keep a lowered precision while scrubbing, as _on_precision_changed does
+            self.intersection_table.set_precision(precision)
+            self._update_annotations(step.points, precision)
+
+    def toggle_sweep_animation(self):
+        """Start or stop stepping through the parameter values."""
+        if self._sweep_timer.isActive():
+            self._sweep_timer.stop()
+            self.play_button.setText("Play")
+        elif self._sweep_result is not None:
+            self._sweep_timer.start()
+            self.play_button.setText("Pause")
+
+    def _advance_sweep(self):
+        steps = self.sweep_slider.maximum() + 1
+        self.sweep_slider.setValue((self.sweep_slider.value() + 1) % steps)
+
+    def _on_sweep_slider_changed(self, index):
+        if self._sweep_result is not None:
+            try:
+                self.show_sweep_step(index)
+            except Exception as e:
+                self.error_label.setText(f"Error: {str(e)}")
+
+    def _clear_sweep(self):
+        """Hide the sweep controls and branch traces."""
+        self._create_plot()
+        if self._sweep_timer.isActive():
+            self.toggle_sweep_animation()
+        self._sweep_result = None
+        self.sweep_bar.setVisible(False)
+        self._set_line(self.branch_line, [], [])
+
+    def _show_intersections(self, result, precision):
+        """Show intersections in the table, scatter and annotations."""
+        self.intersection_table.update_intersections(result.points, result.intervals, precision,
+                                                     result.point_pairs, result.interval_pairs)
+        self.points_scatter.set_offsets(np.reshape(result.points, (-1, 2)))
+        self._update_annotations(result.points, precision)
+
+    def _on_precision_changed(self, precision):
+        if self._solve_args is None:
+            return
+        self._solve_args['precision'] = precision
+        if self._worker is not None:
+            self._start_solve(dict(self._job_args, precision=precision), self._autoscale)
+        elif self._result is not None and precision <= self._result.precision:
+            # Roots are already refined well enough, only re-format them
+            self.intersection_table.set_precision(precision)
+            self._update_annotations(self._result.points, precision)
+            self.canvas.draw_idle()
+        elif self._result is not None:
+            # Re-run the shown solve for tighter roots, its samples come from the cache
+            self._start_solve(dict(self._job_args, precision=precision), autoscale=False)
+
+    def _init_artists(self):
+        """Create the persistent plot artists updated by every solve."""
+        self.f1_line, = self.ax.plot([], [], color=self.FUNCTION_COLORS[0])
+        self.f2_line, = self.ax.plot([], [], color=self.FUNCTION_COLORS[1])
+        self.function_lines = [self.f1_line, self.f2_line]
+        self.interval_line, = self.ax.plot([], [], color='green', linewidth=2,
+                                           label='Intersection Interval')
+        self.branch_line, = self.ax.plot([], [], color='gray', linestyle=':',
+                                         label='Intersection Branches')
+        self.points_scatter = self.ax.scatter([], [], color='black',
+                                              zorder=5, label='Intersection Points')
+        self.annotations = []
+        self._legend_labels = None
+
+        self.ax.grid(True)
+        self.ax.set_xlabel('x')
+        self.ax.set_ylabel('y')
+
+    @staticmethod
+    def _set_line(line, x, y, label=None):
+        """Update line data, skipping unchanged arrays."""
+        old_x, old_y = line.get_data()
+        if not (np.array_equal(old_x, x) and np.array_equal(old_y, y)):
+            line.set_data(x, y)
+        if label is not None:
+            line.set_label(label)
+
+    def _update_annotations(self, points, precision):
+        """Reuse annotation artists for intersection point labels."""
+        format_str = f"{{:.{precision}f}}"
+        while len(self.annotations) < len(points):
+            self.annotations.append(self.ax.annotate('', (0, 0), xytext=(5, 5),
+                                                     textcoords='offset points'))
+        for annotation, (x_int, y_int) in zip(self.annotations, points):
+            annotation.set_text(f'({format_str.format(x_int)}, {format_str.format(y_int)})')
+            annotation.xy = (x_int, y_int)
+            annotation.set_visible(True)
+        for annotation in self.annotations[len(points):]:
+            annotation.set_visible(False)
+
+    def _update_legend(self):
+        """Rebuild the legend only when the set of labelled artists changes."""
+        handles = [line for line in self.function_lines if line.get_visible()]
+        if len(self.points_scatter.get_offsets()):
+            handles.append(self.points_scatter)
+        if len(self.interval_line.get_xdata()):
+            handles.append(self.interval_line)
+        if len(self.branch_line.get_xdata()):
+            handles.append(self.branch_line)
+        labels = tuple(handle.get_label() for handle in handles)
+        if labels != self._legend_labels:
+            self.ax.legend(handles, labels)
+            self._legend_labels = labels
@@ -1,4 +1,5 @@
-from PySide2.QtWidgets import (QWidget, QLabel, QGridLayout, QDoubleSpinBox, QSpinBox)
+from PySide2.QtWidgets import (QWidget, QLabel, QGridLayout, QDoubleSpinBox, QSpinBox, QComboBox,
+                               QCheckBox)
 
 
 class PlotSettings(QWidget):
@@ -39,4 +40,45 @@ class PlotSettings(QWidget):
         self.precision.setValue(2)
         layout.addWidget(self.precision, 1, 4)
 
+        # Sampling strategy control
+        layout.addWidget(QLabel("Sampling:"), 2, 0)
+        self.sampling = QComboBox()
+        self.sampling.addItems(["Adaptive", "Uniform"])
+        layout.addWidget(self.sampling, 2, 1, 1, 2)
+
+        # Time budget of one solve
+        layout.addWidget(QLabel("Time Limit (s):"), 2, 3)
+        self.time_limit = QDoubleSpinBox()
+        self.time_limit.setRange(0.1, 600)
+        self.time_limit.setValue(10)
+        self.time_limit.setDecimals(1)
+        layout.addWidget(self.time_limit, 2, 4)
+
+        # Parameter sweep controls, functions may then use the parameter a
+        self.sweep_enabled = QCheckBox("Sweep Parameter a")
+        layout.addWidget(self.sweep_enabled, 3, 0)
+        layout.addWidget(QLabel("From:"), 3, 1)
+        self.parameter_start = QDoubleSpinBox()
+        self.parameter_start.setRange(-1000, 1000)
+        self.parameter_start.setValue(0)
+        self.parameter_start.setDecimals(2)
+        layout.addWidget(self.parameter_start, 3, 2)
+
+        layout.addWidget(QLabel("To:"), 3, 3)
+        self.parameter_end = QDoubleSpinBox()
+        self.parameter_end.setRange(-1000, 1000)
+        self.parameter_end.setValue(5)
+        self.parameter_end.setDecimals(2)
+        layout.addWidget(self.parameter_end, 3, 4)
+
+        layout.addWidget(QLabel("Parameter Steps:"), 4, 0)
+        self.parameter_steps = QSpinBox()
+        self.parameter_steps.setRange(2, 1000)
+        self.parameter_steps.setValue(51)
+        layout.addWidget(self.parameter_steps, 4, 1, 1, 2)
+
+        # Per-stage timings of each solve, shown in the status bar
+        self.record_timings = QCheckBox("Record Timings")
+        layout.addWidget(self.record_timings, 4, 3, 1, 2)
+
         self.setLayout(layout)
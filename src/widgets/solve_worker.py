@@ -0,0 +1,47 @@
+from PySide2.QtCore import QObject, QRunnable, Signal
+import threading
+from solver import SolveCancelled
+
+
+class SolveSignals(QObject):
+    """Signals emitted by a SolveWorker, tagged with the worker's job id."""
+    progress = Signal(int, int)
+    finished = Signal(int, object)
+    failed = Signal(int, str)
+
+
+class SolveWorker(QRunnable):
+    """Run a solve off the GUI thread with cooperative cancellation."""
+
+    def __init__(self, job_id, compute):
+        """
+        compute is called as compute(progress, is_cancelled) and returns the result.
+        """
+        super().__init__()
+        self.job_id = job_id
+        self.signals = SolveSignals()
+        self._compute = compute
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Request cancellation, the job stops at its next checkpoint."""
+        self._cancelled.set()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def run(self):
+        try:
+            result = self._compute(self._report_progress, self.is_cancelled)
+        except SolveCancelled:
+            return
+        except Exception as e:
+            if not self.is_cancelled():
+                self.signals.failed.emit(self.job_id, str(e))
+            return
+
+        if not self.is_cancelled():
+            self.signals.finished.emit(self.job_id, result)
+
+    def _report_progress(self, percent):
+        self.signals.progress.emit(self.job_id, percent)
@@ -0,0 +1,85 @@
+import pytest
+import json
+import subprocess
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from batch import main, solve_record
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+
+def test_solve_record():
+    result = solve_record({'id': 7, 'f1': 'x^2', 'f2': '2*x', 'precision': 3})
+    assert result['id'] == 7
+    assert result['points'] == [[0.0, 0.0], [2.0, 4.0]]
+    assert result['intervals'] == []
+
+    result = solve_record({'f1': 'x', 'f2': 'x', 'domain_start': 0, 'domain_end': 1})
+    assert result['intervals'] == [[[0.0, 0.0], [1.0, 1.0]]]
+
+def test_solve_record_errors():
+    assert "Function 2" in solve_record({'f1': 'x', 'f2': 'x + $'})['error']
+    assert "Invalid record" in solve_record({'f1': 'x'})['error']
+
+def test_batch_survives_bad_records(tmp_path):
+    input_path = tmp_path / "pairs.jsonl"
+    output_path = tmp_path / "results.jsonl"
+    records = [{'id': 0, 'f1': 'x', 'f2': '1'},
+               {'id': 1, 'f1': 'x', 'f2': '1', 'domain_start': None, 'num_points': [1]},
+               {'id': 2, 'f1': 'x', 'f2': '2'}]
+    lines = [json.dumps(record) for record in records]
+    lines.insert(2, '{"id": 3, "f1": ')
+    input_path.write_text("\n".join(lines) + "\n")
+
+    assert main([str(input_path), '-o', str(output_path), '--workers', '2']) == 0
+
+    results = [json.loads(line) for line in open(output_path)]
+    assert [r.get('id') for r in results] == [0, 1, None, 2]
+    assert results[0]['points'] == [[1.0, 1.0]]
+    assert "Invalid record" in results[1]['error']
+    assert "Invalid JSON on line 3" in results[2]['error']
+    assert results[3]['points'] == [[2.0, 2.0]]
+    for num_points in (0, -5):
+        error = solve_record({'f1': 'x', 'f2': '1', 'num_points': num_points})['error']
+        assert error == "Invalid record: num_points must be at least 2"
+    assert "Invalid record" in solve_record([1, 2])['error']
+
+def test_solve_record_budget():
+    result = solve_record({'f1': 'sqrt(x)', 'f2': 'x/2', 'max_evaluations': 100})
+    assert result['error'] == "Error: Solve exceeded its budget of 100 function evaluations"
+
+def test_batch_preserves_input_order(tmp_path):
+    input_path = tmp_path / "pairs.jsonl"
+    output_path = tmp_path / "results.jsonl"
+    with open(input_path, 'w') as f:
+        for i in range(20):
+            f.write(json.dumps({'id': i, 'f1': f'x^2 - {i}', 'f2': '0', 'num_points': 200}) + '\n')
+
+    assert main([str(input_path), '-o', str(output_path), '--workers', '2']) == 0
+
+    results = [json.loads(line) for line in open(output_path)]
+    assert [r['id'] for r in results] == list(range(20))
+    assert len(results[4]['points']) == 2
+    assert results[4]['points'][1][0] == pytest.approx(2)
+
+def test_batch_csv_input(tmp_path):
+    input_path = tmp_path / "pairs.csv"
+    output_path = tmp_path / "results.jsonl"
+    input_path.write_text("f1,f2,domain_start,sampling\nsqrt(x),x,-5,uniform\nx,2,,\n")
+
+    main([str(input_path), '-o', str(output_path), '--workers', '1'])
+
+    results = [json.loads(line) for line in open(output_path)]
+    assert results[0]['points'] == [[0.0, 0.0], [1.0, 1.0]]
+    assert results[1]['points'] == [[2.0, 2.0]]
+
+def test_batch_does_not_import_qt():
+    code = "import sys; sys.modules['PySide2'] = None; import batch"
+    subprocess.run([sys.executable, '-c', code], cwd=SRC, check=True)
+
+def test_solve_record_streams_huge_point_counts(monkeypatch):
+    import batch
+    monkeypatch.setattr(batch, 'STREAMING_POINTS', 1000)
+    monkeypatch.setattr(batch, 'STREAMING_CHUNK', 256)
+    result = solve_record({'f1': 'sqrt(x^2 + 1)', 'f2': '2', 'num_points': 5000, 'precision': 6})
+    assert result['points'] == [[-1.732051, 2.0], [1.732051, 2.0]]
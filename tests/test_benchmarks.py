@@ -0,0 +1,17 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../benchmarks')))
+from run import CASES, compare, format_report, time_case
+
+def test_compare_flags_regressions():
+    baselines = {'fast': 1.0, 'same': 1.0, 'slow': 1.0}
+    results = {'fast': 0.5, 'same': 1.1, 'slow': 1.5, 'added': 2.0}
+    rows = compare(results, baselines, threshold=0.25)
+    assert [row[4] for row in rows] == ['faster', 'ok', 'REGRESSION', 'new']
+
+    report = format_report(rows)
+    assert "1 regressions" in report
+    assert "1500.000 ms" in report
+
+def test_time_case():
+    assert time_case(CASES['intersections.crossings[100]'], repeat=1) > 0
@@ -0,0 +1,77 @@
+import pytest
+import numpy as np
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from cache import ExpressionCache, SampleCache
+from function_parser import FunctionParser
+from solver import sample
+
+def test_cache_lru_eviction():
+    cache = SampleCache(max_bytes=3 * 800)
+    for i in range(3):
+        cache.put(i, (np.zeros(100),))
+    assert cache.get(0) is not None
+
+    cache.put(3, (np.zeros(100),))
+    assert len(cache) == 3
+    assert cache.size == 3 * 800
+    assert cache.get(1) is None
+    assert cache.get(0) is not None
+
+    cache.put(4, (np.zeros(1000),))
+    assert cache.get(4) is None
+
+def test_cached_arrays_are_read_only():
+    cache = SampleCache()
+    cache.put('key', (np.zeros(3),))
+    with pytest.raises(ValueError):
+        cache.get('key')[0][0] = 1
+
+def test_sample_cache_hits():
+    parser = FunctionParser()
+    cache = SampleCache()
+    x, y1, y2 = sample(parser.compile("x^2"), parser.compile("2*x"), -10, 10, 1000, False, cache)
+
+    # Same expressions modulo spacing and case hit the cache
+    again = sample(parser.compile("x ^ 2"), parser.compile("2 * X"), -10, 10, 1000, False, cache)
+    assert again[0] is x
+    assert cache.hits == 1
+
+def test_sample_cache_reuses_sub_range():
+    parser = FunctionParser()
+    f1, f2 = parser.compile("x^2"), parser.compile("2*x")
+    cache = SampleCache()
+    x, _, _ = sample(f1, f2, -10, 10, 1000, False, cache)
+
+    narrowed, y1, y2 = sample(f1, f2, -2.5, 2.5, 200, False, cache)
+    assert cache.hits == 1
+    assert narrowed[0] == -2.5 and narrowed[-1] == 2.5
+    assert len(narrowed) >= 200
+    np.testing.assert_allclose(y1, narrowed ** 2)
+    np.testing.assert_allclose(y2, 2 * narrowed)
+
+    # Too sparse for the requested point count: sampled from scratch
+    sample(f1, f2, -2.5, 2.5, 1000, False, cache)
+    assert cache.hits == 1
+
+    # A converged adaptive grid is no denser inside a zoomed range
+    f1 = parser.compile("sin(5*x)")
+    sample(f1, f2, -10, 10, 1000, True, cache)
+    zoomed, _, _ = sample(f1, f2, 1, 1.2, 100, True, cache)
+    assert len(zoomed) > 20
+
+def test_expression_cache():
+    cache = ExpressionCache(max_entries=2)
+    f = cache.compile("x^2 + 1")
+    assert cache.compile(" x^2 + 1 ") is f
+    assert cache.validate("x^2 + 1") == (True, "")
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    assert not cache.validate("x + $")[0]
+    assert not cache.validate("a*x")[0]
+    assert cache.validate("a*x", parameter=True) == (True, "")
+
+    # Least recently used texts are evicted
+    assert len(cache) == 2
+    assert cache.compile("x^2 + 1") is not f
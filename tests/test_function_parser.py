@@ -1,8 +1,10 @@
 import pytest
+import numpy as np
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
-from function_parser import FunctionParser
+from expression import evaluate_all
+from function_parser import FunctionParser, _compiled
 
 def test_validate_function_valid_inputs():
     parser = FunctionParser()
@@ -24,9 +26,11 @@ def test_validate_function_valid_inputs():
 def test_validate_function_invalid_inputs():
     parser = FunctionParser()
     invalid_functions = [
-        ("sin(x)", "Invalid characters detected"),
+        ("y + 1", "Invalid characters detected"),
         ("x + )", "Unbalanced parentheses"),
         ("x + $", "Invalid characters detected"),
+        ("a*x", "Invalid characters detected"),
+        ("sin(x) + xs", "Invalid characters detected"),
         ("", "Invalid function format")
     ]
     
@@ -70,7 +74,161 @@ def test_evaluate_function():
         result = parser.evaluate(func, x_val)
         assert abs(result - expected) < 1e-10
 
+def test_evaluate_reuses_compiled_expressions():
+    parser = FunctionParser()
+    parser.evaluate("x^2 + 7*sqrt(x)", 1)
+    hits = _compiled.cache_info().hits
+    assert parser.evaluate("x^2 + 7*sqrt(x)", 4) == 30
+    assert parser.check_domain_restrictions("x^2 + 7*sqrt(x)", -1) == (False, 'sqrt')
+    assert _compiled.cache_info().hits == hits + 2
+
 def test_evaluate_invalid_function():
     parser = FunctionParser()
     with pytest.raises(ValueError):
-        parser.evaluate("invalid", 1)
\ No newline at end of file
+        parser.evaluate("invalid", 1)
+
+def test_evaluate_overflow():
+    parser = FunctionParser()
+    # Floating point semantics, no arbitrary-precision integer arithmetic
+    assert np.isnan(parser.evaluate("9^9^9^9", 1))
+    assert np.isnan(parser.evaluate("sqrt(x)", -1))
+    with pytest.raises(ValueError):
+        parser.evaluate("(" * 1000 + "x" + ")" * 1000, 1)
+
+    # Long flat chains are walked without recursion
+    chain = "+".join(["sqrt(x)"] * 400)
+    assert parser.evaluate(chain, 4) == 800
+    assert parser.check_domain_restrictions(chain, 4) == (True, None)
+    assert parser.compile(chain).derivatives(np.array([4.0]))[1] == [100]
+    assert parser.compile(chain).valid_subdomains(-1, 1) == [(0.0, 1)]
+    with pytest.raises(ValueError, match="nested too deeply"):
+        parser.evaluate("+".join(["x"] * 1000), 1)
+
+    # Literals beyond float range are not expanded as polynomials
+    huge = "1" + "0" * 400
+    for func in [f"x^{huge}", f"0*{huge}", f"{huge}*x^2"]:
+        assert parser.validate_function(func) == (True, "")
+        assert parser.compile(func).coefficients is None
+    assert parser.polynomial_difference(f"x^{huge}", "1") is None
+
+def test_compile_function():
+    parser = FunctionParser()
+    x = np.array([0.5, 1.0, 2.0, 4.0])
+    for func in ["x + 1", "5*x^2 + 2*x", "log10(x^2 + 1)", "sqrt(x) - x/2"]:
+        expected = [parser.evaluate(func, xi) for xi in x]
+        np.testing.assert_allclose(parser.compile(func)(x), expected)
+
+def test_compile_undefined_values():
+    parser = FunctionParser()
+    y = parser.compile("sqrt(x) + log10(x) + 1/(x - 2)")(np.array([-1.0, 0.0, 1.0, 2.0]))
+    assert y.dtype == np.float64
+    assert np.isnan(y[[0, 1, 3]]).all()
+    assert y[2] == pytest.approx(0.0)
+
+def test_compile_invalid_function():
+    parser = FunctionParser()
+    with pytest.raises(ValueError):
+        parser.compile("invalid")
+
+def test_domain_mask():
+    parser = FunctionParser()
+    x = np.array([-1.0, 0.0, 0.05, 0.5, 4.0])
+
+    valid, restriction = parser.domain_mask("sqrt(x) + log10(x)", x)
+    assert valid.tolist() == [False, False, True, True, True]
+    assert restriction.tolist() == ['sqrt', 'log', None, None, None]
+
+    # Nested calls are checked on the full argument
+    valid, restriction = parser.domain_mask("sqrt(log10(x)+1)", x)
+    assert valid.tolist() == [False, False, False, True, True]
+    assert restriction.tolist() == ['log', 'log', 'sqrt', None, None]
+
+def test_polynomial_difference():
+    parser = FunctionParser()
+    np.testing.assert_allclose(parser.polynomial_difference("5*x^2 + 2*x", "x^2 - 3*x"), [0, 5, 4])
+    np.testing.assert_allclose(parser.polynomial_difference("(x+1)^3/2", "sqrt(16)"), [-3.5, 1.5, 1.5, 0.5])
+    assert parser.polynomial_difference("sqrt(x)", "x") is None
+    assert parser.polynomial_difference("x^0.5", "x") is None
+    assert parser.polynomial_difference("1/x", "x") is None
+
+def test_valid_subdomains():
+    parser = FunctionParser()
+    assert parser.compile("sqrt(x-2)").valid_subdomains(-10, 10) == [(2.0, 10)]
+    assert parser.compile("sqrt(x^2-1)").valid_subdomains(-10, 10) == [(-10, -1.0), (1.0, 10)]
+    assert parser.compile("sqrt(log10(x)+1)").valid_subdomains(-10, 10) == [(pytest.approx(0.1), 10)]
+    assert parser.compile("x^2 + 1").valid_subdomains(-10, 10) == [(-10, 10)]
+    assert parser.compile("sqrt(x)").valid_subdomains(-10, -1) == []
+    # Undecided by interval arithmetic alone, settled point-wise
+    assert parser.compile("sqrt(x^2 - 2*x + 1)").valid_subdomains(-10, 10) == [(-10, 10)]
+
+def test_derivatives():
+    parser = FunctionParser()
+    x = np.array([0.5, 1.0, 4.0])
+
+    y, slope, curvature = parser.compile("x^3 - 2*x").derivatives(x)
+    np.testing.assert_allclose(y, x**3 - 2*x)
+    np.testing.assert_allclose(slope, 3*x**2 - 2)
+    np.testing.assert_allclose(curvature, 6*x)
+
+    _, slope, curvature = parser.compile("sqrt(x)*log10(x)").derivatives(x)
+    np.testing.assert_allclose(slope, np.log10(x) / (2*np.sqrt(x)) + 1 / (np.sqrt(x)*np.log(10)))
+    np.testing.assert_allclose(curvature, -np.log10(x) / (4*x**1.5), atol=1e-12)
+
+    _, slope, _ = parser.compile("2^x / x").derivatives(x)
+    np.testing.assert_allclose(slope, 2**x * (np.log(2)*x - 1) / x**2)
+
+    # Undefined derivatives are NaN
+    assert np.isnan(parser.compile("sqrt(x)").derivatives(np.array([0.0]))[1][0])
+
+def test_parameter_functions():
+    parser = FunctionParser()
+    assert parser.validate_function("a*x^2 + 1", parameter=True) == (True, "")
+    assert not parser.validate_function("a*x^2 + 1")[0]
+
+    f = parser.compile("a*x^2 + 1", parameter=True)
+    x = np.array([-1.0, 0.0, 2.0])
+    y = f.sweep(x, np.array([0.0, 1.0, 2.0]))
+    assert y.shape == (3, 3)
+    np.testing.assert_allclose(y[2], 2*x**2 + 1)
+    np.testing.assert_allclose(f.bind(2.0)(x), y[2])
+    assert not f.bind(2.0).has_parameter
+
+def test_registered_functions():
+    parser = FunctionParser()
+    for func in ["exp(x)", "ln(x + 1)", "sin(x)^2 + cos(x)^2", "abs(x - 1)", "sqrt(sin(x))"]:
+        assert parser.validate_function(func) == (True, "")
+    assert "Invalid characters detected" in parser.validate_function("tan(x)")[1]
+
+    x = np.array([-2.0, 0.5, 3.0])
+    np.testing.assert_allclose(parser.compile("sin(x)^2 + cos(x)^2")(x), 1.0)
+    np.testing.assert_allclose(parser.compile("exp(ln(abs(x)))")(x), np.abs(x))
+
+    valid, restriction = parser.domain_mask("ln(x)", x)
+    assert valid.tolist() == [False, True, True]
+    assert restriction.tolist() == ['log', None, None]
+
+    _, slope, curvature = parser.compile("x*sin(x) + exp(2*x)").derivatives(x)
+    np.testing.assert_allclose(slope, np.sin(x) + x*np.cos(x) + 2*np.exp(2*x))
+    np.testing.assert_allclose(curvature, 2*np.cos(x) - x*np.sin(x) + 4*np.exp(2*x))
+
+    assert parser.compile("ln(x - 1)").valid_subdomains(-10, 10) == [(pytest.approx(1.0), 10)]
+    subdomains = parser.compile("sqrt(sin(x))").valid_subdomains(0, 10)
+    assert subdomains == [(0, pytest.approx(np.pi)), (pytest.approx(2*np.pi), pytest.approx(3*np.pi))]
+
+def test_optimized_evaluation():
+    parser = FunctionParser()
+    # Literal subtrees fold, small integer powers become products
+    plan = parser.explain("(2+3)*x^4 - sqrt(16)").splitlines()
+    assert plan[1:] == ["%0 = 5", "%1 = x", "%2 = mul %1 %1", "%3 = mul %2 %2", "%4 = mul %0 %3",
+                        "%5 = 4", "%6 = sub %4 %5", "f1 = %6", "7 instructions for 9 subterms"]
+
+    x = np.array([-2.0, -0.5, 0.0, 1.5, 3.0])
+    for func in ["x^2", "x^3", "(x-1)^4", "x^0", "x^1", "x^5", "x^-2", "2^3 + x"]:
+        np.testing.assert_allclose(parser.compile(func)(x), parser.compile(f"({func})*1")(x))
+    np.testing.assert_allclose(parser.compile("(x-1)^4")(x), (x - 1)**4)
+
+    # A subterm shared by both functions is computed once
+    shared = parser.explain("sqrt(x^2+1)*3", "sqrt(x^2+1)-x")
+    assert shared.count("sqrt(%") == 1
+    f1, f2 = parser.compile("sqrt(x^2+1)*3"), parser.compile("sqrt(x^2+1)-x")
+    np.testing.assert_allclose(evaluate_all((f1, f2), x), [f1(x), f2(x)])
@@ -6,7 +6,7 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 from widgets.main_window import MainWindow
 
-def test_end_to_end_workflow(qapp):
+def test_end_to_end_workflow(qapp, qtbot):
     # Create main window
     window = MainWindow()
     
@@ -21,20 +21,22 @@ def test_end_to_end_workflow(qapp):
     window.plot_settings.precision.setValue(3)
     
     # Click solve button
-    QTest.mouseClick(window.solve_button, Qt.LeftButton)
+    with qtbot.waitSignal(window.solve_finished):
+        QTest.mouseClick(window.solve_button, Qt.LeftButton)
     
     # Verify results
     assert window.error_label.text() == ""
     assert len(window.ax.lines) > 0
     assert window.intersection_table.rowCount() > 0
 
-def test_domain_restrictions(qapp):
+def test_domain_restrictions(qapp, qtbot):
     window = MainWindow()
     
     # Test sqrt domain restriction
     window.func1_input.setText("sqrt(x)")
     window.func2_input.setText("x")
-    window.solve_and_plot()
+    with qtbot.waitSignal(window.solve_finished):
+        window.solve_and_plot()
     
     # Verify plot shows only valid domain
     assert len(window.ax.lines) > 0
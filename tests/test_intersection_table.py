@@ -1,5 +1,6 @@
 import pytest
 from PySide2.QtWidgets import QApplication
+import numpy as np
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
@@ -7,8 +8,8 @@ from widgets.intersection_table import IntersectionTable
 
 def test_intersection_table_creation(qapp):
     table = IntersectionTable()
-    assert table.columnCount() == 3
-    assert table.horizontalHeader().count() == 3
+    assert table.columnCount() == 4
+    assert table.horizontalHeader().count() == 4
 
 def test_update_intersections(qapp):
     table = IntersectionTable()
@@ -19,8 +20,38 @@ def test_update_intersections(qapp):
     table.update_intersections(points, intervals, precision)
     
     assert table.rowCount() == 3
-    assert table.item(0, 0).text() == "Point"
-    assert table.item(0, 1).text() == "(1.00, 1.00)"
-    assert table.item(2, 0).text() == "Interval"
-    assert table.item(2, 1).text() == "(3.00, 9.00)"
-    assert table.item(2, 2).text() == "(4.00, 16.00)"
+    assert table.cell_text(0, 0) == "Point"
+    assert table.cell_text(0, 1) == "(1.00, 1.00)"
+    assert table.cell_text(2, 0) == "Interval"
+    assert table.cell_text(2, 1) == "(3.00, 9.00)"
+    assert table.cell_text(2, 2) == "(4.00, 16.00)"
+
+def test_precision_change_updates_cells(qapp):
+    table = IntersectionTable()
+    table.update_intersections([(1.23456, 2.5)], [], 2)
+    changed = []
+    table.model().dataChanged.connect(lambda *args: changed.append(args))
+
+    table.set_precision(4)
+
+    assert changed
+    assert table.rowCount() == 1
+    assert table.cell_text(0, 1) == "(1.2346, 2.5000)"
+
+def test_large_result_set(qapp):
+    table = IntersectionTable()
+    points = np.column_stack((np.arange(100000.0), np.zeros(100000)))
+    table.update_intersections(points, np.empty((0, 4)), 1)
+
+    assert table.rowCount() == 100000
+    assert table.cell_text(99999, 0) == "Point"
+    assert table.cell_text(99999, 1) == "(99999.0, 0.0)"
+
+def test_function_pairs_column(qapp):
+    table = IntersectionTable()
+    table.update_intersections([(1.0, 1.0)], [], 2)
+    assert table.cell_text(0, 3) == "f1, f2"
+
+    table.update_intersections([(1.0, 1.0), (2.0, 4.0)], [((3.0, 9.0), (4.0, 16.0))], 2,
+                               point_pairs=[(0, 2), (1, 3)], interval_pairs=[(2, 3)])
+    assert [table.cell_text(row, 3) for row in range(3)] == ["f1, f3", "f2, f4", "f3, f4"]
@@ -0,0 +1,107 @@
+import pytest
+import numpy as np
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from intersections import find_all_intersections, find_intersections
+
+
+def reference_find_intersections(x_array, y1_array, y2_array, tolerance=1e-6):
+    """Original loop-based implementation, kept as the equivalence oracle."""
+    points = []
+    intervals = []
+
+    i = 0
+    while i < len(x_array) - 1:
+        if np.isnan(y1_array[i]) or np.isnan(y2_array[i]):
+            i += 1
+            continue
+
+        diff = abs(y1_array[i] - y2_array[i])
+
+        if diff <= tolerance:
+            start_x = x_array[i]
+            start_y = y1_array[i]
+
+            j = i + 1
+            while (j < len(x_array) and
+                   not np.isnan(y1_array[j]) and
+                   not np.isnan(y2_array[j]) and
+                   abs(y1_array[j] - y2_array[j]) <= tolerance):
+                j += 1
+
+            if j - i > 2:
+                end_x = x_array[j - 1]
+                end_y = y1_array[j - 1]
+                intervals.append(((start_x, start_y), (end_x, end_y)))
+                i = j
+            else:
+                points.append((x_array[i], y1_array[i]))
+                i += 1
+        else:
+            if (i < len(x_array) - 1 and
+                    not np.isnan(y1_array[i + 1]) and
+                    not np.isnan(y2_array[i + 1])):
+                if (y1_array[i] - y2_array[i]) * (y1_array[i + 1] - y2_array[i + 1]) < 0:
+                    x_int = (x_array[i] + x_array[i + 1]) / 2
+                    y_int = (y1_array[i] + y2_array[i]) / 2
+                    points.append((x_int, y_int))
+            i += 1
+
+    return points, intervals
+
+
+def assert_same_result(x, y1, y2):
+    points, intervals = find_intersections(x, y1, y2)
+    expected_points, expected_intervals = reference_find_intersections(x, y1, y2)
+    np.testing.assert_array_equal(np.reshape(points, (-1, 2)), np.reshape(expected_points, (-1, 2)))
+    np.testing.assert_array_equal(np.reshape(intervals, (-1, 4)), np.reshape(expected_intervals, (-1, 4)))
+
+
+def test_find_intersections_simple_cases():
+    x = np.linspace(-5, 5, 500)
+    points, intervals = find_intersections(x, x ** 2, 2 * x)
+    assert len(points) == 2
+    assert intervals == []
+    assert points[0][0] == pytest.approx(0, abs=0.02)
+    assert points[1][0] == pytest.approx(2, abs=0.02)
+
+    points, intervals = find_intersections(x, x, x.copy())
+    assert points == []
+    assert intervals == [((x[0], x[0]), (x[-1], x[-1]))]
+
+
+def test_find_intersections_matches_reference():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        n = rng.integers(2, 60)
+        x = np.sort(rng.uniform(-10, 10, n))
+        y1 = rng.choice([-1.0, 0.0, 1.0, 2.0], n)
+        y2 = rng.choice([0.0, 1.0], n)
+        y1[rng.random(n) < 0.1] = np.nan
+        y2[rng.random(n) < 0.1] = np.nan
+        assert_same_result(x, y1, y2)
+
+
+def test_find_intersections_edge_cases():
+    x = np.arange(5.0)
+    assert_same_result(x, np.array([1.0, 0, 0, 1, 0]), np.zeros(5))
+    assert_same_result(x, np.array([1.0, 1, 0, 0, 0]), np.zeros(5))
+    assert_same_result(x, np.array([0.0, 0, 0, 1, -1]), np.zeros(5))
+    assert_same_result(x, np.array([np.nan, -1, 1, np.nan, 1]), np.zeros(5))
+    assert find_intersections(x[:1], x[:1], x[:1]) == ([], [])
+
+def test_find_all_intersections():
+    x = np.linspace(-2, 2, 9)
+    ys = np.array([x**2, 2*x, np.ones_like(x)])
+    points, point_pairs, intervals, interval_pairs = find_all_intersections(x, ys)
+
+    # Same as comparing every pair on its own
+    expected_points, expected_pairs = [], []
+    for i, j in [(0, 1), (0, 2), (1, 2)]:
+        pair_points, _ = find_intersections(x, ys[i], ys[j])
+        expected_points += pair_points
+        expected_pairs += [(i, j)] * len(pair_points)
+    assert points == expected_points
+    assert point_pairs == expected_pairs
+    assert intervals == [] and interval_pairs == []
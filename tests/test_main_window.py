@@ -26,20 +26,229 @@ def test_input_validation(window):
     window.solve_and_plot()
     assert "Invalid characters detected" in window.error_label.text()
 
-def test_valid_functions(window):
+def test_valid_functions(window, qtbot):
     window.func1_input.setText("x^2")
     window.func2_input.setText("2*x")
-    window.solve_and_plot()
+    with qtbot.waitSignal(window.solve_finished):
+        window.solve_and_plot()
     assert window.error_label.text() == ""
     
     # Check if plot was created
     assert len(window.ax.lines) > 0
 
-def test_intersection_points(window):
+def test_intersection_points(window, qtbot):
     window.func1_input.setText("x")
     window.func2_input.setText("x")
-    window.solve_and_plot()
+    with qtbot.waitSignal(window.solve_finished):
+        window.solve_and_plot()
     
     # Should show intersection interval
     assert window.intersection_table.rowCount() > 0
-    assert "Interval" in window.intersection_table.item(0, 0).text()
+    assert "Interval" in window.intersection_table.cell_text(0, 0)
+
+
+def test_solve_runs_in_background(window, qtbot):
+    window.func1_input.setText("x^2")
+    window.func2_input.setText("2*x")
+    with qtbot.waitSignal(window.solve_finished):
+        window.solve_and_plot()
+        assert window.cancel_button.isEnabled()
+    assert not window.cancel_button.isEnabled()
+    assert window.intersection_table.rowCount() == 2
+
+def test_cancel_solve(window, qtbot):
+    window.func1_input.setText("x^2")
+    window.func2_input.setText("2*x")
+    window.solve_and_plot()
+    window.cancel_solve()
+    assert not window.cancel_button.isEnabled()
+    with qtbot.assertNotEmitted(window.solve_finished, wait=200):
+        pass
+    assert window.intersection_table.rowCount() == 0
+
+def test_new_solve_replaces_stale_job(window, qtbot):
+    window.func1_input.setText("x^2")
+    window.func2_input.setText("2*x")
+    window.solve_and_plot()
+    window.func2_input.setText("x + 2")
+    with qtbot.waitSignal(window.solve_finished):
+        window.solve_and_plot()
+    qtbot.wait(100)
+    assert "x + 2" in window.ax.lines[1].get_label()
+
+def test_plot_artists_are_reused(window, qtbot):
+    window.func1_input.setText("x^2")
+    window.func2_input.setText("2*x")
+    with qtbot.waitSignal(window.solve_finished):
+        window.solve_and_plot()
+    lines = list(window.ax.lines)
+    assert len(window.points_scatter.get_offsets()) == 2
+
+    window.func2_input.setText("x")
+    window.plot_settings.domain_start.setValue(0.5)
+    with qtbot.waitSignal(window.solve_finished):
+        window.solve_and_plot()
+    assert list(window.ax.lines) == lines
+    assert len(window.points_scatter.get_offsets()) == 1
+    assert window.f2_line.get_label() == "f2(x) = x"
+    visible = [a for a in window.annotations if a.get_visible()]
+    assert len(visible) == 1
+
+def test_zoom_resamples_visible_range(window, qtbot):
+    window.func1_input.setText("x^2")
+    window.func2_input.setText("2*x")
+    with qtbot.waitSignal(window.solve_finished):
+        window.solve_and_plot()
+
+    with qtbot.waitSignal(window.solve_finished):
+        window.ax.set_xlim(1.5, 2.5)
+    x_data = window.f1_line.get_xdata()
+    assert x_data.min() >= 1.5 and x_data.max() <= 2.5
+    assert len(x_data) <= max(window.ax.bbox.width, 100)
+    assert window.ax.get_xlim() == (1.5, 2.5)
+    assert window.intersection_table.rowCount() == 1
+    assert window.intersection_table.cell_text(0, 1) == "(2.00, 4.00)"
+
+def test_precision_change_reformats_without_solving(window, qtbot):
+    window.func1_input.setText("x^2")
+    window.func2_input.setText("2*x")
+    window.plot_settings.precision.setValue(4)
+    with qtbot.waitSignal(window.solve_finished):
+        window.solve_and_plot()
+    job_id = window._job_id
+
+    window.plot_settings.precision.setValue(1)
+    assert window._job_id == job_id
+    assert window.intersection_table.cell_text(1, 1) == "(2.0, 4.0)"
+
+    with qtbot.waitSignal(window.solve_finished):
+        window.plot_settings.precision.setValue(6)
+    assert window.intersection_table.cell_text(1, 1) == "(2.000000, 4.000000)"
+
+def test_huge_power_does_not_hang(window, qtbot):
+    window.func1_input.setText("9^9^9^9")
+    window.func2_input.setText("x")
+    with qtbot.waitSignal(window.solve_finished, timeout=10000):
+        window.solve_and_plot()
+    assert window.error_label.text() == ""
+    assert window.intersection_table.rowCount() == 0
+
+def test_solve_budget_exceeded(window, qtbot):
+    window.max_evaluations = 10
+    window.func1_input.setText("sqrt(x+20)")
+    window.func2_input.setText("x")
+    with qtbot.waitSignal(window.solve_finished):
+        window.solve_and_plot()
+    assert window.error_label.text() == "Error: Solve exceeded its budget of 10 function evaluations"
+
+def test_many_functions(window, qtbot):
+    window.func1_input.setText("x^2")
+    window.func2_input.setText("2*x")
+    window.add_function_input("1")
+    assert len(window.function_inputs) == 3
+    with qtbot.waitSignal(window.solve_finished):
+        window.solve_and_plot()
+    assert window.error_label.text() == ""
+    assert window.function_lines[2].get_label() == "f3(x) = 1"
+
+    table = window.intersection_table
+    rows = {(table.cell_text(row, 1), table.cell_text(row, 3)) for row in range(table.rowCount())}
+    assert rows == {("(-1.00, 1.00)", "f1, f3"), ("(0.00, 0.00)", "f1, f2"),
+                    ("(0.50, 1.00)", "f2, f3"), ("(1.00, 1.00)", "f1, f3"),
+                    ("(2.00, 4.00)", "f1, f2")}
+
+    # Back to two functions, the extra line is hidden
+    window.remove_function_input(window.function_inputs[2])
+    with qtbot.waitSignal(window.solve_finished):
+        window.solve_and_plot()
+    assert not window.function_lines[2].get_visible()
+    assert table.rowCount() == 2
+
+def test_empty_added_function(window):
+    window.func1_input.setText("x^2")
+    window.func2_input.setText("2*x")
+    window.add_function_input()
+    window.solve_and_plot()
+    assert window.error_label.text() == "Please enter all functions or remove the empty ones"
+
+def test_parameter_sweep(window, qtbot):
+    window.func1_input.setText("a*x^2")
+    window.func2_input.setText("x + 1")
+    window.plot_settings.sweep_enabled.setChecked(True)
+    window.plot_settings.parameter_start.setValue(1)
+    window.plot_settings.parameter_end.setValue(2)
+    window.plot_settings.parameter_steps.setValue(3)
+    with qtbot.waitSignal(window.solve_finished):
+        window.solve_and_plot()
+    assert window.error_label.text() == ""
+    assert not window.sweep_bar.isHidden()
+    assert window.sweep_slider.maximum() == 2
+    assert window.sweep_label.text() == "a = 1"
+    assert window.intersection_table.cell_text(0, 1) == "(-0.62, 0.38)"
+    assert len(window.branch_line.get_xdata()) > 0
+
+    # Scrubbing shows another parameter value without solving again
+    with qtbot.assertNotEmitted(window.solve_finished, wait=100):
+        window.sweep_slider.setValue(2)
+    assert window.sweep_label.text() == "a = 2"
+    assert window.intersection_table.cell_text(0, 1) == "(-0.50, 0.50)"
+    assert window.intersection_table.cell_text(1, 1) == "(1.00, 2.00)"
+
+    # A plain solve hides the sweep controls again
+    window.plot_settings.sweep_enabled.setChecked(False)
+    window.func1_input.setText("x^2")
+    with qtbot.waitSignal(window.solve_finished):
+        window.solve_and_plot()
+    assert window.sweep_bar.isHidden()
+    assert len(window.branch_line.get_xdata()) == 0
+
+def test_record_timings(window, qtbot, tmp_path):
+    window.func1_input.setText("sqrt(x)")
+    window.func2_input.setText("x/2")
+    window.plot_settings.domain_start.setValue(0)
+    window.plot_settings.record_timings.setChecked(True)
+    with qtbot.waitSignal(window.solve_finished):
+        window.solve_and_plot()
+    message = window.statusBar().currentMessage()
+    for stage in ['validation', 'domain scan', 'sampling', 'table', 'draw', 'total']:
+        assert stage in message
+    assert "2 intersections" in message
+    assert window.export_trace_button.isEnabled()
+
+    path = tmp_path / "trace.json"
+    window.export_trace(str(path))
+    assert "evaluations" in path.read_text()
+
+def test_plot_created_after_first_paint(window, qtbot):
+    assert window._figure is None
+    with qtbot.waitSignal(window.first_painted):
+        window.show()
+    assert window._figure is None
+    qtbot.waitUntil(lambda: window._figure is not None)
+    assert window.ax.get_xlabel() == 'x'
+    window.close()
+
+def test_live_preview(window, qtbot):
+    window.func1_input.setText("x^2")
+    window.func2_input.setText("2*x")
+    qtbot.waitUntil(lambda: window._preview_key is not None)
+    assert len(window.f2_line.get_xdata()) == window.preview_points
+    assert window.error_label.text() == ""
+    assert window._worker is None
+    assert window.intersection_table.rowCount() == 0
+
+    # Typing pauses show validation errors, only the edited function is parsed
+    misses = window.expressions.misses
+    window.func1_input.setText("x^^2")
+    qtbot.waitUntil(lambda: window.error_label.text().startswith("Function 1:"))
+    assert window.expressions.misses == misses + 1
+
+    window.func1_input.setText("x^2 - 1")
+    qtbot.waitUntil(lambda: window.f1_line.get_label() == "f1(x) = x^2 - 1")
+    assert window.error_label.text() == ""
+
+    # The full solve runs only on request, replacing the preview
+    with qtbot.waitSignal(window.solve_finished):
+        window.solve_and_plot()
+    assert window.intersection_table.rowCount() == 2
+    assert window._result is not None
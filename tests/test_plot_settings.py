@@ -20,4 +20,25 @@ def test_plot_settings_ranges(qapp):
     assert settings.num_points.minimum() == 100
     assert settings.num_points.maximum() == 10000
     assert settings.precision.minimum() == 0
-    assert settings.precision.maximum() == 10
\ No newline at end of file
+    assert settings.precision.maximum() == 10
+
+def test_plot_settings_sampling(qapp):
+    settings = PlotSettings()
+
+    assert settings.sampling.currentText() == "Adaptive"
+    assert settings.sampling.count() == 2
+
+def test_plot_settings_time_limit(qapp):
+    settings = PlotSettings()
+
+    assert settings.time_limit.value() == 10
+    assert settings.time_limit.minimum() == 0.1
+
+def test_plot_settings_parameter_sweep(qapp):
+    settings = PlotSettings()
+
+    assert not settings.sweep_enabled.isChecked()
+    assert settings.parameter_start.value() == 0
+    assert settings.parameter_end.value() == 5
+    assert settings.parameter_steps.value() == 51
+    assert settings.parameter_steps.minimum() == 2
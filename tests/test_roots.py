@@ -0,0 +1,86 @@
+import pytest
+import numpy as np
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from function_parser import FunctionParser
+from roots import brentq, polynomial_roots, refine_intersections, tangent_points
+from intersections import find_intersections
+
+def test_brentq():
+    root = brentq(np.cos, 0, 3, xtol=1e-14)
+    assert root == pytest.approx(np.pi / 2, abs=1e-14)
+
+    assert brentq(lambda t: t - 1, 1, 2) == 1
+
+    with pytest.raises(ValueError):
+        brentq(lambda t: t ** 2 + 1, -1, 1)
+
+def test_refine_intersections():
+    parser = FunctionParser()
+    f1 = parser.compile("x^2")
+    f2 = parser.compile("2")
+    x = np.linspace(-10, 10, 101)
+
+    points, _ = find_intersections(x, f1(x), f2(x))
+    refined = refine_intersections(f1, f2, x, points, precision=10)
+
+    assert len(refined) == 2
+    assert refined[0][0] == pytest.approx(-np.sqrt(2), abs=1e-11)
+    assert refined[1][0] == pytest.approx(np.sqrt(2), abs=1e-11)
+    assert refined[1][1] == pytest.approx(2, abs=1e-10)
+
+    # Grids of high-to-low domains run descending
+    x = x[::-1]
+    points, _ = find_intersections(x, f1(x), f2(x))
+    refined = refine_intersections(f1, f2, x, points, precision=10)
+    assert [px for px, _ in refined] == pytest.approx([np.sqrt(2), -np.sqrt(2)], abs=1e-11)
+
+def test_refine_keeps_sample_points():
+    parser = FunctionParser()
+    f1 = parser.compile("x")
+    f2 = parser.compile("0")
+    x = np.linspace(-1, 1, 5)
+
+    points, _ = find_intersections(x, f1(x), f2(x))
+    assert refine_intersections(f1, f2, x, points, precision=2) == points
+
+def test_refine_band_points():
+    parser = FunctionParser()
+    x = np.linspace(-10, 10, 10000)
+
+    # A double root only reaches the tolerance band on a sample next to it
+    f1, f2 = parser.compile("(x-1.2345678)^2*exp(x/10)"), parser.compile("0")
+    points, _ = find_intersections(x, f1(x), f2(x))
+    refined = refine_intersections(f1, f2, x, points, precision=8)
+    assert [px for px, _ in refined] == [pytest.approx(1.2345678, abs=1e-9)]
+
+    # Samples on both sides of a contact are reported as one root
+    f1, f2 = parser.compile("cos(x)"), parser.compile("1")
+    points, _ = find_intersections(x, f1(x), f2(x))
+    refined = refine_intersections(f1, f2, x, points, precision=6)
+    assert [px for px, _ in refined] == pytest.approx([-2*np.pi, 0, 2*np.pi], abs=1e-7)
+
+def test_polynomial_roots():
+    # (x + 3)(x - 1)(x - 2)^2 = x^4 - 2x^3 - 7x^2 + 20x - 12
+    roots = polynomial_roots([-12, 20, -7, -2, 1], -10, 10)
+    np.testing.assert_allclose(roots, [-3, 1, 2], atol=1e-7)
+
+    np.testing.assert_allclose(polynomial_roots([-12, 20, -7, -2, 1], 0, 1.5), [1])
+    assert len(polynomial_roots([1, 0, 1], -10, 10)) == 0
+    assert len(polynomial_roots([5], -10, 10)) == 0
+
+def test_tangent_points():
+    parser = FunctionParser()
+    f1, f2 = parser.compile("(x-1.3)^2/(1+x^2)"), parser.compile("0")
+    x = np.linspace(-10, 10, 50)
+    # No sample lands on the double root and the difference never changes sign
+    assert find_intersections(x, f1(x), f2(x)) == ([], [])
+
+    points = tangent_points(f1, f2, x, f1(x), f2(x), 6)
+    assert len(points) == 1
+    assert points[0] == (pytest.approx(1.3, abs=1e-7), pytest.approx(0, abs=1e-12))
+
+    # A near miss is not a contact
+    f1 = parser.compile("(x-1.3)^2/(1+x^2) + 0.001")
+    assert tangent_points(f1, f2, x, f1(x), f2(x), 6) == []
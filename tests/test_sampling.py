@@ -0,0 +1,43 @@
+import pytest
+import numpy as np
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from function_parser import FunctionParser
+from sampling import adaptive_sample, uniform_sample
+from intersections import find_intersections
+
+def sample(func1, func2, budget=1000):
+    parser = FunctionParser()
+    return adaptive_sample(parser.compile(func1), parser.compile(func2), -10, 10, budget)
+
+def test_adaptive_sample_respects_budget():
+    for budget in [10, 100, 1000]:
+        x, y1, y2 = sample("sqrt(x)*10^x", "x", budget)
+        assert len(x) <= budget
+        assert np.all(np.diff(x) > 0)
+
+def test_adaptive_sample_uses_fewer_points_than_uniform():
+    x, y1, y2 = sample("x^2", "2*x")
+    assert len(x) < 200
+
+    points, intervals = find_intersections(x, y1, y2)
+    assert len(points) == 2
+    assert intervals == []
+
+def test_adaptive_sample_refines_domain_boundary():
+    x, y1, y2 = sample("sqrt(x - 2)", "1")
+    valid_x = x[~np.isnan(y1)]
+    assert valid_x[0] == pytest.approx(2, abs=1e-6)
+
+def test_adaptive_sample_keeps_intervals():
+    x, y1, y2 = sample("x", "x")
+    points, intervals = find_intersections(x, y1, y2)
+    assert points == []
+    assert intervals == [((-10.0, -10.0), (10.0, 10.0))]
+
+def test_uniform_sample():
+    parser = FunctionParser()
+    x, y1, y2 = uniform_sample(parser.compile("x"), parser.compile("2"), 0, 1, 11)
+    np.testing.assert_allclose(x, np.linspace(0, 1, 11))
+    np.testing.assert_allclose(y2, 2)
@@ -0,0 +1,95 @@
+import pytest
+import asyncio
+import base64
+import json
+import subprocess
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from service import SolveService, solve_request
+
+@pytest.fixture
+def service():
+    service = SolveService(executor=ThreadPoolExecutor(2))
+    yield service
+    service.close()
+
+async def http_request(port, method, path, body=None):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    payload = b'' if body is None else json.dumps(body).encode('utf-8')
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                 f"Content-Length: {len(payload)}\r\n\r\n".encode('ascii') + payload)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, content = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(content)
+
+def run_with_server(service, client):
+    async def main():
+        server = await service.start('127.0.0.1', 0)
+        async with server:
+            return await client(server.sockets[0].getsockname()[1])
+    return asyncio.run(main())
+
+def test_service_solves_over_http(service):
+    async def client(port):
+        return await asyncio.gather(
+            http_request(port, 'POST', '/solve', {'id': 7, 'f1': "x^2", 'f2': "2*x"}),
+            http_request(port, 'POST', '/solve', {'f1': "x + $", 'f2': "x"}),
+            http_request(port, 'POST', '/solve', [1, 2]),
+            http_request(port, 'POST', '/solve', {'f1': "x", 'f2': "1", 'domain_start': None}),
+            http_request(port, 'GET', '/solve'),
+            http_request(port, 'GET', '/missing'),
+            http_request(port, 'GET', '/health'))
+
+    solved, invalid, not_object, wrong_type, wrong_method, missing, health = run_with_server(service, client)
+    assert solved == (200, {'id': 7, 'f1': "x^2", 'f2': "2*x",
+                            'points': [[0.0, 0.0], [2.0, 4.0]], 'intervals': []})
+    assert invalid[0] == 422 and "Function 1" in invalid[1]['error']
+    assert not_object[0] == 400
+    assert wrong_type[0] == 400 and "Invalid record" in wrong_type[1]['error']
+    assert wrong_method[0] == 405
+    assert missing[0] == 404
+    assert health[0] == 200 and health[1]['status'] == 'ok'
+
+def test_service_reports_worker_failures(service, monkeypatch):
+    import service as service_module
+
+    def broken(request):
+        raise RuntimeError("worker died")
+    monkeypatch.setattr(service_module, 'solve_request', broken)
+
+    async def client(port):
+        return await http_request(port, 'POST', '/solve', {'f1': "x", 'f2': "1"})
+
+    status, body = run_with_server(service, client)
+    assert status == 500 and "worker died" in body['error']
+
+def test_service_coalesces_and_caches(service):
+    request = {'f1': "sqrt(x)", 'f2': "x/2", 'png': True}
+
+    async def client():
+        first = await asyncio.gather(*(service.solve(dict(request, id=k)) for k in range(3)))
+        again = await service.solve(dict(request, id=3))
+        return first + [again]
+
+    responses = asyncio.run(client())
+    assert [response['id'] for response in responses] == [0, 1, 2, 3]
+    assert all(response['points'] == responses[0]['points'] for response in responses)
+    assert service.stats == {'requests': 4, 'solved': 1, 'cache_hits': 1, 'coalesced': 2}
+    assert base64.b64decode(responses[0]['png']).startswith(b'\x89PNG')
+
+def test_solve_request_png():
+    response = solve_request({'f1': "x", 'f2': "x", 'domain_start': 0, 'domain_end': 1, 'png': True})
+    assert response['intervals'] == [[[0.0, 0.0], [1.0, 1.0]]]
+    assert 'png' in response
+
+    response = solve_request({'f1': "x", 'f2': "x", 'num_points': 10**7, 'png': True})
+    assert "plots are limited" in response['error']
+
+def test_service_does_not_import_qt():
+    code = "import sys, service; assert 'PySide2' not in sys.modules"
+    src = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+    subprocess.run([sys.executable, '-c', code], cwd=src, check=True)
@@ -0,0 +1,152 @@
+import pytest
+import numpy as np
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from cache import SampleCache
+from function_parser import FunctionParser
+from solver import (SolveBudgetExceeded, SolveCancelled, domain_restriction,
+                    polynomial_intersections, solve, solve_all, valid_subdomains)
+from tracing import Trace
+
+def compile_pair(func1, func2):
+    parser = FunctionParser()
+    return parser.compile(func1), parser.compile(func2)
+
+def test_solve():
+    f1, f2 = compile_pair("sqrt(x)", "x/2")
+    result = solve(f1, f2, -10, 10, 1000, 6)
+    assert np.all(result.x >= 0)
+    assert [x for x, _ in result.points] == pytest.approx([0, 4], abs=1e-6)
+    assert result.intervals == []
+
+def test_solve_descending_domain():
+    f1, f2 = compile_pair("sin(x)", "0")
+    for adaptive in (True, False):
+        result = solve(f1, f2, 4, -4, 100, 8, adaptive=adaptive)
+        assert [x for x, _ in result.points] == pytest.approx([np.pi, 0, -np.pi], abs=1e-8)
+
+    result = solve_all([f1, f2, FunctionParser.compile("x/8")], 4, -4, 100, 8)
+    found = [x for (x, _), pair in zip(result.points, result.point_pairs) if pair == (0, 1)]
+    assert found == pytest.approx([np.pi, 0, -np.pi], abs=1e-8)
+
+def test_solve_cancelled():
+    f1, f2 = compile_pair("sqrt(x)", "x/2")
+    with pytest.raises(SolveCancelled):
+        solve(f1, f2, -10, 10, 1000, 2, is_cancelled=lambda: True)
+
+def test_solve_budget():
+    f1, f2 = compile_pair("sqrt(x)", "x/2")
+    with pytest.raises(SolveBudgetExceeded, match="1000 function evaluations"):
+        solve(f1, f2, -10, 10, 1000, 2, adaptive=False, max_evaluations=1000)
+    with pytest.raises(SolveBudgetExceeded, match="time limit"):
+        solve(f1, f2, -10, 10, 1000, 2, time_limit=0)
+
+    result = solve(f1, f2, -10, 10, 1000, 2, time_limit=60, max_evaluations=10**6)
+    assert result.f1 is f1
+    assert [x for x, _ in result.points] == pytest.approx([0, 4], abs=1e-2)
+
+def test_polynomial_intersections():
+    points, intervals = polynomial_intersections(*compile_pair("5*x^2 + 2*x", "x^2 - 3*x"), -10, 10)
+    assert points == [(-1.25, pytest.approx(5.3125)), (0.0, 0.0)]
+    assert intervals == []
+
+    # Double root found exactly without sampling
+    points, _ = polynomial_intersections(*compile_pair("(x - 0.1)^2", "0"), -10, 10)
+    assert points[0][0] == pytest.approx(0.1, abs=1e-12)
+
+    assert polynomial_intersections(*compile_pair("sqrt(x)", "x"), -10, 10) is None
+
+def test_polynomial_identical_functions():
+    points, intervals = polynomial_intersections(*compile_pair("2*(x+1)", "2*x + 2"), -5, 5)
+    assert points == []
+    assert intervals == [((-5, -8.0), (5, 12.0))]
+
+def test_valid_subdomains():
+    f1, f2 = compile_pair("sqrt(x+5)", "log10(3-x)")
+    assert valid_subdomains([f1, f2], -10, 10) == [(-5.0, pytest.approx(3.0))]
+
+def test_valid_subdomains_time_limit():
+    f1, f2 = compile_pair("sqrt(sin(x) + cos(3*x)*x^2 - log10(x^2+1)*sin(x/3))", "0")
+    cache = SampleCache()
+    assert valid_subdomains([f1, f2], -1000, 1000, cache, time_limit=0) is None
+    # Giving up is cached too, so the solve does not repeat the analysis
+    misses = cache.misses
+    assert valid_subdomains([f1, f2], -1000, 1000, cache) is None
+    assert cache.misses == misses
+    assert domain_restriction([f1, f2], -1000, 1000, 1000, cache) == 'sqrt'
+
+def test_domain_restriction():
+    assert domain_restriction(compile_pair("sqrt(x)", "x/2"), -10, 10, 1000) == 'sqrt'
+    assert domain_restriction(compile_pair("x", "log10(x)"), -10, 10, 1000) == 'log'
+    # The first restriction met from domain_start is reported
+    assert domain_restriction(compile_pair("sqrt(2-x)", "log10(x+5)"), -10, 10, 1000) == 'log'
+    assert domain_restriction(compile_pair("sqrt(2-x)", "log10(x+5)"), 10, -10, 1000) == 'sqrt'
+    assert domain_restriction(compile_pair("sqrt(x)", "x/2"), 1, 10, 1000) is None
+
+def test_solve_samples_valid_subdomains():
+    f1, f2 = compile_pair("sqrt(x-2)", "1")
+    result = solve(f1, f2, -10, 10, 200, 6, adaptive=False)
+    assert result.x.min() >= 2
+    assert len(result.x) <= 200
+    # Samples cluster towards the restriction boundary
+    assert np.count_nonzero(result.x < 2.01) >= 8
+    assert [x for x, _ in result.points] == pytest.approx([3], abs=1e-6)
+
+    # Many sub-domains share the same point budget
+    f1, f2 = compile_pair("sqrt(sin(x))", "0.5")
+    for adaptive in (True, False):
+        result = solve(f1, f2, -1000, 1000, 1000, 2, adaptive=adaptive)
+        assert len(result.x) <= 1000
+    result = solve(f1, f2, -1000, 1000, 100, 2)
+    assert len(result.x) <= 100
+
+def test_solve_finds_tangent_contacts():
+    # Non-polynomial difference touching zero at x = 1.3, between samples
+    f1, f2 = compile_pair("(x-1.3)^2/(1+x^2)", "0")
+    for adaptive in (False, True):
+        result = solve(f1, f2, -10, 10, 50, 4, adaptive=adaptive)
+        assert [x for x, _ in result.points] == [pytest.approx(1.3, abs=1e-4)]
+
+    # Contacts on samples and between equal dips, each reported once
+    f1, f2 = compile_pair("sin(x)^2", "0")
+    expected = [pytest.approx(k * np.pi, abs=1e-9) for k in range(-3, 4)]
+    assert [x for x, _ in solve(f1, f2, -10, 10, 1000, 8).points] == expected
+    assert [x for x, _ in solve(f1, f2, -10, 10, 1000, 8, adaptive=False).points] == expected
+
+def test_solve_all():
+    parser = FunctionParser()
+    functions = [parser.compile(f) for f in ("x^2", "2*x", "sqrt(x)", "1")]
+    result = solve_all(functions, -10, 10, 1000, 4)
+
+    assert result.ys.shape == (4, len(result.x))
+    found = sorted((pair, round(x, 4)) for (x, _), pair in zip(result.points, result.point_pairs))
+    assert found == [((0, 1), 0.0), ((0, 1), 2.0), ((0, 2), 0.0), ((0, 2), 1.0),
+                     ((0, 3), -1.0), ((0, 3), 1.0), ((1, 2), 0.0), ((1, 2), 0.25),
+                     ((1, 3), 0.5), ((2, 3), 1.0)]
+    assert [x for x, _ in result.points] == sorted(x for x, _ in result.points)
+
+def test_solve_all_intervals():
+    parser = FunctionParser()
+    functions = [parser.compile(f) for f in ("sqrt(x^2)", "x", "0")]
+    result = solve_all(functions, -1, 1, 101, 2)
+    assert result.interval_pairs == [(0, 1)]
+    assert result.intervals[0][0][0] == pytest.approx(0, abs=0.02)
+
+def test_solve_trace():
+    f1, f2 = compile_pair("sqrt(x)", "x/2")
+    trace = Trace()
+    result = solve(f1, f2, 1, 9, 100, 4, adaptive=False, valid_domain_only=False, trace=trace)
+    assert {'sampling', 'find_intersections', 'refinement'} <= set(trace.totals())
+    assert trace.counters['intersections'] == len(result.points) == 1
+    assert trace.counters['evaluations'] >= 200
+    assert 'discarded by domain' not in trace.counters
+
+    trace = Trace()
+    solve(f1, f2, -4, 9, 100, 4, adaptive=False, trace=trace)
+    assert 'domain analysis' in trace.totals()
+    assert trace.counters['discarded by domain'] == 0  # invalid part is never sampled
+    trace = Trace()
+    result = solve_all([f1, f2, FunctionParser.compile("1")], -4, 4, 101, 4, trace=trace)
+    assert trace.counters['discarded by domain'] == 0  # 1 is defined everywhere
+    assert trace.counters['intersections'] == len(result.points) > 0
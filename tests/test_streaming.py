@@ -0,0 +1,75 @@
+import pytest
+import numpy as np
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from function_parser import FunctionParser
+from intersections import find_intersections
+from streaming import IntersectionStream, stream_intersections
+
+def stream_chunks(x, y1, y2, chunk_size, valid_domain_only=False):
+    stream = IntersectionStream(valid_domain_only=valid_domain_only)
+    events = []
+    for i in range(0, len(x), chunk_size):
+        events += stream.feed(x[i:i + chunk_size], y1[i:i + chunk_size], y2[i:i + chunk_size])
+    events += stream.finish()
+    points = [value for kind, value, _ in events if kind == 'point']
+    intervals = [value for kind, value, _ in events if kind == 'interval']
+    return points, intervals
+
+def test_stream_matches_find_intersections():
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        n = rng.integers(1, 80)
+        x = np.arange(n, dtype=float)
+        y1 = rng.choice([-1.0, 0.0, 0.0, 1.0], n)
+        y2 = np.zeros(n)
+        y1[rng.random(n) < 0.1] = np.nan
+        expected_points, expected_intervals = find_intersections(x, y1, y2)
+        for chunk_size in [1, 2, 3, 7, 100]:
+            points, intervals = stream_chunks(x, y1, y2, chunk_size)
+            np.testing.assert_array_equal(np.reshape(points, (-1, 2)),
+                                          np.reshape(expected_points, (-1, 2)))
+            np.testing.assert_array_equal(np.reshape(intervals, (-1, 4)),
+                                          np.reshape(expected_intervals, (-1, 4)))
+
+def test_stream_valid_domain_only():
+    x = np.arange(8.0)
+    y1 = np.array([1.0, np.nan, np.nan, -1, 0, 0, 0, 1])
+    y2 = np.zeros(8)
+    valid = ~np.isnan(y1)
+    expected = find_intersections(x[valid], y1[valid], y2[valid])
+    for chunk_size in [1, 2, 3]:
+        assert stream_chunks(x, y1, y2, chunk_size, valid_domain_only=True) == expected
+
+def test_stream_intersections_grid():
+    parser = FunctionParser()
+    f1, f2 = parser.compile("x^3 - x"), parser.compile("0")
+    x = np.linspace(-2, 2, 1001)
+    expected_points, _ = find_intersections(x, f1(x), f2(x))
+
+    events = list(stream_intersections(f1, f2, -2, 2, 1001, chunk_size=64))
+    assert [value for _, value in events] == pytest.approx(expected_points)
+
+def test_stream_intersections_refines_across_chunks():
+    parser = FunctionParser()
+    f1, f2 = parser.compile("x^2"), parser.compile("2")
+    events = list(stream_intersections(f1, f2, -2, 2, 10 ** 6, chunk_size=10 ** 5, precision=12))
+    assert [kind for kind, _ in events] == ['point', 'point']
+    assert events[0][1][0] == pytest.approx(-np.sqrt(2), abs=1e-12)
+    assert events[1][1][0] == pytest.approx(np.sqrt(2), abs=1e-12)
+
+def test_stream_intersections_reports_band_points_once():
+    parser = FunctionParser()
+    f1, f2 = parser.compile("sin(x)"), parser.compile("0.5")
+    events = list(stream_intersections(f1, f2, -10, 10, 2_000_001, chunk_size=10 ** 5,
+                                       precision=6))
+    roots = sorted(np.concatenate([np.pi/6 + 2*np.pi*np.arange(-2, 2),
+                                   5*np.pi/6 + 2*np.pi*np.arange(-2, 2)]))[1:]
+    assert [value[0] for _, value in events] == pytest.approx(roots, abs=1e-7)
+
+def test_stream_intersections_interval_spanning_chunks():
+    parser = FunctionParser()
+    f = parser.compile("x")
+    events = list(stream_intersections(f, f, 0, 1, 1000, chunk_size=10))
+    assert events == [('interval', ((0.0, 0.0), (1.0, 1.0)))]
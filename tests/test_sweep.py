@@ -0,0 +1,47 @@
+import pytest
+import numpy as np
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from function_parser import FunctionParser
+from sweep import sweep, track_branches
+
+def test_sweep_intersections():
+    parser = FunctionParser()
+    f1 = parser.compile("a*x^2", parameter=True)
+    f2 = parser.compile("x + 1", parameter=True)
+    parameters = np.linspace(1, 2, 11)
+    result = sweep(f1, f2, parameters, -10, 10, 1000, precision=4)
+
+    assert result.y1.shape == (11, 1000)
+    for value, points in zip(parameters, result.points):
+        roots = sorted([(1 - np.sqrt(1 + 4*value)) / (2*value), (1 + np.sqrt(1 + 4*value)) / (2*value)])
+        np.testing.assert_allclose([x for x, _ in points], roots, atol=1e-4)
+
+    # One branch per root, both present for every parameter value
+    assert len(result.branches) == 2
+    assert not np.isnan(np.concatenate(result.branches)).any()
+
+    step = result.step(10)
+    assert step.f1.source == "a*x^2"
+    np.testing.assert_allclose(step.y1, 2*step.x**2)
+    assert step.points == result.points[10]
+
+def test_sweep_budget():
+    parser = FunctionParser()
+    f1 = parser.compile("a*x", parameter=True)
+    f2 = parser.compile("1")
+    with pytest.raises(Exception, match="budget of 1000"):
+        sweep(f1, f2, np.linspace(0, 1, 10), -1, 1, 100, 2, max_evaluations=1000)
+
+def test_track_branches():
+    points = [[(0.0, 0.0), (5.0, 0.0)],
+              [(0.2, 0.0), (4.8, 0.0)],
+              [(4.6, 0.0)],
+              [(0.6, 0.0), (4.4, 0.0)]]
+    branches = track_branches(points, max_jump=0.5)
+    assert len(branches) == 3
+    np.testing.assert_allclose(branches[1][:, 0], [5.0, 4.8, 4.6, 4.4])
+    assert np.isnan(branches[0][2:, 0]).all()
+    # A branch that vanished is not resumed, its point starts a new branch
+    np.testing.assert_allclose(branches[2][:, 0], [np.nan, np.nan, np.nan, 0.6])
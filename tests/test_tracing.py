@@ -0,0 +1,35 @@
+import json
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from tracing import NULL_TRACE, Trace
+
+def test_trace_spans_and_counters(tmp_path):
+    trace = Trace("x^2; 2*x")
+    with trace.span('sampling'):
+        pass
+    with trace.span('refinement'):
+        with trace.span('sampling'):
+            pass
+    trace.count('evaluations', 1000)
+    trace.count('evaluations', 24)
+    trace.finish()
+
+    assert list(trace.totals()) == ['sampling', 'refinement']
+    assert trace.counters == {'evaluations': 1024}
+    summary = trace.summary()
+    assert summary.startswith("sampling ")
+    assert "total " in summary and summary.endswith("1024 evaluations")
+
+    path = tmp_path / "trace.json"
+    trace.save(path)
+    data = json.loads(path.read_text())
+    assert data['label'] == "x^2; 2*x"
+    assert [span['name'] for span in data['spans']] == ['sampling', 'sampling', 'refinement']
+    assert all(span['duration'] >= 0 for span in data['spans'])
+
+def test_null_trace():
+    assert not NULL_TRACE.enabled
+    with NULL_TRACE.span('sampling'):
+        NULL_TRACE.count('evaluations', 10)
+    assert not hasattr(NULL_TRACE, 'counters')
@@ -0,0 +1,10 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from utils import load_stylesheet
+
+def test_load_stylesheet(tmp_path, monkeypatch):
+    # Relative paths resolve from the package, whatever the working directory
+    monkeypatch.chdir(tmp_path)
+    assert "#mainWindow" in load_stylesheet("../resources/style.qss")
+    assert load_stylesheet("../resources/missing.qss") == ""